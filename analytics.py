@@ -0,0 +1,148 @@
+"""Network utilization reports computed with NumPy.
+
+NetworkTables pulls spaceports, routes and flights from MySQL once into
+column arrays. The reports are vectorized group-bys over those arrays:
+np.bincount over a port, hour or route index replaces one COUNT(*) query
+per port and day.
+
+Run ``python analytics.py`` to time the reports on a synthetic network of
+100k flights.
+"""
+import time
+
+import numpy as np
+
+from schedule import DAYS_OF_WEEK
+
+WEEKDAY_SHIFTS = np.arange(len(DAYS_OF_WEEK), dtype=np.uint8)
+
+
+class NetworkTables:
+    """Column arrays for the tables the reports need"""
+
+    def __init__(self, port_ids, port_names, port_capacity, route_ids, route_origin, route_dest,
+                 route_distance, flight_route, flight_mask, flight_departure, flight_seats):
+        self.port_ids = np.asarray(port_ids, dtype=np.int64)
+        self.port_names = list(port_names)
+        self.port_capacity = np.asarray(port_capacity, dtype=np.int64)
+        self.route_ids = np.asarray(route_ids, dtype=np.int64)
+        self.route_origin = np.asarray(route_origin, dtype=np.int64)
+        self.route_dest = np.asarray(route_dest, dtype=np.int64)
+        self.route_distance = np.asarray(route_distance, dtype=np.int64)
+        self.flight_route = np.asarray(flight_route, dtype=np.int64)
+        self.flight_mask = np.asarray(flight_mask, dtype=np.uint8)
+        # Departure as seconds after midnight
+        self.flight_departure = np.asarray(flight_departure, dtype=np.int64)
+        self.flight_seats = np.asarray(flight_seats, dtype=np.int64)
+
+    @classmethod
+    def from_db(cls, db):
+        """Read the three tables with one query each"""
+        cursor = db.cursor()
+        cursor.execute("SELECT spaceport_id, port_name, capacity FROM spaceports ORDER BY spaceport_id")
+        ports = cursor.fetchall()
+        cursor.execute("SELECT route_id, origin_id, dest_id, distance FROM routes ORDER BY route_id")
+        routes = cursor.fetchall()
+        cursor.execute("""
+            SELECT f.route_id, f.schedule_mask, TIME_TO_SEC(f.departure_time), s.capacity
+            FROM flights f
+            JOIN SpacecraftTypes s ON f.spacecraft_type = s.type_name
+        """)
+        flights = cursor.fetchall()
+        cursor.close()
+        return cls(*columns(ports, 3), *columns(routes, 4), *columns(flights, 4))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Columns backed by a mapped snapshot.Snapshot, without copying the arrays"""
+        return cls(snapshot.port_ids, snapshot.port_names, snapshot.port_capacity,
+                   snapshot.route_ids, snapshot.route_origin, snapshot.route_dest,
+                   snapshot.route_distance, snapshot.flight_route, snapshot.flight_mask,
+                   snapshot.flight_departure, snapshot.flight_seats)
+
+    # Index helpers
+    def port_index(self, port_ids):
+        """Positions of spaceport ids in port_ids (which is sorted)"""
+        return np.searchsorted(self.port_ids, port_ids)
+
+    def flight_route_index(self):
+        return np.searchsorted(self.route_ids, self.flight_route)
+
+    def day_bits(self):
+        """flights x 7 matrix of 0/1, one column per weekday"""
+        return ((self.flight_mask[:, None] >> WEEKDAY_SHIFTS) & 1).astype(np.int64)
+
+
+def columns(rows, width):
+    """Transpose fetched rows into width lists, empty lists for no rows"""
+    if not rows:
+        return [[] for _ in range(width)]
+    return [list(column) for column in zip(*rows)]
+
+
+def port_utilization(tables):
+    """Scheduled movements and movements/capacity for every port and weekday.
+
+    A flight counts once at its origin and once at its destination on each
+    day it runs, the same rule enter_flight enforces. Returns two
+    ports x 7 arrays ordered like tables.port_ids.
+    """
+    route_index = tables.flight_route_index()
+    origin = tables.port_index(tables.route_origin[route_index])
+    dest = tables.port_index(tables.route_dest[route_index])
+    bits = tables.day_bits()
+    port_count = len(tables.port_ids)
+
+    movements = np.empty((port_count, len(DAYS_OF_WEEK)), dtype=np.int64)
+    for day in range(len(DAYS_OF_WEEK)):
+        movements[:, day] = (np.bincount(origin, weights=bits[:, day], minlength=port_count)
+                             + np.bincount(dest, weights=bits[:, day], minlength=port_count))
+    utilization = movements / tables.port_capacity[:, None]
+    return movements, utilization
+
+
+def departure_hour_histogram(tables, by_port=False):
+    """Weekly departures per hour of day (the depart_hour column), optionally per origin port"""
+    hours = (tables.flight_departure // 3600) % 24
+    weekly = tables.day_bits().sum(axis=1)
+    if not by_port:
+        return np.bincount(hours, weights=weekly, minlength=24).astype(np.int64)
+    origin = tables.port_index(tables.route_origin[tables.flight_route_index()])
+    port_count = len(tables.port_ids)
+    counts = np.bincount(origin * 24 + hours, weights=weekly, minlength=port_count * 24)
+    return counts.astype(np.int64).reshape(port_count, 24)
+
+
+def route_seat_capacity(tables):
+    """Weekly seats per route: craft capacity times scheduled days, summed over its flights"""
+    weekly = tables.day_bits().sum(axis=1)
+    seats = np.bincount(tables.flight_route_index(), weights=tables.flight_seats * weekly,
+                        minlength=len(tables.route_ids))
+    return seats.astype(np.int64)
+
+
+def synthetic_tables(flight_count=100_000, port_count=500, route_count=20_000, seed=0):
+    """Random network of the given size, for timing the reports"""
+    rng = np.random.default_rng(seed)
+    port_ids = np.arange(1, port_count + 1)
+    origin = rng.integers(1, port_count + 1, route_count)
+    dest = (origin + rng.integers(1, port_count, route_count) - 1) % port_count + 1
+    return NetworkTables(
+        port_ids, [f"Port {i}" for i in port_ids], rng.integers(50, 500, port_count),
+        np.arange(1, route_count + 1), origin, dest, rng.integers(1_000, 900_000, route_count),
+        rng.integers(1, route_count + 1, flight_count), rng.integers(1, 128, flight_count),
+        rng.integers(0, 86_400, flight_count), rng.integers(50, 400, flight_count),
+    )
+
+
+def benchmark(flight_count=100_000):
+    tables = synthetic_tables(flight_count)
+    for report in (port_utilization, departure_hour_histogram, route_seat_capacity):
+        start = time.perf_counter()
+        report(tables)
+        print(f"{report.__name__}: {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"for {flight_count} flights")
+
+
+if __name__ == "__main__":
+    benchmark()
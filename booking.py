@@ -0,0 +1,307 @@
+"""Seat inventory and bookings for dated flight occurrences.
+
+Each (flight_number, flight_date) gets a seat_inventory row seeded from the
+craft's capacity the first time it is booked. Seats are taken with a
+conditional decrement, ``UPDATE ... SET seats_remaining = seats_remaining - n
+WHERE ... AND seats_remaining >= n``, so InnoDB's row lock on that one
+occurrence is the only serialization: bookings on different flights never
+wait for each other and a flight can never go below zero seats.
+
+Multi-leg itineraries decrement every leg in one transaction, always in
+(flight_number, flight_date) order so two bookings sharing legs lock them
+in the same order. If any leg is short of seats the whole booking rolls
+back. Deadlocks and lock wait timeouts are retried a few times.
+
+``python booking.py --clients 32 --seconds 10 FL1 FL2 ...`` runs a local
+load generator against the configured database and checks for oversells.
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from connection import connect
+from schedule import DAYS_OF_WEEK
+
+RETRYABLE_ERRORS = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+MAX_ATTEMPTS = 5
+
+BOOKING_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS seat_inventory (
+        flight_number VARCHAR(20) NOT NULL,
+        flight_date DATE NOT NULL,
+        seats_remaining INT NOT NULL,
+        PRIMARY KEY (flight_number, flight_date),
+        FOREIGN KEY (flight_number) REFERENCES flights(flight_number),
+        CONSTRAINT chk_seats_remaining CHECK (seats_remaining >= 0)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        booking_id INT PRIMARY KEY AUTO_INCREMENT,
+        passenger_name VARCHAR(100) NOT NULL,
+        seats INT NOT NULL,
+        booked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_booking_seats CHECK (seats > 0)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS booking_legs (
+        booking_id INT NOT NULL,
+        leg INT NOT NULL,
+        flight_number VARCHAR(20) NOT NULL,
+        flight_date DATE NOT NULL,
+        PRIMARY KEY (booking_id, leg),
+        KEY idx_leg_occurrence (flight_number, flight_date),
+        FOREIGN KEY (booking_id) REFERENCES bookings(booking_id),
+        FOREIGN KEY (flight_number, flight_date) REFERENCES seat_inventory(flight_number, flight_date)
+    )
+    """,
+]
+
+
+class BookingError(Exception):
+    """A booking could not be made; nothing was reserved"""
+
+
+class SoldOut(BookingError):
+    def __init__(self, flight_number, flight_date):
+        super().__init__(f"Flight {flight_number} on {flight_date} does not have enough seats left.")
+        self.flight_number = flight_number
+        self.flight_date = flight_date
+
+
+def create_booking_tables(db):
+    cursor = db.cursor()
+    for ddl in BOOKING_TABLES:
+        cursor.execute(ddl)
+    db.commit()
+    cursor.close()
+
+
+def weekday_bit(flight_date):
+    # date.weekday() is 0 for Monday, matching the schedule_mask bit order
+    return 1 << flight_date.weekday()
+
+
+class BookingEngine:
+    """Books seats on one connection; give each concurrent client its own engine"""
+
+    def __init__(self, db):
+        self.db = db
+        self.retries = 0
+
+    def ensure_inventory(self, legs):
+        """Create missing inventory rows at full capacity, checking each flight runs that day"""
+        cursor = self.db.cursor()
+        try:
+            for flight_number, flight_date in legs:
+                cursor.execute("""
+                    INSERT IGNORE INTO seat_inventory (flight_number, flight_date, seats_remaining)
+                    SELECT f.flight_number, %s, s.capacity
+                    FROM flights f
+                    JOIN SpacecraftTypes s ON f.spacecraft_type = s.type_name
+                    WHERE f.flight_number = %s AND f.schedule_mask & %s <> 0
+                """, (flight_date, flight_number, weekday_bit(flight_date)))
+                if cursor.rowcount == 0:
+                    cursor.execute(
+                        "SELECT 1 FROM seat_inventory WHERE flight_number = %s AND flight_date = %s",
+                        (flight_number, flight_date))
+                    if cursor.fetchone() is None:
+                        raise BookingError(f"Flight {flight_number} does not operate on "
+                                           f"{DAYS_OF_WEEK[flight_date.weekday()]} {flight_date}.")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def book(self, legs, seats=1, passenger_name="Passenger"):
+        """Reserve seats on every (flight_number, flight_date) leg or on none; returns the booking id"""
+        if seats <= 0:
+            raise BookingError("Seats must be a positive integer.")
+        legs = [(flight_number, flight_date) for flight_number, flight_date in legs]
+        if not legs:
+            raise BookingError("A booking needs at least one leg.")
+        if len(set(legs)) != len(legs):
+            raise BookingError("An itinerary cannot use the same flight occurrence twice.")
+        self.ensure_inventory(legs)
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return self.reserve(legs, seats, passenger_name)
+            except mysql.connector.Error as err:
+                if err.errno not in RETRYABLE_ERRORS or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                self.retries += 1
+                time.sleep(random.uniform(0, 0.005 * (attempt + 1)))
+
+    def reserve(self, legs, seats, passenger_name):
+        cursor = self.db.cursor()
+        try:
+            for flight_number, flight_date in sorted(legs):
+                cursor.execute("""
+                    UPDATE seat_inventory
+                    SET seats_remaining = seats_remaining - %s
+                    WHERE flight_number = %s AND flight_date = %s AND seats_remaining >= %s
+                """, (seats, flight_number, flight_date, seats))
+                if cursor.rowcount == 0:
+                    raise SoldOut(flight_number, flight_date)
+
+            cursor.execute("INSERT INTO bookings (passenger_name, seats) VALUES (%s, %s)",
+                           (passenger_name, seats))
+            booking_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO booking_legs (booking_id, leg, flight_number, flight_date) VALUES (%s, %s, %s, %s)",
+                [(booking_id, leg, flight_number, flight_date)
+                 for leg, (flight_number, flight_date) in enumerate(legs, start=1)]
+            )
+            self.db.commit()
+            return booking_id
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def book_itinerary(self, path, flight_date, seats=1, passenger_name="Passenger"):
+        """Book a flight_finder itinerary (a list of Flight rows) departing on flight_date"""
+        return self.book([(row.flight_number, flight_date) for row in path], seats, passenger_name)
+
+    def cancel(self, booking_id):
+        """Release a booking's seats on every leg"""
+        cursor = self.db.cursor()
+        try:
+            cursor.execute("SELECT seats FROM bookings WHERE booking_id = %s FOR UPDATE", (booking_id,))
+            row = cursor.fetchone()
+            if row is None:
+                raise BookingError(f"Booking {booking_id} does not exist.")
+            cursor.execute("""
+                UPDATE seat_inventory si
+                JOIN booking_legs bl
+                    ON bl.flight_number = si.flight_number AND bl.flight_date = si.flight_date
+                SET si.seats_remaining = si.seats_remaining + %s
+                WHERE bl.booking_id = %s
+            """, (row[0], booking_id))
+            cursor.execute("DELETE FROM booking_legs WHERE booking_id = %s", (booking_id,))
+            cursor.execute("DELETE FROM bookings WHERE booking_id = %s", (booking_id,))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def seats_remaining(self, flight_number, flight_date):
+        """Seats left on an occurrence, or the craft capacity if nothing is booked yet"""
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT COALESCE(si.seats_remaining, s.capacity)
+            FROM flights f
+            JOIN SpacecraftTypes s ON f.spacecraft_type = s.type_name
+            LEFT JOIN seat_inventory si
+                ON si.flight_number = f.flight_number AND si.flight_date = %s
+            WHERE f.flight_number = %s
+        """, (flight_date, flight_number))
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+
+
+def oversold_occurrences(db):
+    """Occurrences whose booked seats plus seats remaining differ from craft capacity"""
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT si.flight_number, si.flight_date, s.capacity, si.seats_remaining,
+               COALESCE(SUM(b.seats), 0) AS booked
+        FROM seat_inventory si
+        JOIN flights f ON f.flight_number = si.flight_number
+        JOIN SpacecraftTypes s ON f.spacecraft_type = s.type_name
+        LEFT JOIN booking_legs bl
+            ON bl.flight_number = si.flight_number AND bl.flight_date = si.flight_date
+        LEFT JOIN bookings b ON b.booking_id = bl.booking_id
+        GROUP BY si.flight_number, si.flight_date, s.capacity, si.seats_remaining
+        HAVING booked + si.seats_remaining <> s.capacity OR booked > s.capacity
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def run_load(flight_numbers, flight_date, clients=16, seconds=10.0, max_legs=3, seats=1,
+             connect_fn=connect):
+    """Hammer the booking path from several clients and report throughput and outcomes"""
+    counts = {"booked": 0, "sold_out": 0, "errors": 0, "retries": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        db = connect_fn()
+        engine = BookingEngine(db)
+        local = dict.fromkeys(counts, 0)
+        try:
+            while time.monotonic() < deadline:
+                legs = rng.sample(flight_numbers, rng.randint(1, min(max_legs, len(flight_numbers))))
+                try:
+                    engine.book([(f, flight_date) for f in legs], seats, f"load-{seed}")
+                    local["booked"] += 1
+                except SoldOut:
+                    local["sold_out"] += 1
+                except (BookingError, mysql.connector.Error):
+                    local["errors"] += 1
+            local["retries"] = engine.retries
+        finally:
+            db.close()
+            with lock:
+                for key, value in local.items():
+                    counts[key] += value
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    db = connect_fn()
+    try:
+        counts["oversold"] = len(oversold_occurrences(db))
+    finally:
+        db.close()
+    counts["attempts"] = counts["booked"] + counts["sold_out"] + counts["errors"]
+    counts["bookings_per_second"] = counts["booked"] / elapsed
+    counts["attempts_per_second"] = counts["attempts"] / elapsed
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent booking load generator")
+    parser.add_argument("flight_numbers", nargs="+", help="flights to book legs on")
+    parser.add_argument("--date", type=date.fromisoformat,
+                        default=date.today() + timedelta(days=1),
+                        help="flight date (YYYY-MM-DD); every flight must operate that weekday")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--max-legs", type=int, default=3)
+    parser.add_argument("--seats", type=int, default=1)
+    args = parser.parse_args()
+
+    db = connect()
+    create_booking_tables(db)
+    db.close()
+    result = run_load(args.flight_numbers, args.date, args.clients, args.seconds,
+                      args.max_legs, args.seats)
+    for key, value in result.items():
+        print(f"{key:>20}: {value:.1f}" if isinstance(value, float) else f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Read-through cache for departure, arrival and route query results.
+
+Entries are keyed by query name and normalized parameters, expire after a
+TTL and are evicted least recently used beyond max_entries. Every entry
+records the port ids its rows depend on. A write through enter_flight or
+enter_route drops the entries for its two ports at once. Writes made by
+other processes are picked up from change_log by sync(), at most once per
+sync_interval, through a ChangeCursor so that versions committed out of
+order are not skipped.
+
+Concurrent misses on the same key are coalesced: the first caller loads
+and the rest wait for its result, so a busy board costs one query per
+expiry. A load that overlaps an invalidation of one of its ports is
+returned to its callers but not stored.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from live_board import ChangeCursor
+
+
+class PendingLoad:
+    """One in-progress load that other callers of the same key wait on"""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QueryCache:
+    """TTL + LRU result cache with per-port invalidation and request coalescing"""
+
+    def __init__(self, ttl=30.0, max_entries=512, sync_interval=1.0, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.entries = OrderedDict()      # key -> (expires, value, port ids)
+        self.by_port = {}                 # port id -> keys cached for it
+        self.loading = {}                 # key -> PendingLoad
+        self.generation = 0               # bumped by every invalidation
+        self.invalidated_at = {}          # port id -> generation of its last invalidation
+        self.cleared_at = -1
+        self.changes = None               # ChangeCursor over change_log, started by the first sync()
+        self.synced_at = None
+        self.hits = self.misses = self.coalesced = 0
+
+    def get_or_load(self, key, load):
+        """Cached value for key, or the value of load() -> (value, port ids)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            pending = self.loading.get(key)
+            leader = pending is None
+            if leader:
+                pending = self.loading[key] = PendingLoad()
+                started = self.generation
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value, port_ids = load()
+        except BaseException as e:
+            pending.error = e
+            raise
+        else:
+            pending.value = value
+            with self.lock:
+                # Store unless a clear or an invalidation of its ports came after the load began
+                if self.cleared_at <= started and all(
+                        self.invalidated_at.get(port_id, -1) <= started for port_id in port_ids):
+                    self.store(key, value, port_ids)
+            return value
+        finally:
+            with self.lock:
+                del self.loading[key]
+            pending.done.set()
+
+    def store(self, key, value, port_ids):
+        """Insert under the lock, evicting least recently used entries past max_entries"""
+        self.discard(key)
+        self.entries[key] = (self.clock() + self.ttl, value, frozenset(port_ids))
+        for port_id in port_ids:
+            self.by_port.setdefault(port_id, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for port_id in entry[2]:
+            keys = self.by_port.get(port_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_port[port_id]
+
+    def invalidate_ports(self, port_ids):
+        """Drop every entry that depends on any of the ports"""
+        with self.lock:
+            self.generation += 1
+            for port_id in port_ids:
+                self.invalidated_at[port_id] = self.generation
+                for key in list(self.by_port.get(port_id, ())):
+                    self.discard(key)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.by_port.clear()
+            self.cleared_at = self.generation
+
+    def sync(self, db):
+        """Invalidate ports changed in change_log since the last sync, at most once per sync_interval"""
+        now = self.clock()
+        with self.lock:
+            if self.synced_at is not None and now - self.synced_at < self.sync_interval:
+                return
+            self.synced_at = now
+        # The cursor is not thread-safe; a sync already running covers this one
+        if not self.sync_lock.acquire(blocking=False):
+            return
+        try:
+            if self.changes is None:
+                changes = ChangeCursor()
+                changes.start(db)
+                self.changes = changes
+                return
+            ports = {row[1] for row in self.changes.read(db, "port_id")}
+        finally:
+            self.sync_lock.release()
+        if ports:
+            self.invalidate_ports(ports)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "coalesced": self.coalesced}
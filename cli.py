@@ -0,0 +1,240 @@
+"""Command-line entry point: the window's queries, search and inserts without Qt.
+
+Query output goes to stdout as JSON Lines (default) or CSV, or to a file
+with ``-o PATH`` in the format named by its extension (.csv, .jsonl,
+.parquet). Errors go to stderr and the exit status is non-zero, so the
+commands can be chained in scripts and cron jobs:
+
+    python cli.py departures "Luna Base" Monday Friday
+    python cli.py departures "Luna Base" 2026-11-02 2026-12-20
+    python cli.py --format csv find "Luna Base" "Mars Port" --day Monday --time 08:00
+    python cli.py import flights season.csv --validate
+    python cli.py export flights flights.parquet
+
+``import`` reads a CSV whose header names the columns in IMPORT_COLUMNS and
+inserts each row through the same checks as the insert forms.
+"""
+import argparse
+import csv
+import sys
+from functools import partial
+
+import mysql.connector
+
+from connection import DATABASE, connect
+from core import ITINERARY_COLUMNS, SpaceTravelCore, ValidationError, itinerary_rows
+from dated_schedule import is_date
+from export import export_rows, stream_csv, stream_jsonl
+from paging import ResultPager
+
+# kind -> CSV columns, in the order the core insert takes them
+IMPORT_COLUMNS = {
+    "planets": ("planet_name", "size", "population"),
+    "stations": ("station_name", "planet_associated"),
+    "spaceports": ("port_name", "planet_associated", "spacestation_name", "fee", "capacity"),
+    "spacecraft": ("type_name", "capacity", "max_range"),
+    "routes": ("origin_name", "dest_name", "distance"),
+    "flights": ("flight_number", "route_id", "spacecraft_type", "days", "departure_time", "flight_duration"),
+}
+INTEGER_COLUMNS = {"size", "population", "fee", "capacity", "max_range", "distance", "route_id"}
+OPTIONAL_COLUMNS = {"planet_associated", "spacestation_name"}
+
+EXPORT_TABLES = ("planets", "spacestations", "spaceports", "SpacecraftTypes", "routes",
+                 "flights", "flight_schedule", "port_adjacency")
+
+
+def write_output(args, columns, rows):
+    if args.output:
+        export_rows(args.output, columns, rows)
+    elif args.format == "csv":
+        stream_csv(sys.stdout, columns, rows)
+    else:
+        stream_jsonl(sys.stdout, columns, rows)
+
+
+def write_query(args, query):
+    """Stream a (sql, params, transform) query from its own unbuffered connection"""
+    sql, params, transform = query
+    pager = ResultPager(sql, params, transform, count=False, connect_fn=args.connect)
+    try:
+        write_output(args, pager.columns, pager)
+    finally:
+        pager.close()
+
+
+def port_ids(core, *names):
+    ids = [core.port_id(name) for name in names]
+    missing = [name for name, port_id in zip(names, ids) if port_id is None]
+    if missing:
+        raise ValidationError(f"Spaceport '{missing[0]}' not found.", "Not Found")
+    return ids
+
+
+def run_connected_ports(core, args):
+    write_query(args, core.connected_ports_query(args.port))
+
+
+def run_departures(core, args):
+    if is_date(args.start_day) and is_date(args.end_day):
+        write_output(args, *core.dated_departures(args.start_day, args.end_day, args.port))
+    else:
+        write_query(args, core.departures_query(args.start_day, args.end_day, args.port))
+
+
+def run_arrivals(core, args):
+    if is_date(args.start_day) and is_date(args.end_day):
+        write_output(args, *core.dated_arrivals(args.start_day, args.end_day, args.port))
+    else:
+        write_query(args, core.arrivals_query(args.start_day, args.end_day, args.port))
+
+
+def run_flights_by_route(core, args):
+    origin_id, dest_id = port_ids(core, args.origin, args.dest)
+    write_query(args, core.flights_by_route_query(origin_id, dest_id))
+
+
+def run_find(core, args):
+    results = core.find_itineraries(args.day, args.origin, args.dest, args.time,
+                                    args.max_stops, args.max_hours, args.memoize)
+    write_output(args, ITINERARY_COLUMNS, itinerary_rows(results))
+
+
+def import_values(kind, record, core):
+    values = []
+    for column in IMPORT_COLUMNS[kind]:
+        value = (record.get(column) or "").strip()
+        if column in OPTIONAL_COLUMNS:
+            value = value or None
+        elif column in INTEGER_COLUMNS:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValidationError(f"{column} must be an integer, got '{value}'.", "Invalid Input")
+        elif column == "departure_time":
+            value = core.parse_time(value)
+        values.append(value)
+    return values
+
+
+def run_import(core, args):
+    core.create_nonexisting_tables()
+    with open(args.path, newline="") as file:
+        reader = csv.DictReader(file)
+        missing = set(IMPORT_COLUMNS[args.kind]) - OPTIONAL_COLUMNS - set(reader.fieldnames or ())
+        if missing:
+            raise ValidationError(f"{args.path} is missing columns: {', '.join(sorted(missing))}.")
+        records = list(reader)
+
+    if args.kind == "flights" and args.validate:
+        from timetable_validator import validate_against_db
+
+        flights = [tuple(record[column] for column in IMPORT_COLUMNS["flights"]) for record in records]
+        violations = validate_against_db(core.db, flights)
+        for violation in violations:
+            print(f"{violation.rule}\t{violation.subject}\t{violation.message}", file=sys.stderr)
+        if violations:
+            raise ValidationError(f"{len(violations)} timetable violations; nothing was imported.")
+
+    insert = {
+        "planets": lambda v: core.enter_planet(*v),
+        "stations": lambda v: core.enter_spacestation(v[0], None, v[1]),
+        "spaceports": lambda v: core.enter_spaceport(*v),
+        "spacecraft": lambda v: core.enter_spacecraft(*v),
+        "routes": lambda v: core.enter_route(*v),
+        "flights": lambda v: core.enter_flight(*v),
+    }[args.kind]
+
+    failed = round_trips = 0
+    # Line 1 is the header
+    for line, record in enumerate(records, start=2):
+        core.last_round_trips = 0
+        try:
+            insert(import_values(args.kind, record, core))
+        except (ValidationError, ValueError, mysql.connector.Error) as e:
+            failed += 1
+            print(f"{args.path}:{line}: {e}", file=sys.stderr)
+        round_trips += core.last_round_trips
+    print(f"{len(records) - failed} of {len(records)} {args.kind} imported", file=sys.stderr)
+    if args.kind == "flights" and records:
+        print(f"{round_trips / len(records):.1f} database round trips per flight", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_export(core, args):
+    args.output = args.path
+    write_query(args, (f"SELECT * FROM {args.table}", (), None))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Space travel database queries and imports")
+    parser.add_argument("--database", default=DATABASE)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--credentials", default="credentials.json", help="JSON file with user and password")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="stdout format")
+    parser.add_argument("-o", "--output", help="write to a .csv, .jsonl or .parquet file instead")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("connected-ports", help="ports with routes to or from a port")
+    command.add_argument("port")
+    command.set_defaults(run=run_connected_ports)
+
+    for name, run in (("departures", run_departures), ("arrivals", run_arrivals)):
+        command = commands.add_parser(name, help=f"{name} at a port over a weekday or calendar date range")
+        command.add_argument("port")
+        command.add_argument("start_day", help="weekday name, or YYYY-MM-DD for dated occurrences")
+        command.add_argument("end_day", help="weekday name, or YYYY-MM-DD")
+        command.set_defaults(run=run)
+
+    command = commands.add_parser("flights-by-route", help="flights between two ports")
+    command.add_argument("origin")
+    command.add_argument("dest")
+    command.set_defaults(run=run_flights_by_route)
+
+    command = commands.add_parser("find", help="flight finder itineraries, one row per leg")
+    command.add_argument("origin")
+    command.add_argument("dest")
+    command.add_argument("--day", required=True, help="departure weekday")
+    command.add_argument("--time", required=True, help="desired departure time (HH:MM)")
+    command.add_argument("--max-stops", type=int, default=2)
+    command.add_argument("--max-hours", type=float, default=24.0)
+    command.add_argument("--memoize", action="store_true",
+                         help="share sub-searches between branches (same results, faster on dense networks)")
+    command.set_defaults(run=run_find)
+
+    command = commands.add_parser("import", help="insert rows from a CSV file")
+    command.add_argument("kind", choices=sorted(IMPORT_COLUMNS))
+    command.add_argument("path")
+    command.add_argument("--validate", action="store_true",
+                         help="flights only: check the whole file first and import nothing if it fails")
+    command.set_defaults(run=run_import)
+
+    command = commands.add_parser("export", help="write a whole table to a file")
+    command.add_argument("table", choices=EXPORT_TABLES)
+    command.add_argument("path", help=".csv, .jsonl or .parquet")
+    command.set_defaults(run=run_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.connect = partial(connect, args.database, args.credentials, host=args.host)
+
+    try:
+        core = SpaceTravelCore(args.connect())
+    except (OSError, mysql.connector.Error) as e:
+        print(f"Failed to connect to database: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.run(core, args) or 0
+    except ValidationError as e:
+        print(f"{e.title}: {e}", file=sys.stderr)
+        return 1
+    except (ValueError, RuntimeError, mysql.connector.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        core.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""MySQL connection helpers shared by the main window and its result readers."""
+import json
+
+import mysql.connector
+
+DATABASE = "dbproject"
+
+
+def load_credentials(path="credentials.json"):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def connect(database=DATABASE, credentials_path="credentials.json", **options):
+    """Open a new connection using the credentials file"""
+    credentials = load_credentials(credentials_path)
+    return mysql.connector.connect(
+        host=options.pop("host", "localhost"),
+        user=credentials["user"],
+        password=credentials["password"],
+        database=database,
+        **options
+    )
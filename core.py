@@ -0,0 +1,891 @@
+"""Database logic shared by the desktop window and the command line.
+
+Nothing here imports Qt. SpaceTravelCore owns the schema, the inserts with
+their validation rules, the query builders and the flight finder search.
+A broken rule raises ValidationError carrying the message (and dialog
+title) the window shows. Inserts call the ``confirm`` callback before
+committing (enter_flight before it starts its write transaction); the
+window asks the user there, scripts pass nothing and every insert is
+confirmed.
+
+Given a cache.QueryCache, departures(), arrivals() and flights_by_route()
+read through it, and enter_flight/enter_route invalidate their two ports.
+"""
+import struct
+from collections import namedtuple
+
+import mysql.connector
+
+from dated_schedule import DATED_COLUMNS, dated_board, parse_date
+from fares import FareEngine
+from flight_search import search_itineraries, search_itineraries_memo
+from live_board import DIRECTIONS, log_change
+from name_index import NameIndex
+from rows import FLIGHT_COLUMNS, Flight, fetch_rows
+from schedule import (ADJACENCY_DAY_COLUMNS, DAYS_OF_WEEK, TIME_FORMAT, day_bit, days_to_mask,
+                      day_range, day_range_mask, format_days, normalize_day)
+from spacecraft_catalog import SpacecraftCatalog
+
+# Boards and route lists longer than this are streamed through a pager instead of cached
+CACHE_MAX_ROWS = 2000
+
+ITINERARY_COLUMNS = ["itinerary", "leg", "flight_number", "origin_id", "dest_id",
+                     "departure_time", "flight_duration", "spacecraft_type", "total_time", "fare"]
+
+
+# What enter_flight validates against; day_counts are flights touching the port, Monday first
+PortFacts = namedtuple("PortFacts", ["planet_associated", "capacity", "day_counts"])
+FlightFacts = namedtuple("FlightFacts", ["distance", "origin_id", "dest_id", "max_range", "ports"])
+
+
+class CountingCursor:
+    """A cursor that counts the statements, commits and rollbacks it sends"""
+
+    def __init__(self, db):
+        self.db = db
+        self.cursor = db.cursor()
+        self.round_trips = 0
+
+    def execute(self, operation, params=()):
+        self.round_trips += 1
+        return self.cursor.execute(operation, params)
+
+    def executemany(self, operation, seq_params):
+        # The connector sends a multi-row INSERT as one statement
+        self.round_trips += 1
+        return self.cursor.executemany(operation, seq_params)
+
+    def commit(self):
+        self.round_trips += 1
+        self.db.commit()
+
+    def rollback(self):
+        self.round_trips += 1
+        self.db.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class ValidationError(Exception):
+    """An input broke a rule; nothing was written"""
+
+    def __init__(self, message, title="Validation Error"):
+        super().__init__(message)
+        self.title = title
+
+
+def itinerary_rows(results):
+    """One row per leg, numbered by itinerary, in ITINERARY_COLUMNS order"""
+    for number, (path, total_time, fare) in enumerate(results, start=1):
+        for leg, f in enumerate(path, start=1):
+            yield (number, leg, f.flight_number, f.origin_id, f.dest_id,
+                   f.departure_time, f.flight_duration, f.spacecraft_type, total_time, fare)
+
+
+class SpaceTravelCore:
+    """Schema, inserts and queries over one connection"""
+
+    ADJACENCY_DAY_COLUMNS = ADJACENCY_DAY_COLUMNS
+
+    def __init__(self, db, confirm=None, cache=None):
+        self.db = db
+        self.confirm = confirm or (lambda: True)
+        self.cache = cache
+        # Statements plus commits sent by the last enter_flight
+        self.last_round_trips = 0
+        self.fares = FareEngine(db)
+        self.snapshot = None
+        # Built from the database the first time they are needed
+        self._names = None
+        self._crafts = None
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = NameIndex.from_db(self.db)
+        return self._names
+
+    @property
+    def crafts(self):
+        if self._crafts is None:
+            self._crafts = SpacecraftCatalog.from_db(self.db)
+        return self._crafts
+
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.db.close()
+
+    # Schema
+    def create_planet_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS planets (
+        planet_name VARCHAR(50) NOT NULL UNIQUE,
+        size BIGINT NOT NULL,
+        population BIGINT NOT NULL,
+        PRIMARY KEY (planet_name)
+        )
+        """)
+        self.db.commit()
+
+    def create_spacestation_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS spacestations (
+            station_name VARCHAR(50) NOT NULL PRIMARY KEY,
+            planet_associated VARCHAR(50) DEFAULT NULL,
+            FOREIGN KEY (planet_associated) REFERENCES planets(planet_name) 
+        )
+        """)
+        self.db.commit()
+
+    def create_spaceports_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS spaceports (
+            spaceport_id INT PRIMARY KEY AUTO_INCREMENT,
+            port_name VARCHAR(100) NOT NULL,
+            planet_associated VARCHAR(50) NULL,
+            spacestation_name VARCHAR(50) NULL,
+            capacity INT NOT NULL,
+            fee INT NOT NULL,
+            FOREIGN KEY (planet_associated) REFERENCES planets(planet_name),
+            FOREIGN KEY (spacestation_name) REFERENCES spacestations(spacestation_name),
+            UNIQUE KEY uq_station (spacestation_name),
+            UNIQUE KEY uq_planet_port (planet_associated, port_name),
+            CONSTRAINT chk_spaceport_capacity CHECK (capacity > 0),
+            CONSTRAINT chk_spaceport_fee CHECK (fee >= 0)
+        )
+        """)
+        self.db.commit()
+
+    def create_spacecrafts_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SpacecraftTypes (
+        type_name VARCHAR(100) PRIMARY KEY,
+        capacity  INT NOT NULL,
+        max_range     INT NOT NULL,
+        CONSTRAINT chk_sc_capacity CHECK (capacity > 0),
+        CONSTRAINT chk_sc_range    CHECK (max_range > 0)
+        )
+        """)
+        self.db.commit()
+
+    def create_routes_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS routes (
+            route_id INT PRIMARY KEY AUTO_INCREMENT,
+            origin_id INT NOT NULL,
+            dest_id INT NOT NULL,
+            dist INT NOT NULL,
+            FOREIGN KEY (origin_id) REFERENCES spaceports(spaceport_id),
+            FOREIGN KEY (dest_id) REFERENCES spaceports(spaceport_id),
+            CONSTRAINT chk_route_distance CHECK (dist > 0),
+            CONSTRAINT chk_route_not_same CHECK (origin_id <> dest_id),
+            CONSTRAINT uq_route_pair UNIQUE (origin_id, dest_id)
+        )
+        """)
+        self.db.commit()
+
+    def create_flight_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS flights (
+        flight_number   VARCHAR(20) PRIMARY KEY,
+        route_id        INT NOT NULL,
+        spacecraft_type VARCHAR(100) NOT NULL,
+        departure_time TIME NOT NULL,
+        flight_duration DECIMAL(4,2) NOT NULL,
+        schedule_mask TINYINT UNSIGNED NOT NULL DEFAULT 0,
+        FOREIGN KEY (route_id) REFERENCES routes(route_id),
+        FOREIGN KEY (spacecraft_type) REFERENCES SpacecraftTypes(type_name),
+        CONSTRAINT chk_flight_duration CHECK (flight_duration > 0)
+        )
+        """)
+        self.db.commit()
+
+    def create_flight_schedule_table(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS flight_schedule (
+            flight_number VARCHAR(20) NOT NULL,
+            day_of_week   ENUM(
+                'Monday','Tuesday','Wednesday',
+                'Thursday','Friday','Saturday','Sunday'
+            ) NOT NULL,
+            PRIMARY KEY (flight_number, day_of_week),
+            FOREIGN KEY (flight_number) REFERENCES flights(flight_number)
+        )
+        """)
+        self.db.commit()
+
+    def create_port_adjacency_table(self, cursor):
+        """Neighbors of each port in both directions, with weekly flight counts per day"""
+        day_columns = "".join(f"{c} SMALLINT UNSIGNED NOT NULL DEFAULT 0,\n            "
+                              for c in self.ADJACENCY_DAY_COLUMNS)
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS port_adjacency (
+            port_id INT NOT NULL,
+            neighbor_id INT NOT NULL,
+            direction ENUM('out', 'in') NOT NULL,
+            route_id INT NOT NULL,
+            {day_columns}PRIMARY KEY (port_id, neighbor_id, direction),
+            KEY idx_adjacency_route (route_id),
+            FOREIGN KEY (port_id) REFERENCES spaceports(spaceport_id),
+            FOREIGN KEY (neighbor_id) REFERENCES spaceports(spaceport_id),
+            FOREIGN KEY (route_id) REFERENCES routes(route_id)
+        )
+        """)
+
+        # Backfill from the existing routes and flight masks
+        columns = ", ".join(self.ADJACENCY_DAY_COLUMNS)
+        counts = ", ".join(f"COALESCE(SUM((f.schedule_mask >> {i}) & 1), 0)"
+                           for i in range(len(DAYS_OF_WEEK)))
+        for port, neighbor, direction in (("origin_id", "dest_id", "out"), ("dest_id", "origin_id", "in")):
+            cursor.execute(f"""
+            INSERT INTO port_adjacency (port_id, neighbor_id, direction, route_id, {columns})
+            SELECT r.{port}, r.{neighbor}, '{direction}', r.route_id, {counts}
+            FROM routes r
+            LEFT JOIN flights f ON f.route_id = r.route_id
+            GROUP BY r.route_id, r.{port}, r.{neighbor}
+            """)
+        self.db.commit()
+
+    def create_change_log_table(self, cursor):
+        """Append-only log of flight and route changes, read by live boards per port"""
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            version BIGINT PRIMARY KEY AUTO_INCREMENT,
+            port_id INT NOT NULL,
+            entity ENUM('flight', 'route') NOT NULL,
+            entity_key VARCHAR(20) NOT NULL,
+            operation ENUM('insert', 'update', 'delete') NOT NULL DEFAULT 'insert',
+            changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_change_port_version (port_id, version)
+        )
+        """)
+        self.db.commit()
+
+    def add_port_name_index(self, cursor):
+        cursor.execute("CREATE INDEX idx_port_name ON spaceports (port_name)")
+        self.db.commit()
+
+    def index_exists(self, cursor, table, index):
+        """Check if a named index exists on a table"""
+        cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index,))
+        return bool(cursor.fetchall())
+
+    def existing_tables(self, cursor):
+        """Names of every table in the database, spelled as SHOW TABLES reports them"""
+        cursor.execute("SHOW TABLES")
+        return {x[0] for x in cursor.fetchall()}
+
+    def column_exists(self, cursor, table, column):
+        """Check if a column exists on a table"""
+        cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+        return cursor.fetchone() is not None
+
+    def add_schedule_mask_column(self, cursor):
+        """Add flights.schedule_mask to an older database and fill it from flight_schedule"""
+        cursor.execute("""
+        ALTER TABLE flights
+            ADD COLUMN schedule_mask TINYINT UNSIGNED NOT NULL DEFAULT 0
+        """)
+        cursor.execute("""
+        UPDATE flights f
+        JOIN (
+            SELECT flight_number, BIT_OR(1 << (day_of_week - 1)) AS mask
+            FROM flight_schedule
+            GROUP BY flight_number
+        ) fs ON fs.flight_number = f.flight_number
+        SET f.schedule_mask = fs.mask
+        """)
+        self.db.commit()
+
+    def create_nonexisting_tables(self):
+        """Create tables if they don't exist"""
+        cursor = self.db.cursor()
+        tables = self.existing_tables(cursor)
+
+        if "planets" not in tables:
+            self.create_planet_table(cursor)
+        if "spacestations" not in tables:
+            self.create_spacestation_table(cursor)
+        if "spaceports" not in tables:
+            self.create_spaceports_table(cursor)
+        if "SpacecraftTypes" not in tables:
+            self.create_spacecrafts_table(cursor)
+        if "routes" not in tables:
+            self.create_routes_table(cursor)
+        if "flights" not in tables:
+            self.create_flight_table(cursor)
+        if "flight_schedule" not in tables:
+            self.create_flight_schedule_table(cursor)
+        if not self.column_exists(cursor, "flights", "schedule_mask"):
+            self.add_schedule_mask_column(cursor)
+        if not self.index_exists(cursor, "spaceports", "idx_port_name"):
+            self.add_port_name_index(cursor)
+        if "port_adjacency" not in tables:
+            self.create_port_adjacency_table(cursor)
+        if "change_log" not in tables:
+            self.create_change_log_table(cursor)
+        if "booking_legs" not in tables:
+            from booking import create_booking_tables
+            create_booking_tables(self.db)
+
+    def add_route_adjacency(self, cursor, route_id, origin_id, dest_id):
+        """Record a new route as an outbound neighbor of its origin and an inbound one of its destination"""
+        cursor.executemany(
+            "INSERT INTO port_adjacency (port_id, neighbor_id, direction, route_id) VALUES (%s, %s, %s, %s)",
+            [(origin_id, dest_id, 'out', route_id), (dest_id, origin_id, 'in', route_id)]
+        )
+
+    def count_route_flights(self, cursor, route_id, days):
+        """Add one weekly flight on each given day to both adjacency entries of a route"""
+        columns = [self.ADJACENCY_DAY_COLUMNS[DAYS_OF_WEEK.index(day)] for day in days]
+        assignments = ", ".join(f"{c} = {c} + 1" for c in columns)
+        cursor.execute(f"UPDATE port_adjacency SET {assignments} WHERE route_id = %s", (route_id,))
+
+    # Inserts
+    def parse_time(self, time_str):
+        """
+        Accepts 'HH:MM' or 'HH:MM:SS' (or even 'YYYY-MM-DD HH:MM:SS').
+        Returns a string 'HH:MM:SS' suitable for MySQL TIME.
+        """
+        # strip date if present
+        if ' ' in time_str:
+            time_part = time_str.split(' ')[1]
+        else:
+            time_part = time_str
+
+        parts = time_part.split(':')
+        if len(parts) == 2:
+            hh, mm = parts
+            ss = '00'
+        elif len(parts) == 3:
+            hh, mm, ss = parts
+        else:
+            raise ValueError(f"Unrecognized time format: {time_str}")
+
+        # zero-pad and validate ranges
+        hh, mm, ss = hh.zfill(2), mm.zfill(2), ss.zfill(2)
+        return f"{hh}:{mm}:{ss}"
+
+    def confirm_and_commit(self, sql, values):
+        """Execute an insert and commit it if confirm() agrees; False if it was declined"""
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(sql, values)
+            if not self.confirm():
+                self.db.rollback()
+                return False
+            self.db.commit()
+            return True
+        except mysql.connector.Error:
+            self.db.rollback()
+            raise
+
+    def enter_planet(self, planet_name, size, population):
+        if not planet_name.strip():
+            raise ValidationError("Planet name cannot be empty.")
+        if not isinstance(size, int) or size <= 0:
+            raise ValidationError("Planet size must be a positive integer.")
+        if not isinstance(population, int) or population < 0:
+            raise ValidationError("Population must be a non-negative integer.")
+
+        sql = """INSERT INTO planets VALUES (%s, %s, %s)"""
+        values = [planet_name, size, population]
+        if not self.confirm_and_commit(sql, values):
+            return False
+        self.names.add(planet_name, "planet")
+        return True
+
+    def enter_spacestation(self, station_name, has_spaceport, planet_associated):
+        if not station_name.strip():
+            raise ValidationError("Station name cannot be empty.")
+
+        if planet_associated and not planet_associated.strip():
+            raise ValidationError("Planet associated must be a valid string or NULL.")
+
+        cursor = self.db.cursor()
+        cursor.execute("SELECT COUNT(*) FROM planets WHERE planet_name = %s", (planet_associated,))
+        if planet_associated and cursor.fetchone()[0] == 0:
+            raise ValidationError(f"Planet '{planet_associated}' does not exist.")
+
+        sql = """INSERT INTO spacestations (station_name, planet_associated) VALUES (%s, %s)"""
+        values = [station_name, planet_associated]
+        if not self.confirm_and_commit(sql, values):
+            return False
+        self.names.add(station_name, "station")
+        return True
+
+    def enter_spaceport(self, port_name, planet_associated, spacestation_name, fee, capacity):
+        if not port_name.strip():
+            raise ValidationError("Port name cannot be empty.")
+        if planet_associated is None and spacestation_name is None:
+            raise ValidationError("Must be owned by either a planet or a spacestation.")
+        if not isinstance(fee, int) or fee < 0:
+            raise ValidationError("Fee must be a non-negative integer.")
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValidationError("Capacity must be a positive integer.")
+        if planet_associated is None and spacestation_name is not None:
+            if port_name != spacestation_name:
+                raise ValidationError("Port name must match station name if owned by a spacestation.")
+        if planet_associated and spacestation_name:
+            raise ValidationError("A spaceport cannot belong to both a planet and a station.")
+
+        cursor = self.db.cursor()
+        if planet_associated:
+            cursor.execute("SELECT COUNT(*) FROM planets WHERE planet_name = %s", (planet_associated,))
+            if cursor.fetchone()[0] == 0:
+                raise ValidationError(f"Planet '{planet_associated}' does not exist.")
+
+        if spacestation_name:
+            cursor.execute("SELECT COUNT(*) FROM spacestations WHERE station_name = %s", (spacestation_name,))
+            if cursor.fetchone()[0] == 0:
+                raise ValidationError(f"Station '{spacestation_name}' does not exist.")
+
+        sql = """INSERT INTO spaceports (port_name, planet_associated, spacestation_name, fee, capacity) VALUES (%s, %s, %s, %s, %s)"""
+        values = [port_name, planet_associated, spacestation_name, fee, capacity]
+        if not self.confirm_and_commit(sql, values):
+            return False
+        self.fares.invalidate()
+        self.names.add(port_name, "spaceport")
+        return True
+
+    def enter_spacecraft(self, type_name, capacity, range):
+        if not type_name.strip():
+            raise ValidationError("Type name cannot be empty.")
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValidationError("Capacity must be a positive integer.")
+        if not isinstance(range, int) or range <= 0:
+            raise ValidationError("Range must be a positive integer.")
+
+        sql = """INSERT INTO SpacecraftTypes VALUES (%s, %s, %s)"""
+        values = [type_name, capacity, range]
+        if not self.confirm_and_commit(sql, values):
+            return False
+        self.crafts.add(type_name, capacity, range)
+        return True
+
+    def enter_flight(self, flight_number, route_id, spacecraft_type, days_raw, departure_time, flight_duration):
+        # Validate flight number
+        if not flight_number.strip():
+            raise ValidationError("Flight number cannot be empty.")
+
+        # Parse and validate days
+        try:
+            schedule_mask = days_to_mask(days_raw.split(','))
+        except ValueError as e:
+            raise ValidationError(str(e))
+        days = [day for day in DAYS_OF_WEEK if schedule_mask & day_bit(day)]
+
+        # Validate duration
+        try:
+            duration_val = float(flight_duration)
+            if duration_val <= 0:
+                raise ValueError
+        except ValueError:
+            raise ValidationError("Flight duration must be a positive number.")
+
+        # Count what is actually sent, across retries, for last_round_trips
+        cursor = CountingCursor(self.db)
+        try:
+            return self.validate_and_insert_flight(cursor, flight_number, route_id, spacecraft_type, days,
+                                                   schedule_mask, departure_time, duration_val)
+        finally:
+            self.last_round_trips = cursor.round_trips
+            cursor.close()
+
+    def validate_and_insert_flight(self, cursor, flight_number, route_id, spacecraft_type, days, schedule_mask,
+                                   departure_time, duration_val):
+        # Every fact the rules below need, in one round trip
+        facts = self.flight_facts(cursor, route_id, spacecraft_type)
+
+        # Validate route exists
+        if facts.distance is None:
+            raise ValidationError(f"Route ID {route_id} does not exist.")
+
+        # Validate spacecraft type exists
+        if facts.max_range is None:
+            raise ValidationError(f"Spacecraft type '{spacecraft_type}' does not exist.")
+
+        dist = facts.distance
+        max_range = facts.max_range
+        if dist > max_range:
+            raise ValidationError(f"Route distance {dist} exceeds craft range {max_range}.")
+
+        # Enforce spaceport daily capacity (before inserting)
+        origin_id, dest_id = facts.origin_id, facts.dest_id
+        self.check_capacity(facts, days)
+
+        # Validate time format
+        if not TIME_FORMAT.match(departure_time):
+            raise ValidationError("Invalid time format.")
+
+        # Check for same-planet violation
+        planet1 = facts.ports[origin_id].planet_associated
+        planet2 = facts.ports[dest_id].planet_associated
+        if planet1 and planet2 and planet1 == planet2:
+            raise ValidationError("Flights are not allowed between spaceports on the same planet.")
+
+        # End the read snapshot the checks ran in, then ask before writing anything
+        cursor.rollback()
+        if not self.confirm():
+            return False
+
+        # Imported here so that startup does not load the booking engine
+        from booking import MAX_ATTEMPTS, RETRYABLE_ERRORS
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                self.insert_flight(cursor, flight_number, route_id, origin_id, dest_id, spacecraft_type,
+                                   departure_time, duration_val, schedule_mask, days)
+                break
+            except mysql.connector.Error as err:
+                if err.errno not in RETRYABLE_ERRORS or attempt == MAX_ATTEMPTS - 1:
+                    raise
+        self.invalidate_ports(origin_id, dest_id)
+
+        return True
+
+    def check_capacity(self, facts, days):
+        for day in days:
+            for port_id in (facts.origin_id, facts.dest_id):
+                port = facts.ports[port_id]
+                count = port.day_counts[DAYS_OF_WEEK.index(day)]
+                capacity = port.capacity
+
+                if count >= capacity:
+                    raise ValidationError(
+                        f"Port ID {port_id} has reached its daily capacity ({capacity}) on {day}.",
+                        "Capacity Error"
+                    )
+
+    def insert_flight(self, cursor, flight_number, route_id, origin_id, dest_id, spacecraft_type,
+                      departure_time, duration, schedule_mask, days):
+        """Insert a validated flight with its schedule in one transaction, through a CountingCursor
+
+        Both endpoint ports are locked (lower id first) before their load is
+        recounted, so concurrent writers on a port take turns and cannot
+        overrun its capacity between the check and the insert.
+        """
+        try:
+            cursor.execute(
+                "SELECT spaceport_id FROM spaceports WHERE spaceport_id IN (%s, %s) "
+                "ORDER BY spaceport_id FOR UPDATE",
+                (origin_id, dest_id)
+            )
+            cursor.fetchall()
+            # First plain read of the transaction, so it sees everything committed before the lock
+            facts = self.flight_facts(cursor, route_id, spacecraft_type)
+            self.check_capacity(facts, days)
+
+            cursor.execute(
+                "INSERT INTO flights "
+                "(flight_number, route_id, spacecraft_type, departure_time, flight_duration, schedule_mask) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (flight_number, route_id, spacecraft_type, departure_time, duration, schedule_mask)
+            )
+            cursor.execute(
+                "INSERT INTO flight_schedule (flight_number, day_of_week) VALUES "
+                + ", ".join(["(%s, %s)"] * len(days)),
+                [value for day in days for value in (flight_number, day)]
+            )
+            self.count_route_flights(cursor, route_id, days)
+            log_change(cursor, "flight", flight_number, {origin_id, dest_id})
+            cursor.commit()
+        except Exception:
+            cursor.rollback()
+            raise
+
+    def flight_facts(self, cursor, route_id, spacecraft_type):
+        """FlightFacts for a candidate flight: route, craft and both ports' daily load, in one query"""
+        # port_adjacency holds each route's flights per weekday at both of its ends
+        day_counts = ", ".join(f"COALESCE(SUM(a.{column}), 0)" for column in self.ADJACENCY_DAY_COLUMNS)
+        # One row per endpoint port (a single row of NULLs if the route does not exist)
+        cursor.execute(f"""
+            SELECT r.distance, r.origin_id, r.dest_id, c.max_range,
+                   p.spaceport_id, p.planet_associated, p.capacity,
+                   {day_counts}
+            FROM (SELECT %s AS route_id, %s AS type_name) AS candidate
+            LEFT JOIN routes r ON r.route_id = candidate.route_id
+            LEFT JOIN SpacecraftTypes c ON c.type_name = candidate.type_name
+            LEFT JOIN spaceports p ON p.spaceport_id IN (r.origin_id, r.dest_id)
+            LEFT JOIN port_adjacency a ON a.port_id = p.spaceport_id
+            GROUP BY r.distance, r.origin_id, r.dest_id, c.max_range,
+                     p.spaceport_id, p.planet_associated, p.capacity
+        """, (route_id, spacecraft_type))
+        rows = cursor.fetchall()
+        distance, origin_id, dest_id, max_range = rows[0][:4]
+        ports = {row[4]: PortFacts(row[5], row[6], [int(count) for count in row[7:]])
+                 for row in rows if row[4] is not None}
+        return FlightFacts(distance, origin_id, dest_id, max_range, ports)
+
+    def enter_route(self, origin_name, dest_name, distance):
+        """Insert a route and return its route_id"""
+        if origin_name == dest_name:
+            raise ValidationError("Origin and destination spaceports must be different.")
+
+        if distance <= 0:
+            raise ValidationError("Distance must be a positive integer.")
+
+        cursor = self.db.cursor()
+
+        # Get spaceport IDs and planet names from names
+        cursor.execute("SELECT spaceport_id, planet_associated FROM spaceports WHERE port_name = %s", (origin_name,))
+        origin_result = cursor.fetchone()
+        if not origin_result:
+            raise ValidationError(f"Origin spaceport '{origin_name}' not found.")
+        origin_id, origin_planet = origin_result
+
+        cursor.execute("SELECT spaceport_id, planet_associated FROM spaceports WHERE port_name = %s", (dest_name,))
+        dest_result = cursor.fetchone()
+        if not dest_result:
+            raise ValidationError(f"Destination spaceport '{dest_name}' not found.")
+        dest_id, dest_planet = dest_result
+
+        # Enforce no routes between spaceports on the same planet
+        if origin_planet and dest_planet and origin_planet == dest_planet:
+            raise ValidationError("Routes are not allowed between spaceports on the same planet.")
+
+        # Check for duplicates using IDs
+        cursor.execute("SELECT COUNT(*) FROM routes WHERE origin_id = %s AND dest_id = %s", (origin_id, dest_id))
+        if cursor.fetchone()[0] > 0:
+            raise ValidationError("This route already exists.")
+
+        # Insert route manually, together with its adjacency entries
+        try:
+            cursor.execute("INSERT INTO routes (origin_id, dest_id, distance) VALUES (%s, %s, %s)", (origin_id, dest_id, distance))
+            route_id = cursor.lastrowid
+            self.add_route_adjacency(cursor, route_id, origin_id, dest_id)
+            log_change(cursor, "route", route_id, (origin_id, dest_id))
+            self.db.commit()
+        except mysql.connector.Error:
+            self.db.rollback()
+            raise
+        self.invalidate_ports(origin_id, dest_id)
+
+        return route_id
+
+    # Queries, each builder returning (sql, params, row transform) for paging or export
+    def connected_ports_query(self, port_name):
+        weekly = " + ".join(f"a.{c}" for c in self.ADJACENCY_DAY_COLUMNS)
+        sql = f"""
+            SELECT a.neighbor_id AS other_port_id,
+                sp2.port_name AS other_port_name,
+                SUM({weekly}) AS weekly_flights
+            FROM spaceports sp
+            JOIN port_adjacency a ON a.port_id = sp.spaceport_id
+            JOIN spaceports sp2 ON sp2.spaceport_id = a.neighbor_id
+            WHERE sp.port_name = %s
+            GROUP BY a.neighbor_id, sp2.port_name
+        """
+        return sql, (port_name,), None
+
+    def port_schedule_query(self, start_day, end_day, port_name, port_column):
+        """Flights touching a port on any day of a (possibly wrapping) weekday range"""
+        days = day_range(start_day, end_day)
+        range_mask = day_range_mask(start_day, end_day)
+        sql = f"""
+            SELECT f.flight_number, f.schedule_mask & %s AS days, f.departure_time, f.flight_duration,
+                   r.distance AS distance, f.spacecraft_type
+            FROM flights f
+            JOIN routes r
+                ON f.route_id = r.route_id
+            JOIN spaceports sp
+                ON {port_column} = sp.spaceport_id
+            WHERE sp.port_name = %s
+            AND f.schedule_mask & %s <> 0
+            ORDER BY f.departure_time, f.flight_number
+        """
+        return (sql, (range_mask, port_name, range_mask),
+                lambda r: (r[0], format_days(r[1], days)) + tuple(r[2:]))
+
+    def flights_by_route_query(self, origin_id, destination_id):
+        sql = """
+            SELECT f.flight_number, f.schedule_mask AS days, f.departure_time, f.flight_duration, 
+                   sp1.port_name AS origin, sp2.port_name AS destination, r.distance AS distance, f.spacecraft_type
+            FROM flights f
+            JOIN routes r
+                ON f.route_id = r.route_id
+            JOIN spaceports sp1
+                ON r.origin_id = sp1.spaceport_id
+            JOIN spaceports sp2
+                ON r.dest_id = sp2.spaceport_id
+            WHERE r.origin_id = %s
+            AND r.dest_id   = %s
+            ORDER BY f.departure_time, f.flight_number
+        """
+        return (sql, (origin_id, destination_id),
+                lambda r: (r[0], format_days(r[1])) + tuple(r[2:]))
+
+    def port_id(self, port_name):
+        """spaceport_id for a port name, or None"""
+        cursor = self.db.cursor()
+        cursor.execute("SELECT spaceport_id FROM spaceports WHERE port_name = %s", (port_name,))
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+
+    def route_id(self, origin_id, dest_id):
+        """route_id between two ports, or None"""
+        cursor = self.db.cursor()
+        cursor.execute("SELECT route_id FROM routes WHERE origin_id = %s AND dest_id = %s", (origin_id, dest_id))
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else None
+
+    def departures_query(self, start_day, end_day, port_name):
+        return self.port_schedule_query(start_day, end_day, port_name, "r.origin_id")
+
+    def arrivals_query(self, start_day, end_day, port_name):
+        return self.port_schedule_query(start_day, end_day, port_name, "r.dest_id")
+
+    # Cached results, each (columns, rows) with the query's transform applied, or None for a
+    # result over CACHE_MAX_ROWS that the caller should stream from the query instead
+    def invalidate_ports(self, *port_ids):
+        if self.cache is not None:
+            self.cache.invalidate_ports(port_ids)
+
+    def query_rows(self, query, limit=None):
+        """(columns, rows) of a (sql, params, transform) query, at most limit rows if given"""
+        sql, params, transform = query
+        if limit is not None:
+            sql = f"{sql.rstrip()}\nLIMIT {int(limit)}"
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        if transform:
+            rows = [transform(row) for row in rows]
+        return columns, rows
+
+    def bounded_rows(self, query):
+        """(columns, rows) of a query, or None if it has more than CACHE_MAX_ROWS rows"""
+        columns, rows = self.query_rows(query, CACHE_MAX_ROWS + 1)
+        return None if len(rows) > CACHE_MAX_ROWS else (columns, rows)
+
+    def refresh_cache(self):
+        """Bring the cache up to date with change_log before reading through it"""
+        # The GUI's connection is not autocommit: end its read snapshot so the sync and a load
+        # on a miss see what other sessions have committed since
+        if self.db.in_transaction:
+            self.db.rollback()
+        self.cache.sync(self.db)
+
+    def port_board(self, direction, start_day, end_day, port_name):
+        start, end = normalize_day(start_day), normalize_day(end_day)
+        build = self.departures_query if direction == "departures" else self.arrivals_query
+        if self.cache is None:
+            return self.bounded_rows(build(start_day, end_day, port_name))
+        self.refresh_cache()
+        # Key on the id MySQL resolves the name to, so any spelling its collation accepts
+        # shares one entry and invalidation by port id reaches it
+        port_id = self.port_id(port_name)
+        if port_id is None:
+            # No port id would ever invalidate the entry, so an unknown port is read uncached
+            return self.bounded_rows(build(start_day, end_day, port_name))
+        return self.cache.get_or_load(
+            (direction, port_id, start, end),
+            lambda: (self.bounded_rows(build(start_day, end_day, port_name)), {port_id}))
+
+    def departures(self, start_day, end_day, port_name):
+        return self.port_board("departures", start_day, end_day, port_name)
+
+    def arrivals(self, start_day, end_day, port_name):
+        return self.port_board("arrivals", start_day, end_day, port_name)
+
+    def flights_by_route(self, origin_id, destination_id):
+        query = self.flights_by_route_query(origin_id, destination_id)
+        if self.cache is None:
+            return self.bounded_rows(query)
+        self.refresh_cache()
+        return self.cache.get_or_load(
+            ("route", int(origin_id), int(destination_id)),
+            lambda: (self.bounded_rows(query), {origin_id, destination_id}))
+
+    def dated_board(self, direction, first_date, last_date, port_name):
+        """(columns, lazy rows) of a port's flight occurrences between two calendar dates"""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown board direction: {direction}")
+        first, last = parse_date(first_date), parse_date(last_date)
+        port_column, other_column = DIRECTIONS[direction]
+        cursor = self.db.cursor()
+        cursor.execute(f"""
+            SELECT f.flight_number, f.schedule_mask, f.departure_time, f.flight_duration,
+                   other.port_name, r.distance, f.spacecraft_type
+            FROM flights f
+            JOIN routes r ON f.route_id = r.route_id
+            JOIN spaceports sp ON sp.spaceport_id = {port_column}
+            JOIN spaceports other ON other.spaceport_id = {other_column}
+            WHERE sp.port_name = %s AND f.schedule_mask <> 0
+        """, (port_name,))
+        flights = cursor.fetchall()
+        cursor.close()
+        return DATED_COLUMNS, dated_board(flights, first, last, direction)
+
+    def dated_departures(self, first_date, last_date, port_name):
+        return self.dated_board("departures", first_date, last_date, port_name)
+
+    def dated_arrivals(self, first_date, last_date, port_name):
+        return self.dated_board("arrivals", first_date, last_date, port_name)
+
+    def find_itineraries(self, departure_day, origin_name, destination_name, start_time_str, max_stops, max_total_time,
+                         memoize=False):
+        """[(list of Flight rows, total hours, fare)] for every itinerary the search allows
+
+        memoize shares sub-searches between branches; the results are the same and it pays off on dense networks.
+        """
+        origin_id = self.port_id(origin_name)
+        destination_id = self.port_id(destination_name)
+        if origin_id is None or destination_id is None:
+            raise ValidationError("Invalid origin or destination port name.", "Input Error")
+
+        start_time = self.parse_time(start_time_str)
+        try:
+            day_mask = day_bit(departure_day)
+        except ValueError as e:
+            raise ValidationError(str(e), "Input Error")
+
+        # Load the day's flights once and index them by origin port
+        cursor = self.db.cursor()
+        flights_by_origin = self.day_flights_by_origin(cursor, day_mask)
+        cursor.close()
+
+        search = search_itineraries_memo if memoize else search_itineraries
+        results = search(flights_by_origin, origin_id, destination_id, start_time, max_stops, max_total_time)
+
+        # Price every itinerary in one pass over the cached fee table
+        fares = self.fares.quote_many([path for path, _ in results])
+        return [(path, total_time, fare) for (path, total_time), fare in zip(results, fares)]
+
+    def load_snapshot(self):
+        """Mapped network snapshot, rewritten only when the database has changed since"""
+        from snapshot import Snapshot
+        # load_or_build closes a stale snapshot, so drop it before a rebuild that may fail
+        current, self.snapshot = self.snapshot, None
+        self.snapshot = Snapshot.load_or_build(self.db, current=current)
+        return self.snapshot
+
+    def day_flights_by_origin(self, cursor, day_mask):
+        """Flights running on day_mask grouped by origin_id, from the snapshot when it can be used
+
+        Without numpy, or when the snapshot cannot be written or read back
+        (read-only directory, full disk, a damaged file), the flights are
+        read with SQL instead.
+        """
+        try:
+            return self.load_snapshot().flights_by_origin(day_mask)
+        except (ImportError, OSError, ValueError, struct.error):
+            pass
+        cursor.execute(f"""
+            SELECT {FLIGHT_COLUMNS}
+            FROM flights f
+            JOIN routes r ON f.route_id = r.route_id
+            WHERE f.schedule_mask & %s <> 0
+        """, (day_mask,))
+        flights_by_origin = {}
+        for row in fetch_rows(cursor, Flight):
+            flights_by_origin.setdefault(row.origin_id, []).append(row)
+        return flights_by_origin
@@ -0,0 +1,75 @@
+"""Weekly flight patterns expanded into dated occurrences.
+
+A port's flights are read once and each one becomes a generator of its
+occurrences between two calendar dates. heapq.merge interleaves those
+generators in time order, holding one pending occurrence per flight, so a
+board over several months streams in memory proportional to the number of
+flights rather than the number of dates.
+
+Departures are ordered and filtered by departure time, arrivals by
+arrival time, so an arrival board includes flights that left before the
+first date and land inside the range.
+"""
+import heapq
+import math
+from datetime import date, datetime, timedelta
+
+DATED_COLUMNS = ["flight_date", "flight_number", "departs", "arrives", "flight_duration",
+                 "other_port", "distance", "spacecraft_type"]
+
+ONE_DAY = timedelta(days=1)
+
+
+def parse_date(value):
+    """date from a date or 'YYYY-MM-DD', raising ValueError otherwise"""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+
+
+def is_date(value):
+    try:
+        parse_date(value)
+        return True
+    except ValueError:
+        return False
+
+
+def operating_dates(mask, first, last):
+    """Dates from first to last inclusive whose weekday is set in a schedule mask"""
+    day = first
+    while day <= last:
+        # date.weekday() is 0 for Monday, matching bit 0
+        if mask & (1 << day.weekday()):
+            yield day
+        day += ONE_DAY
+
+
+def occurrences(flight, first, last, direction="departures"):
+    """Dated rows of one flight whose departure (or arrival) falls between first and last"""
+    flight_number, mask, departure_time, duration, other_port, distance, craft = flight
+    length = timedelta(hours=float(duration))
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(last + ONE_DAY, datetime.min.time())
+    # An arrival in range may belong to a flight that left a few days earlier
+    lead = math.ceil(length / ONE_DAY) if direction == "arrivals" else 0
+    for flight_date in operating_dates(mask, first - lead * ONE_DAY, last):
+        departs = datetime.combine(flight_date, datetime.min.time()) + departure_time
+        arrives = departs + length
+        moment = departs if direction == "departures" else arrives
+        if start <= moment < end:
+            yield (flight_date, flight_number, departs, arrives, duration, other_port, distance, craft)
+
+
+def dated_board(flights, first, last, direction="departures"):
+    """Occurrences of every flight in time order, then flight number, produced lazily"""
+    if direction not in ("departures", "arrivals"):
+        raise ValueError(f"Unknown board direction: {direction}")
+    if last < first:
+        raise ValueError(f"End date {last} is before start date {first}.")
+    moment = 2 if direction == "departures" else 3
+    return heapq.merge(*(occurrences(flight, first, last, direction) for flight in flights),
+                       key=lambda row: (row[moment], row[1]))
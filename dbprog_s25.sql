@@ -55,6 +55,7 @@ CREATE TABLE Flights (
     departure_time  TIME NOT NULL,
     depart_hour     TINYINT UNSIGNED GENERATED ALWAYS AS (HOUR(departure_time)) STORED,
     flight_duration DECIMAL(4,2) NOT NULL,
+    schedule_mask   TINYINT UNSIGNED NOT NULL DEFAULT 0,
     CONSTRAINT fk_flight_route  FOREIGN KEY (route_id)        REFERENCES Routes(route_id),
     CONSTRAINT fk_flight_craft  FOREIGN KEY (spacecraft_type) REFERENCES SpacecraftTypes(type_name),
     CONSTRAINT chk_flight_duration CHECK (flight_duration > 0)
@@ -65,4 +66,33 @@ CREATE TABLE FlightSchedule (
     day_of_week ENUM('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday') NOT NULL,
     PRIMARY KEY (flight_number, day_of_week),
     FOREIGN KEY (flight_number) REFERENCES Flights(flight_number)
+);
+
+CREATE TABLE port_adjacency (
+    port_id           INT NOT NULL,
+    neighbor_id       INT NOT NULL,
+    direction         ENUM('out', 'in') NOT NULL,
+    route_id          INT NOT NULL,
+    monday_flights    SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    tuesday_flights   SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    wednesday_flights SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    thursday_flights  SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    friday_flights    SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    saturday_flights  SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    sunday_flights    SMALLINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (port_id, neighbor_id, direction),
+    KEY idx_adjacency_route (route_id),
+    FOREIGN KEY (port_id)     REFERENCES Spaceports(spaceport_id),
+    FOREIGN KEY (neighbor_id) REFERENCES Spaceports(spaceport_id),
+    FOREIGN KEY (route_id)    REFERENCES Routes(route_id)
+);
+
+CREATE TABLE change_log (
+    version    BIGINT AUTO_INCREMENT PRIMARY KEY,
+    port_id    INT NOT NULL,
+    entity     ENUM('flight', 'route') NOT NULL,
+    entity_key VARCHAR(20) NOT NULL,
+    operation  ENUM('insert', 'update', 'delete') NOT NULL DEFAULT 'insert',
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_change_port_version (port_id, version)
 );
\ No newline at end of file
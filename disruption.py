@@ -0,0 +1,367 @@
+"""Impact of a delayed or cancelled flight occurrence on connections.
+
+The network is indexed once as a week of occurrences, one per flight and
+operating weekday, keyed (flight_number, weekday). Times are seconds from
+Monday 00:00, so connections past midnight and across the end of the week
+work. Each occurrence keeps two lists:
+
+* onward: the occurrences leaving its arrival port 1 to 6 hours after it
+  lands (the flight finder's layover rule);
+* feeders: the reverse-dependency index, the occurrences whose arrival
+  connects to it.
+
+disrupt() looks only at those two lists for the disrupted occurrence. A
+connection is broken when the new times leave its layover outside 1 to 6
+hours, and every connection is broken when the flight is cancelled. The
+report lists the broken connections and the booked itineraries through
+the occurrence (found through idx_leg_occurrence). For each of them it
+gives re-routings found by walking forward from where the passenger is
+stranded, along onward lists that are already built. Nothing else in the
+network is visited, so the work grows with the size of the impact and
+not with the number of flights. ``examined`` in the report counts the
+occurrences touched.
+
+apply() writes a disruption into the index: the occurrence's own entries
+are removed and rebuilt and nothing else is recomputed, so later
+disruptions in the same operating week see the earlier ones.
+
+    python disruption.py FL100 2026-11-03 --delay 90
+    python disruption.py FL100 2026-11-03 --cancel
+"""
+import argparse
+import sys
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+
+from flight_search import SECONDS_PER_DAY, duration_seconds, time_seconds
+from rows import FLIGHT_COLUMNS, Flight, fetch_rows
+from schedule import DAYS_OF_WEEK
+
+WEEK = 7 * SECONDS_PER_DAY
+MIN_LAYOVER = 3600
+MAX_LAYOVER = 6 * 3600
+
+# Layovers are hours; layover_after is None when the flight is cancelled
+BrokenConnection = namedtuple("BrokenConnection", ["inbound", "outbound", "layover_before", "layover_after",
+                                                   "reroutes"])
+# legs are (flight_number, flight_date) in order
+Reroute = namedtuple("Reroute", ["legs", "arrives"])
+BrokenItinerary = namedtuple("BrokenItinerary", ["booking_id", "legs", "broken_at", "reroutes"])
+DisruptionReport = namedtuple("DisruptionReport", ["occurrence", "cancelled", "delay_minutes", "broken",
+                                                   "itineraries", "examined"])
+
+
+class Occurrence:
+    """One weekly run of a flight; times are seconds from Monday 00:00"""
+    __slots__ = ("flight", "departs", "arrives")
+
+    def __init__(self, flight, departs, arrives):
+        self.flight = flight
+        self.departs = departs
+        self.arrives = arrives
+
+
+def layover(arrives, departs):
+    """Seconds from an arrival to the next departure at that week time"""
+    return (departs - arrives) % WEEK
+
+
+def layover_hours(seconds):
+    """Layover in hours, negative when the departure is now before the arrival"""
+    return (seconds - WEEK if seconds > WEEK // 2 else seconds) / 3600
+
+
+def connects(arrives, departs):
+    return MIN_LAYOVER <= layover(arrives, departs) <= MAX_LAYOVER
+
+
+def week_time(moment):
+    """Seconds from Monday 00:00 for a datetime"""
+    return moment.weekday() * SECONDS_PER_DAY + moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+def window(entries, low, high):
+    """Keys of (time, key) entries whose time lies in [low, high] modulo a week"""
+    span = high - low
+    low %= WEEK
+    high = low + span
+    if high < WEEK:
+        return [key for _, key in entries[bisect_left(entries, low, key=itemgetter(0)):
+                                          bisect_right(entries, high, key=itemgetter(0))]]
+    return ([key for _, key in entries[bisect_left(entries, low, key=itemgetter(0)):]]
+            + [key for _, key in entries[:bisect_right(entries, high - WEEK, key=itemgetter(0))]])
+
+
+class DisruptionEngine:
+    """Connection and reverse-dependency index over a week of flight occurrences"""
+
+    def __init__(self, flights):
+        self.occurrences = {}
+        self.departures_at = {}     # port id -> sorted [(departs, key)]
+        self.arrivals_at = {}       # port id -> sorted [(arrives % WEEK, key)]
+        for flight in flights:
+            start = time_seconds(flight.departure_time)
+            length = duration_seconds(flight.flight_duration)
+            for weekday in range(7):
+                if flight.schedule_mask & (1 << weekday):
+                    departs = weekday * SECONDS_PER_DAY + start
+                    self.occurrences[(flight.flight_number, weekday)] = Occurrence(flight, departs, departs + length)
+        for key, occurrence in self.occurrences.items():
+            self.departures_at.setdefault(occurrence.flight.origin_id, []).append((occurrence.departs, key))
+            self.arrivals_at.setdefault(occurrence.flight.dest_id, []).append((occurrence.arrives % WEEK, key))
+        for entries in (*self.departures_at.values(), *self.arrivals_at.values()):
+            entries.sort()
+        self.onward = {key: self.find_onward(occurrence) for key, occurrence in self.occurrences.items()}
+        self.feeders = {key: [] for key in self.occurrences}
+        for key, onward in self.onward.items():
+            for following in onward:
+                self.feeders[following].append(key)
+
+    @classmethod
+    def from_db(cls, db):
+        cursor = db.cursor()
+        cursor.execute(f"""
+            SELECT {FLIGHT_COLUMNS}
+            FROM flights f
+            JOIN routes r ON f.route_id = r.route_id
+            WHERE f.schedule_mask <> 0
+        """)
+        flights = fetch_rows(cursor, Flight)
+        cursor.close()
+        return cls(flights)
+
+    def find_onward(self, occurrence):
+        entries = self.departures_at.get(occurrence.flight.dest_id, ())
+        return window(entries, occurrence.arrives + MIN_LAYOVER, occurrence.arrives + MAX_LAYOVER)
+
+    def find_feeders(self, occurrence):
+        entries = self.arrivals_at.get(occurrence.flight.origin_id, ())
+        return window(entries, occurrence.departs - MAX_LAYOVER, occurrence.departs - MIN_LAYOVER)
+
+    def occurrence_key(self, flight_number, flight_date):
+        key = (flight_number, flight_date.weekday())
+        if key not in self.occurrences:
+            raise ValueError(f"Flight {flight_number} does not operate on "
+                             f"{DAYS_OF_WEEK[flight_date.weekday()]} {flight_date}.")
+        return key
+
+    def departure_datetime(self, key, flight_date):
+        # Seconds after midnight of the scheduled day, past 24 h if a delay pushed it over
+        offset = (self.occurrences[key].departs - key[1] * SECONDS_PER_DAY) % WEEK
+        return datetime.combine(flight_date, datetime.min.time()) + timedelta(seconds=offset)
+
+    def reroutes(self, port_id, ready, destination_id, exclude=(), max_legs=3, limit=5):
+        """Earliest-arriving itineraries from a port to a destination for a passenger free at ready"""
+        results = []
+        counter = [0]
+        ready_time = week_time(ready)
+
+        def walk(key, departs_at, legs, visited):
+            counter[0] += 1
+            occurrence = self.occurrences[key]
+            arrives_at = departs_at + timedelta(seconds=occurrence.arrives - occurrence.departs)
+            legs = legs + [(key[0], departs_at.date())]
+            port = occurrence.flight.dest_id
+            if port == destination_id:
+                results.append(Reroute(legs, arrives_at))
+                return
+            if len(legs) == max_legs or port in visited:
+                return
+            for following in self.onward[key]:
+                if following not in exclude:
+                    wait = layover(occurrence.arrives, self.occurrences[following].departs)
+                    walk(following, arrives_at + timedelta(seconds=wait), legs, visited | {port})
+
+        for key in window(self.departures_at.get(port_id, ()), ready_time + MIN_LAYOVER, ready_time + MAX_LAYOVER):
+            if key not in exclude:
+                wait = layover(ready_time, self.occurrences[key].departs)
+                walk(key, ready + timedelta(seconds=wait), [], {port_id})
+        results.sort(key=lambda reroute: (reroute.arrives, len(reroute.legs)))
+        return results[:limit], counter[0]
+
+    def disrupt(self, flight_number, flight_date, delay_minutes=0, cancelled=False, db=None,
+                max_legs=3, limit=5):
+        """DisruptionReport for one occurrence delayed by delay_minutes, or cancelled"""
+        key = self.occurrence_key(flight_number, flight_date)
+        occurrence = self.occurrences[key]
+        delay = round(delay_minutes * 60)
+        departs_at = self.departure_datetime(key, flight_date)
+        arrives_at = departs_at + timedelta(seconds=occurrence.arrives - occurrence.departs + delay)
+        exclude = {key}
+        examined = 1 + len(self.onward[key]) + len(self.feeders[key])
+        broken = []
+
+        # Passengers on this flight who were connecting onward
+        for following in self.onward[key]:
+            target = self.occurrences[following]
+            before = layover(occurrence.arrives, target.departs)
+            after = None if cancelled else layover(occurrence.arrives + delay, target.departs)
+            if after is not None and MIN_LAYOVER <= after <= MAX_LAYOVER:
+                continue
+            if cancelled:
+                # Still at the origin, ready when they would have boarded
+                stranded = (occurrence.flight.origin_id, departs_at - timedelta(seconds=MIN_LAYOVER))
+            else:
+                stranded = (occurrence.flight.dest_id, arrives_at)
+            found, walked = self.reroutes(*stranded, target.flight.dest_id, exclude, max_legs, limit)
+            examined += walked
+            broken.append(BrokenConnection(key, following, layover_hours(before),
+                                           None if after is None else layover_hours(after), found))
+
+        # Passengers arriving on a feeder to board this flight
+        for feeder in self.feeders[key]:
+            source = self.occurrences[feeder]
+            before = layover(source.arrives, occurrence.departs)
+            after = None if cancelled else layover(source.arrives, occurrence.departs + delay)
+            if after is not None and MIN_LAYOVER <= after <= MAX_LAYOVER:
+                continue
+            landed = departs_at - timedelta(seconds=before)
+            found, walked = self.reroutes(occurrence.flight.origin_id, landed, occurrence.flight.dest_id,
+                                          exclude, max_legs, limit)
+            examined += walked
+            broken.append(BrokenConnection(feeder, key, layover_hours(before),
+                                           None if after is None else layover_hours(after), found))
+
+        itineraries = []
+        if db is not None:
+            itineraries, walked = self.broken_bookings(db, key, flight_date, delay, cancelled,
+                                                       max_legs, limit)
+            examined += walked
+        return DisruptionReport(key, cancelled, delay_minutes, broken, itineraries, examined)
+
+    def broken_bookings(self, db, key, flight_date, delay, cancelled, max_legs, limit):
+        """Booked itineraries through the occurrence whose connections no longer hold"""
+        occurrence = self.occurrences[key]
+        departs_at = self.departure_datetime(key, flight_date)
+        broken = []
+        walked = 0
+        for booking_id, legs in booked_itineraries(db, key[0], flight_date).items():
+            position = legs.index((key[0], flight_date))
+            final = self.occurrences.get((legs[-1][0], legs[-1][1].weekday()))
+            if final is None:
+                continue
+            stranded = None
+            if cancelled:
+                stranded = (occurrence.flight.origin_id, departs_at - timedelta(seconds=MIN_LAYOVER), position)
+            else:
+                if position + 1 < len(legs):
+                    following = self.occurrences.get((legs[position + 1][0], legs[position + 1][1].weekday()))
+                    if following is not None and not connects(occurrence.arrives + delay, following.departs):
+                        arrived = departs_at + timedelta(seconds=occurrence.arrives - occurrence.departs + delay)
+                        stranded = (occurrence.flight.dest_id, arrived, position + 1)
+                if position > 0 and stranded is None:
+                    previous = self.occurrences.get((legs[position - 1][0], legs[position - 1][1].weekday()))
+                    if previous is not None and not connects(previous.arrives, occurrence.departs + delay):
+                        landed = departs_at - timedelta(seconds=layover(previous.arrives, occurrence.departs))
+                        stranded = (occurrence.flight.origin_id, landed, position)
+            if stranded is None:
+                continue
+            port_id, ready, broken_at = stranded
+            found, count = self.reroutes(port_id, ready, final.flight.dest_id, {key}, max_legs, limit)
+            walked += count
+            broken.append(BrokenItinerary(booking_id, legs, broken_at, found))
+        return broken, walked
+
+    def remove(self, key):
+        occurrence = self.occurrences.pop(key)
+        self.departures_at[occurrence.flight.origin_id].remove((occurrence.departs, key))
+        self.arrivals_at[occurrence.flight.dest_id].remove((occurrence.arrives % WEEK, key))
+        for following in self.onward.pop(key):
+            self.feeders[following].remove(key)
+        for feeder in self.feeders.pop(key):
+            self.onward[feeder].remove(key)
+        return occurrence
+
+    def apply(self, flight_number, flight_date, delay_minutes=0, cancelled=False):
+        """Record a disruption in the index, rebuilding only the occurrence's own connections"""
+        key = self.occurrence_key(flight_number, flight_date)
+        occurrence = self.remove(key)
+        if cancelled:
+            return
+        delay = round(delay_minutes * 60)
+        occurrence = Occurrence(occurrence.flight, (occurrence.departs + delay) % WEEK,
+                                (occurrence.departs + delay) % WEEK + occurrence.arrives - occurrence.departs)
+        self.occurrences[key] = occurrence
+        insort(self.departures_at.setdefault(occurrence.flight.origin_id, []), (occurrence.departs, key))
+        insort(self.arrivals_at.setdefault(occurrence.flight.dest_id, []), (occurrence.arrives % WEEK, key))
+        self.onward[key] = self.find_onward(occurrence)
+        self.feeders[key] = self.find_feeders(occurrence)
+        for following in self.onward[key]:
+            self.feeders[following].append(key)
+        for feeder in self.feeders[key]:
+            self.onward[feeder].append(key)
+
+
+def booked_itineraries(db, flight_number, flight_date):
+    """{booking_id: [(flight_number, flight_date), ...]} for bookings with a leg on the occurrence"""
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT bl.booking_id, bl.flight_number, bl.flight_date
+        FROM booking_legs bl
+        WHERE bl.booking_id IN (
+            SELECT booking_id FROM booking_legs WHERE flight_number = %s AND flight_date = %s
+        )
+        ORDER BY bl.booking_id, bl.leg
+    """, (flight_number, flight_date))
+    bookings = {}
+    for booking_id, number, leg_date in cursor.fetchall():
+        bookings.setdefault(booking_id, []).append((number, leg_date))
+    cursor.close()
+    return bookings
+
+
+def format_legs(legs):
+    return " -> ".join(f"{number} ({leg_date})" for number, leg_date in legs)
+
+
+def print_report(report, out=sys.stdout):
+    flight_number, weekday = report.occurrence
+    what = "cancelled" if report.cancelled else f"delayed {report.delay_minutes:g} min"
+    print(f"{flight_number} on {DAYS_OF_WEEK[weekday]} {what}: {len(report.broken)} broken connections, "
+          f"{len(report.itineraries)} broken bookings, {report.examined} occurrences examined", file=out)
+    for connection in report.broken:
+        after = "cancelled" if connection.layover_after is None else f"{connection.layover_after:.2f} h"
+        print(f"  {connection.inbound[0]} -> {connection.outbound[0]}: layover "
+              f"{connection.layover_before:.2f} h -> {after}", file=out)
+        for reroute in connection.reroutes:
+            print(f"      via {format_legs(reroute.legs)}, arriving {reroute.arrives}", file=out)
+    for itinerary in report.itineraries:
+        print(f"  booking {itinerary.booking_id}: {format_legs(itinerary.legs)} breaks at leg "
+              f"{itinerary.broken_at + 1}", file=out)
+        for reroute in itinerary.reroutes:
+            print(f"      rebook {format_legs(reroute.legs)}, arriving {reroute.arrives}", file=out)
+        if not itinerary.reroutes:
+            print("      no alternative found", file=out)
+
+
+def main():
+    from connection import connect
+
+    parser = argparse.ArgumentParser(description="Broken connections and re-routings for a disrupted flight")
+    parser.add_argument("flight_number")
+    parser.add_argument("flight_date", type=date.fromisoformat, help="YYYY-MM-DD")
+    disruption = parser.add_mutually_exclusive_group(required=True)
+    disruption.add_argument("--delay", type=float, metavar="MINUTES")
+    disruption.add_argument("--cancel", action="store_true")
+    parser.add_argument("--max-legs", type=int, default=3, help="legs in a re-routing")
+    parser.add_argument("--alternatives", type=int, default=5, help="re-routings listed per break")
+    args = parser.parse_args()
+
+    db = connect()
+    try:
+        engine = DisruptionEngine.from_db(db)
+        report = engine.disrupt(args.flight_number, args.flight_date, args.delay or 0, args.cancel, db,
+                                args.max_legs, args.alternatives)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
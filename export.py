@@ -0,0 +1,225 @@
+"""Streaming export of query results to CSV, JSON Lines and Parquet.
+
+Writers consume any iterable of row tuples, normally a ResultPager reading
+straight from an unbuffered cursor, so only one page (or one Parquet row
+group) is held in memory at a time. TIME columns arrive from the connector
+as timedelta: CSV and JSON Lines write them as HH:MM:SS and Parquet stores
+them as time32. DECIMAL columns are written exactly in CSV, as numbers in
+JSON Lines and as decimal128 in Parquet. Dates and datetimes (dated
+schedules) are ISO 8601 text in JSON Lines and date32/timestamp in Parquet.
+"""
+import csv
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from paging import ResultPager
+
+ROW_GROUP_SIZE = 65536
+
+FORMATS = {
+    ".csv": "CSV (*.csv)",
+    ".jsonl": "JSON Lines (*.jsonl)",
+    ".parquet": "Parquet (*.parquet)",
+}
+
+
+def format_time(value):
+    """HH:MM:SS for a MySQL TIME value"""
+    seconds = int(value.total_seconds())
+    sign = "-" if seconds < 0 else ""
+    hours, rest = divmod(abs(seconds), 3600)
+    return f"{sign}{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def to_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, timedelta):
+        return format_time(value)
+    return str(value)
+
+
+def to_json(value):
+    if isinstance(value, timedelta):
+        return format_time(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(file, columns, rows):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([to_text(value) for value in row])
+
+
+def stream_jsonl(file, columns, rows):
+    for row in rows:
+        record = {name: to_json(value) for name, value in zip(columns, row)}
+        file.write(json.dumps(record) + "\n")
+
+
+def write_csv(path, columns, rows):
+    with open(path, "w", newline="") as file:
+        stream_csv(file, columns, rows)
+
+
+def write_jsonl(path, columns, rows):
+    with open(path, "w") as file:
+        stream_jsonl(file, columns, rows)
+
+
+def arrow_type(values):
+    """Arrow type for a column, inferred from the first non-null value"""
+    import pyarrow as pa
+
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, bool):
+        return pa.bool_()
+    if isinstance(sample, int):
+        return pa.int64()
+    if isinstance(sample, float):
+        return pa.float64()
+    if isinstance(sample, Decimal):
+        scale = max(-v.as_tuple().exponent for v in values if v is not None)
+        return pa.decimal128(38, max(scale, 0))
+    if isinstance(sample, timedelta):
+        return pa.time32("s")
+    if isinstance(sample, datetime):
+        return pa.timestamp("s")
+    if isinstance(sample, date):
+        return pa.date32()
+    return pa.string()
+
+
+def column_type(description):
+    """Arrow type for a cursor.description entry, None if its MySQL type has no fixed mapping"""
+    import pyarrow as pa
+    from mysql.connector.constants import FieldType
+
+    type_code = description[1]
+    if type_code in (FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG, FieldType.INT24,
+                     FieldType.YEAR):
+        return pa.int64()
+    if type_code in (FieldType.FLOAT, FieldType.DOUBLE):
+        return pa.float64()
+    if type_code in (FieldType.DECIMAL, FieldType.NEWDECIMAL):
+        return pa.decimal128(38, description[5] if description[5] is not None else 10)
+    if type_code == FieldType.TIME:
+        return pa.time32("s")
+    if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp("s")
+    if type_code in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    return None
+
+
+def arrow_value(value, scale=None):
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds()) % 86400
+        return time(seconds // 3600, seconds % 3600 // 60, seconds % 60)
+    if scale is not None and isinstance(value, Decimal):
+        return value.quantize(Decimal(1).scaleb(-scale))
+    return value
+
+
+def write_parquet(path, columns, rows, description=None):
+    """Parquet in row groups, typed by the first non-null value of each column
+
+    Rows are read ahead, a row group at a time, until every column has a
+    non-null value or a type from cursor.description to fall back on, so a
+    column that starts out NULL does not get typed as string. Columns that
+    are NULL throughout are written as string.
+
+    A DECIMAL column keeps the scale cursor.description reports, or else the
+    largest scale in the rows read ahead. Later values are rounded to it, so
+    a computed DECIMAL with more digits further down cannot fail the export.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow).")
+
+    fallback = [column_type(entry) for entry in description] if description else [None] * len(columns)
+    inferred = [None] * len(columns)
+    rows = iter(rows)
+    ahead = []
+    while True:
+        batch = list(islice(rows, ROW_GROUP_SIZE))
+        ahead.append(batch)
+        for i, values in enumerate(zip(*batch)):
+            if any(v is not None for v in values):
+                found = arrow_type(values)
+                # Decimals keep the widest scale seen so far
+                if inferred[i] is None or pa.types.is_decimal(found) and found.scale > inferred[i].scale:
+                    inferred[i] = found
+        if len(batch) < ROW_GROUP_SIZE or all(t is not None or f is not None for t, f in zip(inferred, fallback)):
+            break
+    # A DECIMAL scale reported by the server beats one guessed from the values
+    reported = [entry[5] is not None for entry in description] if description else [False] * len(columns)
+    types = [fallback_type if scale_known and fallback_type is not None and pa.types.is_decimal(fallback_type)
+             else inferred_type or fallback_type or pa.string()
+             for inferred_type, fallback_type, scale_known in zip(inferred, fallback, reported)]
+    schema = pa.schema(list(zip(columns, types)))
+    scales = [field.type.scale if pa.types.is_decimal(field.type) else None for field in schema]
+
+    def write(writer, batch):
+        column_values = list(zip(*batch)) or [() for _ in columns]
+        arrays = [pa.array([arrow_value(v, scale) for v in values], type=field.type)
+                  for values, field, scale in zip(column_values, schema, scales)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    writer = pq.ParquetWriter(path, schema)
+    try:
+        for batch in ahead:
+            if batch or len(ahead) == 1:
+                write(writer, batch)
+        if len(ahead[-1]) == ROW_GROUP_SIZE:
+            while True:
+                batch = list(islice(rows, ROW_GROUP_SIZE))
+                if batch:
+                    write(writer, batch)
+                if len(batch) < ROW_GROUP_SIZE:
+                    break
+    finally:
+        writer.close()
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".jsonl": write_jsonl,
+    ".parquet": write_parquet,
+}
+
+
+def export_rows(path, columns, rows, description=None):
+    """Write rows to path in the format named by its extension
+
+    description is the source cursor.description; Parquet uses it for
+    column types and DECIMAL scales.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported export format '{extension}'. Use .csv, .jsonl or .parquet.")
+    if extension == ".parquet":
+        write_parquet(path, list(columns), rows, description)
+    else:
+        WRITERS[extension](path, list(columns), rows)
+
+
+def export_query(path, sql, params=(), transform=None):
+    """Run a query on its own connection and stream every row into path"""
+    pager = ResultPager(sql, params, transform, count=False)
+    try:
+        export_rows(path, pager.columns, pager, pager.description)
+    finally:
+        pager.close()
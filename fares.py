@@ -0,0 +1,85 @@
+"""Itinerary fare quoting against an in-memory spaceport fee table.
+
+A fare is the sum of the ``fee`` of every port an itinerary touches: the
+origin, each transfer port and the destination. For a direct flight that
+is the same src_fee + dest_fee the guided flight creator always showed.
+
+The fee table is read with a single query and reused for every quote.
+enter_spaceport calls invalidate() after it commits, and max_age bounds
+how long changes made by other sessions can go unseen. A port added by
+another session since the last load (another core in a pool, another
+process) is missing from the table; quoting it reloads the table once.
+"""
+import time
+
+
+def itinerary_fare(fees, path):
+    """Fare for one itinerary: its origin's fee plus the fee of every port it lands at"""
+    return fees[path[0].origin_id] + sum(fees[leg.dest_id] for leg in path)
+
+
+class FeeTable:
+    """spaceport_id -> fee"""
+
+    def __init__(self, rows):
+        self.fees = dict(rows)
+
+    @classmethod
+    def from_db(cls, db):
+        cursor = db.cursor()
+        cursor.execute("SELECT spaceport_id, fee FROM spaceports ORDER BY spaceport_id")
+        rows = cursor.fetchall()
+        cursor.close()
+        return cls(rows)
+
+
+class FareEngine:
+    """Quotes fares for itineraries, refreshing its FeeTable when spaceports change"""
+
+    def __init__(self, db, max_age=300.0):
+        self.db = db
+        self.max_age = max_age
+        self.table = None
+        self.loaded_at = 0.0
+
+    def invalidate(self):
+        self.table = None
+
+    def fee_table(self, port_ids=()):
+        """The current table, reloaded when it is too old or lacks any of port_ids"""
+        if (self.table is None or time.monotonic() - self.loaded_at > self.max_age
+                or not self.table.fees.keys() >= set(port_ids)):
+            self.table = FeeTable.from_db(self.db)
+            self.loaded_at = time.monotonic()
+        return self.table
+
+    def fee(self, port_id):
+        return self.fee_table((port_id,)).fees[port_id]
+
+    def port_fee_by_name(self, port_name):
+        """(spaceport_id, fee) for a port name, or None if no such port
+
+        Read from spaceports rather than the table, so the match follows the
+        column's collation (case-insensitive) and sees ports just added.
+        """
+        cursor = self.db.cursor()
+        cursor.execute("SELECT spaceport_id, fee FROM spaceports WHERE port_name = %s LIMIT 1", (port_name,))
+        row = cursor.fetchone()
+        cursor.close()
+        return row
+
+    def quote_ports(self, port_ids):
+        """Fare for a sequence of visited port ids"""
+        fees = self.fee_table(port_ids).fees
+        return sum(fees[port_id] for port_id in port_ids)
+
+    def quote(self, path):
+        """Fare for one flight_finder itinerary (a list of Flight rows)"""
+        return self.quote_many([path])[0]
+
+    def quote_many(self, itineraries):
+        """Fares for many itineraries in one call, all priced against the same fee table"""
+        port_ids = {leg.dest_id for path in itineraries for leg in path}
+        port_ids.update(path[0].origin_id for path in itineraries if path)
+        fees = self.fee_table(port_ids).fees
+        return [itinerary_fare(fees, path) for path in itineraries]
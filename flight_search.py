@@ -0,0 +1,273 @@
+"""Depth-first itinerary search used by the flight finder.
+
+Rules: the first flight must leave no more than 3 hours after the
+requested start time. Each connection needs a 1 to 6 hour layover. No port
+may be left twice, there can be at most max_stops stops, and flight plus
+layover time must stay within max_total_time hours. Times of day are whole
+seconds. Arrivals wrap past midnight, as the hour arithmetic always has.
+
+Partial itineraries are PathNode chains. Each node points at the node
+before it, so extending a path allocates one small node and does not copy
+the list of legs. Only complete itineraries are turned into lists.
+
+search_itineraries_memo gives the same results in the same order. On
+dense networks the DFS reaches the same (port, arrival, stops) state
+through many prefixes and repeats the same sub-search each time. The
+memoized mode searches each state once and keeps the suffixes it found,
+with their leg times. A later prefix reuses them when it arrives with no
+more budget left than the one that searched: suffixes that depart from a
+port the prefix already left are dropped, and the leg times are re-added
+from the new total so the budget check rounds exactly as the DFS does. A
+prefix with more budget searches the state again. Arrivals are exact
+seconds, not buckets, because a coarser key would move layovers across
+the 1 and 6 hour limits. The cache is an LRU bounded by the number of
+suffixes held (max_cached).
+
+Run ``python flight_search.py`` to measure memory with tracemalloc, and
+DFS against memoized time, on a synthetic network. ``--verify`` instead
+compares the two on many small random networks, including a cache small
+enough to evict, and exits non-zero on the first difference.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import timedelta
+
+from rows import Flight
+
+SECONDS_PER_DAY = 86_400
+# Suffixes kept by the memoized search before least recently used states are dropped
+MAX_CACHED_SUFFIXES = 200_000
+
+
+def time_seconds(value):
+    """Seconds after midnight for a TIME value (timedelta) or an 'HH:MM[:SS]' string"""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds())
+    parts = [int(part) for part in str(value).split(":")]
+    hours, minutes, seconds = (parts + [0])[:3]
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def duration_seconds(hours):
+    return round(float(hours) * 3600)
+
+
+class PathNode:
+    """One leg of a partial itinerary, linked to the leg before it"""
+    __slots__ = ("flight", "parent", "arrival")
+
+    def __init__(self, flight, parent, arrival):
+        self.flight = flight
+        self.parent = parent
+        self.arrival = arrival   # seconds after midnight, wrapped
+
+    def legs(self):
+        """Flights from the first leg to this one"""
+        legs = []
+        node = self
+        while node is not None:
+            legs.append(node.flight)
+            node = node.parent
+        legs.reverse()
+        return legs
+
+
+def search_itineraries(flights_by_origin, origin_id, destination_id, start_time, max_stops, max_total_time):
+    """[(list of Flight rows, total hours)] for every itinerary, in search order"""
+    start = time_seconds(start_time)
+    results = []
+
+    def dfs(current_id, stops, node, total_time, visited_ports):
+        if stops > max_stops or current_id in visited_ports:
+            return
+
+        for row in flights_by_origin.get(current_id, ()):
+            departure = time_seconds(row.departure_time)
+
+            if node is None:
+                if (departure - start) / 3600 > 3:
+                    continue
+                flight_time = float(row.flight_duration)
+            else:
+                layover = (departure - node.arrival) / 3600
+                if layover < 1 or layover > 6:
+                    continue
+                flight_time = float(row.flight_duration) + layover
+
+            new_total_time = total_time + flight_time
+            if new_total_time > max_total_time:
+                continue
+
+            arrival = (departure + duration_seconds(row.flight_duration)) % SECONDS_PER_DAY
+            new_node = PathNode(row, node, arrival)
+            next_port = row.dest_id
+
+            if next_port == destination_id:
+                results.append((new_node.legs(), new_total_time))
+            else:
+                dfs(next_port, stops + 1, new_node, new_total_time, visited_ports | {current_id})
+
+    dfs(origin_id, 0, None, 0, frozenset())
+    return results
+
+
+def within_budget(total_time, flight_times, max_total_time):
+    """Re-add leg times one at a time, exactly as the search accumulates them"""
+    for flight_time in flight_times:
+        total_time += flight_time
+        if total_time > max_total_time:
+            return False
+    return True
+
+
+def search_itineraries_memo(flights_by_origin, origin_id, destination_id, start_time, max_stops, max_total_time,
+                            max_cached=MAX_CACHED_SUFFIXES):
+    """search_itineraries with sub-searches shared between branches; same results in the same order"""
+    if max_stops < 0:
+        return []
+    start = time_seconds(start_time)
+    memo = OrderedDict()    # (port, arrival, stops) -> (total time it was searched with, suffixes)
+    cached = 0
+
+    def suffixes(port, arrival, stops, total_time):
+        """[(legs, leg times)] from port, for a path that reached it at arrival having used total_time"""
+        nonlocal cached
+        key = (port, arrival, stops)
+        entry = memo.get(key)
+        if entry is not None and total_time >= entry[0]:
+            memo.move_to_end(key)
+            if total_time == entry[0]:
+                return entry[1]
+            # Searched with more budget left: keep what still fits
+            return [s for s in entry[1] if within_budget(total_time, s[1], max_total_time)]
+
+        found = []
+        if stops > max_stops:
+            return found
+        for row in flights_by_origin.get(port, ()):
+            departure = time_seconds(row.departure_time)
+            layover = (departure - arrival) / 3600
+            if layover < 1 or layover > 6:
+                continue
+            flight_time = float(row.flight_duration) + layover
+            new_total_time = total_time + flight_time
+            if new_total_time > max_total_time:
+                continue
+            if row.dest_id == destination_id:
+                found.append(((row,), (flight_time,)))
+                continue
+            next_arrival = (departure + duration_seconds(row.flight_duration)) % SECONDS_PER_DAY
+            for legs, times in suffixes(row.dest_id, next_arrival, stops + 1, new_total_time):
+                # No port may be left twice
+                if all(leg.origin_id != port for leg in legs):
+                    found.append(((row,) + legs, (flight_time,) + times))
+
+        # Replace an entry searched with less budget (it may have been evicted meanwhile)
+        previous = memo.pop(key, None)
+        if previous is not None:
+            cached -= len(previous[1])
+        memo[key] = (total_time, found)
+        cached += len(found)
+        while cached > max_cached and memo:
+            cached -= len(memo.popitem(last=False)[1][1])
+        return found
+
+    results = []
+    for row in flights_by_origin.get(origin_id, ()):
+        departure = time_seconds(row.departure_time)
+        if (departure - start) / 3600 > 3:
+            continue
+        flight_time = float(row.flight_duration)
+        if flight_time > max_total_time:
+            continue
+        if row.dest_id == destination_id:
+            results.append(([row], flight_time))
+            continue
+        arrival = (departure + duration_seconds(row.flight_duration)) % SECONDS_PER_DAY
+        for legs, times in suffixes(row.dest_id, arrival, 1, flight_time):
+            if all(leg.origin_id != origin_id for leg in legs):
+                total_time = flight_time
+                for leg_time in times:
+                    total_time += leg_time
+                results.append(([row, *legs], total_time))
+    return results
+
+
+def synthetic_flights(port_count=300, flight_count=30_000, seed=0):
+    """Random daily flights as plain cursor tuples in Flight field order"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(flight_count):
+        origin = rng.randint(1, port_count)
+        dest = rng.randint(1, port_count - 1)
+        dest += dest >= origin
+        rows.append((f"SF{i}", timedelta(seconds=rng.randrange(0, SECONDS_PER_DAY, 300)),
+                     rng.choice([0.5, 1.25, 2.0, 3.5, 5.0]), 0x7F, "Synthetic", origin, dest, 1_000))
+    return rows
+
+
+def group_by_origin(rows):
+    by_origin = {}
+    for row in rows:
+        by_origin.setdefault(row.origin_id if isinstance(row, Flight) else row["origin_id"], []).append(row)
+    return by_origin
+
+
+def measure(label, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {current / 1024:,.0f} KiB held, {peak / 1024:,.0f} KiB peak, {elapsed * 1000:.0f} ms")
+    return value
+
+
+def benchmark(port_count=300, flight_count=30_000, max_stops=3, max_total_time=12.0):
+    raw = synthetic_flights(port_count, flight_count)
+    names = Flight._fields
+    measure("dict rows", lambda: group_by_origin([dict(zip(names, row)) for row in raw]))
+    flights = measure("Flight rows", lambda: group_by_origin([Flight._make(row) for row in raw]))
+    results = measure("search", lambda: search_itineraries(flights, 1, 2, "08:00:00", max_stops, max_total_time))
+    memoized = measure("memoized search",
+                       lambda: search_itineraries_memo(flights, 1, 2, "08:00:00", max_stops, max_total_time))
+    print(f"{len(results)} itineraries from {flight_count} flights, up to {max_stops} stops, "
+          f"{'identical' if memoized == results else 'DIFFERENT'} with memoization")
+
+
+def verify(trials=200, seed=0, small_cache=50):
+    """Whether the memoized search matches the DFS on random networks, with the default and a small cache"""
+    rng = random.Random(seed)
+    for trial in range(trials):
+        port_count = rng.randint(8, 40)
+        raw = synthetic_flights(port_count, port_count * rng.randint(10, 60), seed=rng.random())
+        flights = group_by_origin([Flight._make(row) for row in raw])
+        origin, destination = rng.sample(range(1, port_count + 1), 2)
+        start_time = f"{rng.randrange(24):02d}:{rng.choice(['00', '15', '30', '45'])}:00"
+        args = (flights, origin, destination, start_time, rng.randint(0, 4), rng.choice([6.0, 9.5, 12.0, 18.0, 24.0]))
+        expected = search_itineraries(*args)
+        for max_cached in (MAX_CACHED_SUFFIXES, small_cache):
+            if search_itineraries_memo(*args, max_cached=max_cached) != expected:
+                print(f"trial {trial}: memoized search with max_cached={max_cached} differs from the DFS for "
+                      f"{port_count} ports, {origin} -> {destination} at {start_time}, "
+                      f"max_stops={args[4]}, max_total_time={args[5]}")
+                return False
+    print(f"{trials} random searches identical to the DFS, with max_cached={MAX_CACHED_SUFFIXES} and {small_cache}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark or verify the itinerary search")
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the memoized search with the DFS on random networks instead of benchmarking")
+    parser.add_argument("--trials", type=int, default=200, help="random searches to compare with --verify")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --verify")
+    args = parser.parse_args()
+    if args.verify:
+        sys.exit(0 if verify(args.trials, args.seed) else 1)
+    benchmark()
@@ -0,0 +1,151 @@
+"""Departure and arrival boards kept current from the change_log table.
+
+enter_flight and enter_route append one change_log row per affected port.
+A board reads the log through a ChangeCursor, so each refresh is a short
+range read on (port_id, version); only flights named in new change rows
+are re-read and patched into the rows already held.
+
+change_log.version is AUTO_INCREMENT, handed out when a row is inserted
+but visible only once its transaction commits, so a lower version can
+appear after a higher one has been read. A ChangeCursor therefore re-reads
+a trailing window: every version above its settled mark, skipping the
+ones it has already returned. A version seen settle_seconds ago becomes
+the new mark, since anything numbered below it that is still invisible
+belongs to a transaction open that long (or rolled back).
+"""
+import time
+
+from schedule import ALL_DAYS_MASK, format_days
+
+SETTLE_SECONDS = 60.0
+START_WINDOW = 1000
+
+BOARD_COLUMNS = ["flight_number", "days", "departure_time", "flight_duration",
+                 "other_port", "distance", "spacecraft_type"]
+
+# (column matched against the board's port, column naming the other end)
+DIRECTIONS = {
+    "departures": ("r.origin_id", "r.dest_id"),
+    "arrivals": ("r.dest_id", "r.origin_id"),
+}
+
+
+class ChangeCursor:
+    """Read position in change_log that also returns versions committed out of order"""
+
+    def __init__(self, port_id=None, settle_seconds=SETTLE_SECONDS, clock=time.monotonic):
+        self.port_id = port_id
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self.settled = 0        # every version up to here has been returned or will never appear
+        self.seen = {}          # version above settled -> when it was first returned
+
+    def condition(self):
+        if self.port_id is None:
+            return "version > %s", (self.settled,)
+        return "port_id = %s AND version > %s", (self.port_id, self.settled)
+
+    def start(self, db, window=START_WINDOW):
+        """Skip the existing log, still watching its last window versions for late commits"""
+        cursor = db.cursor()
+        where, params = self.condition()
+        cursor.execute(f"SELECT COALESCE(MAX(version), 0) FROM change_log WHERE {where}", params)
+        self.settled = max(cursor.fetchone()[0] - window, 0)
+        cursor.close()
+        self.seen = {}
+        self.read(db)
+
+    def read(self, db, columns="port_id, entity, entity_key"):
+        """(version, *columns) for every change not returned before, in version order"""
+        cursor = db.cursor()
+        where, params = self.condition()
+        cursor.execute(f"SELECT version, {columns} FROM change_log WHERE {where} ORDER BY version", params)
+        rows = cursor.fetchall()
+        cursor.close()
+
+        now = self.clock()
+        fresh = [row for row in rows if row[0] not in self.seen]
+        for row in fresh:
+            self.seen[row[0]] = now
+        settled = [version for version, seen_at in self.seen.items() if now - seen_at >= self.settle_seconds]
+        if settled:
+            self.settled = max(settled)
+            self.seen = {version: seen_at for version, seen_at in self.seen.items() if version > self.settled}
+        return fresh
+
+
+class LiveBoard:
+    """Departures or arrivals for one port, refreshed incrementally"""
+
+    def __init__(self, db, port_id, direction="departures", days_mask=ALL_DAYS_MASK):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown board direction: {direction}")
+        self.db = db
+        self.port_id = port_id
+        self.direction = direction
+        self.days_mask = days_mask
+        self.rows = {}
+        self.changes = ChangeCursor(port_id)
+        self.load()
+
+    def board_sql(self, condition):
+        port_column, other_column = DIRECTIONS[self.direction]
+        return f"""
+            SELECT f.flight_number, f.schedule_mask & %s, f.departure_time, f.flight_duration,
+                   sp.port_name, r.distance, f.spacecraft_type
+            FROM flights f
+            JOIN routes r ON f.route_id = r.route_id
+            JOIN spaceports sp ON sp.spaceport_id = {other_column}
+            WHERE {port_column} = %s
+            AND f.schedule_mask & %s <> 0
+            {condition}
+        """
+
+    def read_rows(self, condition="", params=()):
+        cursor = self.db.cursor()
+        cursor.execute(self.board_sql(condition),
+                       (self.days_mask, self.port_id, self.days_mask) + tuple(params))
+        rows = {r[0]: (r[0], format_days(r[1])) + tuple(r[2:]) for r in cursor.fetchall()}
+        cursor.close()
+        return rows
+
+    def load(self):
+        """Full read; the log position is taken first so nothing committed meanwhile is skipped"""
+        self.changes.start(self.db)
+        self.rows = self.read_rows()
+
+    def refresh(self):
+        """Apply changes logged since the last refresh; returns the flight numbers touched"""
+        changes = self.changes.read(self.db, "entity, entity_key")
+        if not changes:
+            return set()
+
+        flights = {key for _, entity, key in changes if entity == "flight"}
+        routes = {key for _, entity, key in changes if entity == "route"}
+
+        conditions, params = [], []
+        if flights:
+            conditions.append(f"f.flight_number IN ({', '.join(['%s'] * len(flights))})")
+            params.extend(flights)
+        if routes:
+            conditions.append(f"f.route_id IN ({', '.join(['%s'] * len(routes))})")
+            params.extend(int(key) for key in routes)
+        fresh = self.read_rows("AND (" + " OR ".join(conditions) + ")", params)
+
+        # Flights named in the log but no longer on the board were removed or rescheduled away
+        for flight_number in flights - fresh.keys():
+            self.rows.pop(flight_number, None)
+        self.rows.update(fresh)
+        return flights | fresh.keys()
+
+    def sorted_rows(self):
+        """Board rows ordered by departure time, then flight number"""
+        return sorted(self.rows.values(), key=lambda row: (row[2], row[0]))
+
+
+def log_change(cursor, entity, key, port_ids, operation="insert"):
+    """Append one change_log row per affected port, inside the caller's transaction"""
+    cursor.executemany(
+        "INSERT INTO change_log (port_id, entity, entity_key, operation) VALUES (%s, %s, %s, %s)",
+        [(port_id, entity, str(key), operation) for port_id in port_ids]
+    )
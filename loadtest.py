@@ -0,0 +1,426 @@
+"""Load generator for the query, search, insert and booking paths.
+
+A weighted mix of departures and arrivals lookups, flight finder searches,
+enter_flight writes and seat bookings is replayed with realistic arguments
+drawn from the database itself. It runs either in-process on
+SpaceTravelCore/BookingEngine (one connection per worker, one QueryCache
+shared by all, as in service.py) or over HTTP against service.py; both go
+through the same cached board path. Two driving modes:
+
+* closed loop (``--mode closed``): each of --workers clients sends its
+  next request as soon as the last one returns, plus optional think time.
+  Throughput settles where the system saturates.
+* open loop (``--mode open``): requests arrive as a Poisson process at
+  --rate per second whatever the response times. Latency is measured from
+  the scheduled arrival, so queueing shows up in the percentiles and is
+  not hidden by a slow client (coordinated omission). Arrivals that find
+  more than --max-backlog requests already waiting are counted as dropped.
+
+Every --interval seconds a line reports throughput, error rate and
+p50/p95/p99 latency for that window, with a per-operation summary at the
+end. Raise --rate (or --workers) between runs to find the point where
+throughput stops growing and p99 takes off.
+
+enter_flight and booking write to the database, so point the test at a
+scratch copy:
+
+    python loadtest.py --database dbproject_test --mode open --rate 200 --seconds 60
+    python loadtest.py --url http://127.0.0.1:8080 --mix departures=5,arrivals=5,find=2,flight=1
+"""
+import argparse
+import json
+import math
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from functools import partial
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+import mysql.connector
+
+from cache import QueryCache
+from connection import DATABASE, connect
+from core import SpaceTravelCore, ValidationError
+from service import MAX_ROWS
+from schedule import DAYS_OF_WEEK, day_bit
+
+DEFAULT_MIX = {"departures": 35, "arrivals": 35, "find": 20, "flight": 5, "book": 5}
+
+
+class Workload:
+    """Request arguments sampled from the ports, routes, crafts and flights in the database"""
+
+    def __init__(self, ports, routes, crafts, flights):
+        self.ports = ports          # port names
+        self.routes = routes        # (route_id, distance)
+        self.crafts = crafts        # (type_name, max_range)
+        self.flights = flights      # (flight_number, schedule_mask)
+        self.run_id = f"{random.randrange(16 ** 4):04x}"
+        self.sequence = iter(range(1, sys.maxsize))
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_db(cls, db):
+        cursor = db.cursor()
+        cursor.execute("SELECT port_name FROM spaceports")
+        ports = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT route_id, distance FROM routes")
+        routes = cursor.fetchall()
+        cursor.execute("SELECT type_name, max_range FROM SpacecraftTypes")
+        crafts = cursor.fetchall()
+        cursor.execute("SELECT flight_number, schedule_mask FROM flights WHERE schedule_mask <> 0")
+        flights = cursor.fetchall()
+        cursor.close()
+        if len(ports) < 2:
+            raise RuntimeError("The database needs at least two spaceports to generate load.")
+        return cls(ports, routes, crafts, flights)
+
+    def port_range(self, rng):
+        return rng.choice(self.ports), rng.choice(DAYS_OF_WEEK), rng.choice(DAYS_OF_WEEK)
+
+    def search(self, rng):
+        origin, destination = rng.sample(self.ports, 2)
+        departure = f"{rng.randrange(24):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+        return rng.choice(DAYS_OF_WEEK), origin, destination, departure
+
+    def new_flight(self, rng):
+        if not self.routes or not self.crafts:
+            return None
+        route_id, distance = rng.choice(self.routes)
+        able = [name for name, max_range in self.crafts if max_range >= distance]
+        with self.lock:
+            flight_number = f"LT{self.run_id}-{next(self.sequence)}"
+        days = ",".join(rng.sample(DAYS_OF_WEEK, rng.randint(1, 3)))
+        departure = f"{rng.randrange(24):02d}:{rng.choice((0, 30)):02d}"
+        return (flight_number, route_id, rng.choice(able or [self.crafts[0][0]]), days, departure,
+                rng.choice((1.5, 3.0, 6.0)))
+
+    def booking(self, rng, today):
+        if not self.flights:
+            return None
+        flight_number, mask = rng.choice(self.flights)
+        # Next date within two weeks on which the flight operates
+        for offset in range(1, 15):
+            flight_date = today + timedelta(days=offset)
+            if mask & day_bit(DAYS_OF_WEEK[flight_date.weekday()]):
+                return [(flight_number, flight_date)]
+        return None
+
+
+class Rejected(Exception):
+    """The request was refused for a business rule (capacity, sold out, bad input)"""
+
+
+class CoreClient:
+    """Runs operations in-process on a SpaceTravelCore with its own connection"""
+
+    def __init__(self, connect_fn, cache=None):
+        self.core = SpaceTravelCore(connect_fn(), cache=cache)
+        self.engine = None
+
+    def board(self, cached, query, port, start_day, end_day):
+        # The GUI's and service.py's path: the cached board, or a direct read when it is too large to cache
+        if cached(start_day, end_day, port) is None:
+            self.core.query_rows(query(start_day, end_day, port), MAX_ROWS)
+        # End the read transaction as the app does between requests
+        self.core.db.rollback()
+
+    def departures(self, port, start_day, end_day):
+        self.board(self.core.departures, self.core.departures_query, port, start_day, end_day)
+
+    def arrivals(self, port, start_day, end_day):
+        self.board(self.core.arrivals, self.core.arrivals_query, port, start_day, end_day)
+
+    def find(self, day, origin, destination, departure):
+        self.core.find_itineraries(day, origin, destination, departure, 2, 24.0)
+        self.core.db.rollback()
+
+    def flight(self, *values):
+        self.core.enter_flight(*values)
+
+    def book(self, legs):
+        from booking import BookingEngine, BookingError
+
+        if self.engine is None:
+            self.engine = BookingEngine(self.core.db)
+        try:
+            self.engine.book(legs, 1, "loadtest")
+        except BookingError as e:
+            raise Rejected(str(e))
+
+    def close(self):
+        self.core.close()
+
+
+class HttpClient:
+    """Runs operations against service.py"""
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, path, params=None, body=None):
+        url = f"{self.url}{path}" + (f"?{urlencode(params)}" if params else "")
+        data = json.dumps(body).encode() if body is not None else None
+        request = Request(url, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except HTTPError as e:
+            e.read()
+            if e.code in (400, 404, 422):
+                raise Rejected(f"HTTP {e.code}")
+            raise
+
+    def departures(self, port, start_day, end_day):
+        self.request("/api/query/spaceportQuery", {"port_name": port, "direction": "departures",
+                                                   "start_day": start_day, "end_day": end_day})
+
+    def arrivals(self, port, start_day, end_day):
+        self.request("/api/query/spaceportQuery", {"port_name": port, "direction": "arrivals",
+                                                   "start_day": start_day, "end_day": end_day})
+
+    def find(self, day, origin, destination, departure):
+        self.request("/api/query/flightFinder", {"day": day, "origin": origin, "destination": destination,
+                                                 "time": departure})
+
+    def flight(self, flight_number, route_id, spacecraft_type, days, departure_time, flight_duration):
+        self.request("/api/flights", body={
+            "flight_number": flight_number, "route_id": route_id, "spacecraft_type": spacecraft_type,
+            "days": days, "departure_time": departure_time, "flight_duration": flight_duration})
+
+    def book(self, legs):
+        raise Rejected("booking is not served over HTTP")
+
+    def close(self):
+        pass
+
+
+def operation_args(name, workload, rng, today):
+    """Arguments for one operation, or None if the database has nothing to drive it with"""
+    if name in ("departures", "arrivals"):
+        return workload.port_range(rng)
+    if name == "find":
+        return workload.search(rng)
+    if name == "flight":
+        return workload.new_flight(rng)
+    legs = workload.booking(rng, today)
+    return (legs,) if legs else None
+
+
+def execute(client, name, args):
+    """'ok', 'rejected' or 'error' for one operation"""
+    try:
+        getattr(client, name)(*args)
+        return "ok"
+    except (Rejected, ValidationError, ValueError):
+        return "rejected"
+    except Exception:
+        return "error"
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return float("nan")
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Recorder:
+    """Thread-safe sample store that also reports each interval as it closes"""
+
+    def __init__(self, interval, out=sys.stdout):
+        self.interval = interval
+        self.out = out
+        self.lock = threading.Lock()
+        self.window = []
+        self.samples = []
+        self.dropped = 0
+        self.start = time.monotonic()
+
+    def record(self, name, latency, outcome):
+        with self.lock:
+            self.window.append((name, latency, outcome))
+
+    def drop(self):
+        with self.lock:
+            self.dropped += 1
+
+    def flush(self):
+        with self.lock:
+            window, self.window = self.window, []
+            dropped, self.dropped = self.dropped, 0
+        self.samples.extend(window)
+        elapsed = time.monotonic() - self.start
+        latencies = sorted(latency for _, latency, _ in window)
+        errors = sum(outcome == "error" for _, _, outcome in window)
+        rejected = sum(outcome == "rejected" for _, _, outcome in window)
+        print(f"{elapsed:7.1f}s {len(window) / self.interval:9.1f} req/s  "
+              f"err {errors / max(len(window), 1):6.1%}  rej {rejected / max(len(window), 1):6.1%}  "
+              f"p50 {percentile(latencies, 0.50) * 1000:8.1f}  p95 {percentile(latencies, 0.95) * 1000:8.1f}  "
+              f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms" + (f"  dropped {dropped}" if dropped else ""),
+              file=self.out, flush=True)
+
+    def report(self, elapsed):
+        print(f"\n{'operation':>10} {'count':>8} {'req/s':>9} {'err':>7} {'rej':>7} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=self.out)
+        names = sorted({name for name, _, _ in self.samples})
+        for name in names + ["all"]:
+            rows = [s for s in self.samples if name in ("all", s[0])]
+            latencies = sorted(latency for _, latency, _ in rows)
+            errors = sum(outcome == "error" for _, _, outcome in rows)
+            rejected = sum(outcome == "rejected" for _, _, outcome in rows)
+            print(f"{name:>10} {len(rows):8d} {len(rows) / elapsed:9.1f} {errors / max(len(rows), 1):7.1%} "
+                  f"{rejected / max(len(rows), 1):7.1%} {percentile(latencies, 0.50) * 1000:9.1f} "
+                  f"{percentile(latencies, 0.95) * 1000:9.1f} {percentile(latencies, 0.99) * 1000:9.1f}",
+                  file=self.out)
+
+
+def closed_loop(make_client, workload, mix, recorder, deadline, workers, think_time, seed):
+    names, weights = zip(*mix.items())
+    today = date.today()
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = make_client()
+        try:
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                args = operation_args(name, workload, rng, today)
+                if args is None:
+                    continue
+                start = time.monotonic()
+                outcome = execute(client, name, args)
+                recorder.record(name, time.monotonic() - start, outcome)
+                if think_time:
+                    time.sleep(rng.expovariate(1 / think_time))
+        finally:
+            client.close()
+
+    return [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(workers)]
+
+
+def open_loop(make_client, workload, mix, recorder, deadline, workers, rate, max_backlog, seed):
+    names, weights = zip(*mix.items())
+    today = date.today()
+    arrivals = queue.Queue()
+
+    def scheduler():
+        rng = random.Random(seed)
+        due = time.monotonic()
+        while due < deadline:
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if arrivals.qsize() >= max_backlog:
+                recorder.drop()
+            else:
+                name = rng.choices(names, weights)[0]
+                arrivals.put((due, name, operation_args(name, workload, rng, today)))
+            due += rng.expovariate(rate)
+        for _ in range(workers):
+            arrivals.put(None)
+
+    def worker():
+        client = make_client()
+        try:
+            while True:
+                item = arrivals.get()
+                if item is None or time.monotonic() > deadline:
+                    return
+                due, name, args = item
+                if args is None:
+                    continue
+                outcome = execute(client, name, args)
+                # Measured from the scheduled arrival so time spent queued counts
+                recorder.record(name, time.monotonic() - due, outcome)
+        finally:
+            client.close()
+
+    return ([threading.Thread(target=scheduler, daemon=True)]
+            + [threading.Thread(target=worker, daemon=True) for _ in range(workers)])
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}', expected {', '.join(DEFAULT_MIX)}.")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the query, search, insert and booking paths")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--workers", type=int, default=16, help="clients (closed) or worker threads (open)")
+    parser.add_argument("--rate", type=float, default=100.0, help="open loop: arrivals per second")
+    parser.add_argument("--max-backlog", type=int, default=1000, help="open loop: queued arrivals before dropping")
+    parser.add_argument("--think-time", type=float, default=0.0, help="closed loop: mean seconds between requests")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds per report line")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="weights, e.g. departures=35,arrivals=35,find=20,flight=5,book=5")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="drive service.py at this base URL instead of the core in-process")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--database", default=DATABASE)
+    parser.add_argument("--credentials", default="credentials.json")
+    parser.add_argument("--cache-ttl", type=float, default=30.0,
+                        help="in-process: seconds to keep board and route results, as service.py does "
+                             "(0 disables the cache)")
+    args = parser.parse_args()
+
+    connect_fn = partial(connect, args.database, args.credentials, host=args.host)
+    try:
+        db = connect_fn()
+    except (OSError, mysql.connector.Error) as e:
+        print(f"Failed to connect to database: {e}", file=sys.stderr)
+        return 2
+    try:
+        workload = Workload.from_db(db)
+        if "book" in args.mix and not args.url:
+            from booking import create_booking_tables
+
+            create_booking_tables(db)
+    finally:
+        db.close()
+
+    if args.url:
+        make_client = partial(HttpClient, args.url)
+    else:
+        # One cache shared by every client, like service.py's pool
+        cache = QueryCache(args.cache_ttl) if args.cache_ttl > 0 else None
+        make_client = partial(CoreClient, connect_fn, cache=cache)
+    recorder = Recorder(args.interval)
+    deadline = time.monotonic() + args.seconds
+    if args.mode == "closed":
+        threads = closed_loop(make_client, workload, args.mix, recorder, deadline, args.workers,
+                              args.think_time, args.seed)
+    else:
+        threads = open_loop(make_client, workload, args.mix, recorder, deadline, args.workers,
+                            args.rate, args.max_backlog, args.seed)
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    while time.monotonic() < deadline:
+        time.sleep(min(args.interval, max(deadline - time.monotonic(), 0)))
+        recorder.flush()
+    for thread in threads:
+        thread.join(timeout=30)
+    if recorder.window:
+        # Requests still in flight at the deadline
+        recorder.flush()
+    recorder.report(time.monotonic() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""In-memory name search for spaceports, space stations and planets.
+
+A character trie answers as-you-type prefix completion and a trigram index
+answers "did you mean" suggestions for misspelled names, both without a
+database round trip. Matching is case-insensitive; results keep the
+stored spelling. enter_planet, enter_spacestation and enter_spaceport add
+new names as they are committed.
+"""
+import heapq
+
+KINDS = ("spaceport", "station", "planet")
+COMMON_GRAM_LIMIT = 500
+
+
+class TrieNode:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = None
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Levenshtein distance, used to order suggestions that share as many trigrams"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    """Prefix and fuzzy lookup over one set of names per kind"""
+
+    def __init__(self):
+        self.roots = {kind: TrieNode() for kind in KINDS}
+        self.names = {kind: {} for kind in KINDS}      # lowercase -> stored name
+        self.grams = {kind: {} for kind in KINDS}      # trigram -> set of lowercase names
+        self.gram_counts = {kind: {} for kind in KINDS}
+
+    @classmethod
+    def from_db(cls, db):
+        index = cls()
+        cursor = db.cursor()
+        for kind, sql in (("spaceport", "SELECT port_name FROM spaceports"),
+                          ("station", "SELECT station_name FROM spacestations"),
+                          ("planet", "SELECT planet_name FROM planets")):
+            cursor.execute(sql)
+            for (name,) in cursor.fetchall():
+                index.add(name, kind)
+        cursor.close()
+        return index
+
+    def add(self, name, kind="spaceport"):
+        key = name.strip().lower()
+        if not key or key in self.names[kind]:
+            return
+        self.names[kind][key] = name.strip()
+
+        node = self.roots[kind]
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+        node.names = key
+
+        grams = trigrams(key)
+        self.gram_counts[kind][key] = len(grams)
+        for gram in grams:
+            self.grams[kind].setdefault(gram, set()).add(key)
+
+    def contains(self, name, kind="spaceport"):
+        return name.strip().lower() in self.names[kind]
+
+    def canonical(self, name, kind="spaceport"):
+        """Stored spelling of a name, or None if it is not indexed"""
+        return self.names[kind].get(name.strip().lower())
+
+    def complete(self, prefix, kind="spaceport", limit=10):
+        """Names starting with prefix, shortest and then alphabetical first"""
+        node = self.roots[kind]
+        for char in prefix.strip().lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        # Breadth-first walk, so shorter completions come out first
+        found, level = [], [node]
+        while level and len(found) < limit:
+            next_level = []
+            for current in level:
+                if current.names is not None:
+                    found.append(current.names)
+                next_level.extend(current.children[c] for c in sorted(current.children))
+            level = next_level
+        return [self.names[kind][key] for key in found[:limit]]
+
+    def suggest(self, text, kind="spaceport", limit=5):
+        """Closest names by shared trigrams, tie-broken by edit distance"""
+        key = text.strip().lower()
+        if not key:
+            return []
+        query_grams = trigrams(key)
+        shared = {}
+        # Rarest trigrams first; once some candidates exist, very common ones
+        # (" po", "ort", ...) add little but would touch most of the index
+        postings = sorted((self.grams[kind].get(gram, ()) for gram in query_grams), key=len)
+        for posting in postings:
+            if shared and len(posting) > COMMON_GRAM_LIMIT:
+                break
+            for candidate in posting:
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        def similarity(candidate):
+            # Dice coefficient over trigram sets
+            return 2 * shared[candidate] / (len(query_grams) + self.gram_counts[kind][candidate])
+
+        # Edit distance only for the strongest trigram matches
+        best = heapq.nlargest(limit * 4, shared, key=similarity)
+        best.sort(key=lambda c: (-similarity(c), edit_distance(key, c), c))
+        return [self.names[kind][candidate] for candidate in best[:limit]]
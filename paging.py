@@ -0,0 +1,103 @@
+"""Page-at-a-time readers over unbuffered MySQL cursors.
+
+An unbuffered cursor leaves the result set on the server and pulls rows as
+they are fetched, so a pager keeps only the current page in memory. The
+cursor ties up its connection until it is exhausted or closed, which is why
+every pager opens a dedicated connection instead of borrowing the window's.
+IterPager pages rows computed in Python, such as dated schedules, the same way.
+"""
+from itertools import islice
+
+import mysql.connector
+
+from connection import connect
+
+PAGE_SIZE = 500
+
+
+class ResultPager:
+    """Stream the rows of one query in fixed-size pages"""
+
+    def __init__(self, sql, params=(), transform=None, page_size=PAGE_SIZE, connect_fn=connect,
+                 count=True):
+        self.sql = sql.strip().rstrip(";")
+        self.params = tuple(params)
+        self.transform = transform
+        self.page_size = page_size
+        self.fetched = 0
+        self.exhausted = False
+        self.db = connect_fn()
+        self.total = self._count() if count else None
+        self.cursor = self.db.cursor(buffered=False)
+        self.cursor.execute(self.sql, self.params)
+        self.columns = [d[0] for d in self.cursor.description]
+        self.description = self.cursor.description
+
+    def _count(self):
+        """Row count up front, read before the streaming cursor ties up the connection"""
+        cursor = self.db.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM ({self.sql}) AS counted", self.params)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def fetch_page(self):
+        """Next page of rows, empty once the result set is exhausted"""
+        if self.exhausted:
+            return []
+        rows = self.cursor.fetchmany(self.page_size)
+        if len(rows) < self.page_size:
+            self.close()
+        self.fetched += len(rows)
+        if self.transform:
+            rows = [self.transform(row) for row in rows]
+        return rows
+
+    def __iter__(self):
+        """Yield every remaining row, one page in memory at a time"""
+        while not self.exhausted:
+            yield from self.fetch_page()
+
+    def close(self):
+        if self.exhausted:
+            return
+        self.exhausted = True
+        try:
+            self.cursor.close()
+        except mysql.connector.Error:
+            pass  # abandoned mid-stream, dropping the connection discards the rest
+        finally:
+            try:
+                self.db.close()
+            except mysql.connector.Error:
+                pass
+
+
+class IterPager:
+    """ResultPager interface over rows produced by a generator instead of a cursor"""
+
+    def __init__(self, columns, rows, page_size=PAGE_SIZE):
+        self.columns = list(columns)
+        self.description = None
+        self.rows = iter(rows)
+        self.page_size = page_size
+        self.total = None
+        self.fetched = 0
+        self.exhausted = False
+
+    def fetch_page(self):
+        if self.exhausted:
+            return []
+        rows = list(islice(self.rows, self.page_size))
+        if len(rows) < self.page_size:
+            self.close()
+        self.fetched += len(rows)
+        return rows
+
+    def __iter__(self):
+        while not self.exhausted:
+            yield from self.fetch_page()
+
+    def close(self):
+        self.exhausted = True
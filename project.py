@@ -2,12 +2,17 @@ import sys
 from PySide6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, 
                                QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, 
                                QLineEdit, QPushButton, QMessageBox, QInputDialog,
-                               QTextEdit, QScrollArea, QFrame, QGroupBox)
-from PySide6.QtCore import Qt
+                               QTextEdit, QScrollArea, QFrame, QGroupBox, QCompleter,
+                               QDialog)
+from PySide6.QtCore import Qt, QTimer, QStringListModel
 from PySide6.QtGui import QFont, QPalette, QColor
 import mysql.connector
-import json
-import re
+from datetime import date
+from cache import QueryCache
+from connection import connect
+from core import ITINERARY_COLUMNS, SpaceTravelCore, ValidationError, itinerary_rows
+from dated_schedule import is_date
+from schedule import DAYS_OF_WEEK
 
 class SpaceTravelDB(QMainWindow):
     def __init__(self):
@@ -18,16 +23,9 @@ class SpaceTravelDB(QMainWindow):
     def init_database(self):
         """Initialize database connection"""
         try:
-            with open("credentials.json", "r") as file:
-                credentials = json.load(file)
-
-            self.db = mysql.connector.connect(
-                host="localhost",
-                user=credentials["user"],
-                password=credentials["password"],
-                database="dbproject"
-            )
-            self.create_nonexisting_tables()
+            self.db = connect()
+            self.core = SpaceTravelCore(self.db, confirm=self.confirm_save, cache=QueryCache())
+            self.core.create_nonexisting_tables()
         except Exception as e:
             QMessageBox.critical(None, "Connection Error", f"Failed to connect to database:\n{e}")
             sys.exit()
@@ -95,14 +93,24 @@ class SpaceTravelDB(QMainWindow):
         central_widget_layout = QVBoxLayout(central_widget)
         central_widget_layout.addWidget(self.tab_widget)
         
-        # Create tabs
-        self.create_insert_tab()
-        self.create_query_tab()
-        
-    def create_insert_tab(self):
+        # Create tabs; each one is filled in the first time it is shown
+        self.tab_builders = {}
+        for title, builder in self.TABS:
+            index = self.tab_widget.addTab(QWidget(), title)
+            self.tab_builders[index] = getattr(self, builder)
+        self.tab_widget.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tab_widget.currentIndex())
+
+    TABS = [("Insert Data", "create_insert_tab"), ("Queries", "create_query_tab")]
+
+    def build_tab(self, index):
+        """Build a tab's widgets on its first show"""
+        builder = self.tab_builders.pop(index, None)
+        if builder is not None:
+            builder(self.tab_widget.widget(index))
+
+    def create_insert_tab(self, insert_tab):
         """Create the data insertion tab"""
-        insert_tab = QWidget()
-        self.tab_widget.addTab(insert_tab, "Insert Data")
         
         # Create scroll area
         scroll = QScrollArea()
@@ -125,11 +133,8 @@ class SpaceTravelDB(QMainWindow):
         
         main_layout.addStretch()
         
-    def create_query_tab(self):
+    def create_query_tab(self, query_tab):
         """Create the query tab"""
-        query_tab = QWidget()
-        self.tab_widget.addTab(query_tab, "Queries")
-        
         layout = QVBoxLayout(query_tab)
         
         # Title
@@ -165,6 +170,22 @@ class SpaceTravelDB(QMainWindow):
         btn6.clicked.connect(self.create_new_flight_interactive)
         buttons_layout.addWidget(btn6)
 
+        btn7 = QPushButton("Live Departure/Arrival Board")
+        btn7.clicked.connect(self.query_live_board)
+        buttons_layout.addWidget(btn7)
+
+        btn8 = QPushButton("Network Analytics")
+        btn8.clicked.connect(self.query_network_analytics)
+        buttons_layout.addWidget(btn8)
+
+        btn9 = QPushButton("Book Seats")
+        btn9.clicked.connect(self.book_seats_interactive)
+        buttons_layout.addWidget(btn9)
+
+        btn10 = QPushButton("Shortest Route Distances from Port")
+        btn10.clicked.connect(self.query_route_distances)
+        buttons_layout.addWidget(btn10)
+
         layout.addLayout(buttons_layout)
         layout.addStretch()
 
@@ -202,6 +223,7 @@ class SpaceTravelDB(QMainWindow):
         
         layout.addWidget(QLabel("Planet Associated:"), 1, 0)
         self.station_planet_entry = QLineEdit()
+        self.attach_completer(self.station_planet_entry, "planet")
         layout.addWidget(self.station_planet_entry, 1, 1)
         
         # layout.addWidget(QLabel("Capacity Limit:"), 2, 0)
@@ -225,10 +247,12 @@ class SpaceTravelDB(QMainWindow):
         
         layout.addWidget(QLabel("Planet Associated:"), 1, 0)
         self.port_planet_entry = QLineEdit()
+        self.attach_completer(self.port_planet_entry, "planet")
         layout.addWidget(self.port_planet_entry, 1, 1)
         
         layout.addWidget(QLabel("Station Name:"), 2, 0)
         self.port_station_entry = QLineEdit()
+        self.attach_completer(self.port_station_entry, "station")
         layout.addWidget(self.port_station_entry, 2, 1)
         
         layout.addWidget(QLabel("Fee:"), 3, 0)
@@ -275,10 +299,12 @@ class SpaceTravelDB(QMainWindow):
         
         layout.addWidget(QLabel("Origin Port Name:"), 0, 0)
         self.route_origin_entry = QLineEdit()
+        self.attach_completer(self.route_origin_entry)
         layout.addWidget(self.route_origin_entry, 0, 1)
         
         layout.addWidget(QLabel("Destination Port Name:"), 1, 0)
         self.route_dest_entry = QLineEdit()
+        self.attach_completer(self.route_dest_entry)
         layout.addWidget(self.route_dest_entry, 1, 1)
         
         layout.addWidget(QLabel("Distance:"), 2, 0)
@@ -302,10 +328,12 @@ class SpaceTravelDB(QMainWindow):
 
         layout.addWidget(QLabel("Origin Port Name:"), 1, 0)
         self.flight_origin_entry = QLineEdit()
+        self.attach_completer(self.flight_origin_entry)
         layout.addWidget(self.flight_origin_entry, 1, 1)
 
         layout.addWidget(QLabel("Destination Port Name:"), 2, 0)
         self.flight_dest_entry = QLineEdit()
+        self.attach_completer(self.flight_dest_entry)
         layout.addWidget(self.flight_dest_entry, 2, 1)
 
         layout.addWidget(QLabel("Distance:"), 3, 0)
@@ -338,10 +366,10 @@ class SpaceTravelDB(QMainWindow):
         cursor = self.db.cursor()
 
         # Get source and destination ports
-        source, ok1 = QInputDialog.getText(self, "New Flight", "Enter source spaceport name:")
+        source, ok1 = self.ask_port_name("New Flight", "Enter source spaceport name:")
         if not ok1 or not source.strip():
             return
-        dest, ok2 = QInputDialog.getText(self, "New Flight", "Enter destination spaceport name:")
+        dest, ok2 = self.ask_port_name("New Flight", "Enter destination spaceport name:")
         if not ok2 or not dest.strip():
             return
         if source == dest:
@@ -354,16 +382,12 @@ class SpaceTravelDB(QMainWindow):
             return
 
         # Ensure spaceports exist and get fees
-        cursor.execute("SELECT fee FROM spaceports WHERE port_name = %s", (source,))
-        src_row = cursor.fetchone()
-        cursor.execute("SELECT fee FROM spaceports WHERE port_name = %s", (dest,))
-        dest_row = cursor.fetchone()
+        src_port = self.core.fares.port_fee_by_name(source)
+        dest_port = self.core.fares.port_fee_by_name(dest)
 
-        if not src_row or not dest_row:
+        if not src_port or not dest_port:
             QMessageBox.warning(self, "Not Found", "Source or destination port not found.")
             return
-        src_fee = src_row[0]
-        dest_fee = dest_row[0]
 
         # Try to find existing route
         cursor.execute("SELECT route_id FROM routes WHERE origin_id = (SELECT spaceport_id FROM spaceports WHERE port_name = %s) AND dest_id = (SELECT spaceport_id FROM spaceports WHERE port_name = %s)", (source, dest))
@@ -383,8 +407,7 @@ class SpaceTravelDB(QMainWindow):
                 return
 
         # Get spacecrafts that can cover distance
-        cursor.execute("SELECT type_name FROM SpacecraftTypes WHERE max_range >= %s", (dist,))
-        ships = [row[0] for row in cursor.fetchall()]
+        ships = [craft.type_name for craft in self.core.crafts.eligible(dist)]
         if not ships:
             QMessageBox.warning(self, "No Spacecraft", "No spacecrafts can cover the distance.")
             return
@@ -405,13 +428,13 @@ class SpaceTravelDB(QMainWindow):
             return
 
         try:
-            dep_time = self.parse_time(time_str)
+            dep_time = self.core.parse_time(time_str)
         except ValueError as e:
             QMessageBox.critical(self, "Time Format Error", str(e))
             return
 
-        # Calculate fee (example logic)
-        fee_estimate = src_fee + dest_fee
+        # Calculate fee from both ports' fees
+        fee_estimate = self.core.fares.quote_ports((src_port[0], dest_port[0]))
 
         # Confirm flight details
         summary = (
@@ -546,7 +569,7 @@ class SpaceTravelDB(QMainWindow):
         days = self.flight_days_entry.text().strip()
         time_str = self.flight_time_entry.text().strip()
         try:
-            dep_time = self.parse_time(time_str)
+            dep_time = self.core.parse_time(time_str)
             duration = float(self.flight_duration_entry.text())
         except Exception:
             QMessageBox.warning(self, "Invalid Input", "Check time format (HH:MM) and ensure duration is a number.")
@@ -593,33 +616,74 @@ class SpaceTravelDB(QMainWindow):
         self.flight_time_entry.clear()
         self.flight_duration_entry.clear()
 
+    # Name completion
+    def attach_completer(self, line_edit, kind="spaceport"):
+        """As-you-type completion from the name index, falling back to fuzzy matches"""
+        model = QStringListModel(line_edit)
+        completer = QCompleter(model, line_edit)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        line_edit.setCompleter(completer)
+
+        def update(text):
+            matches = self.core.names.complete(text, kind) or self.core.names.suggest(text, kind)
+            model.setStringList(matches)
+            if matches and text.strip():
+                completer.complete()
+            else:
+                completer.popup().hide()
+
+        line_edit.textEdited.connect(update)
+
+    def ask_port_name(self, title, label, kind="spaceport"):
+        """Text prompt with name completion; offers the nearest match for an unknown name"""
+        dialog = QInputDialog(self)
+        dialog.setWindowTitle(title)
+        dialog.setLabelText(label)
+        dialog.setInputMode(QInputDialog.TextInput)
+        self.attach_completer(dialog.findChild(QLineEdit), kind)
+        if dialog.exec() != QDialog.Accepted:
+            return "", False
+
+        name = dialog.textValue().strip()
+        if not name or self.core.names.contains(name, kind):
+            return self.core.names.canonical(name, kind) or name, True
+        suggestions = self.core.names.suggest(name, kind, limit=1)
+        if suggestions:
+            reply = QMessageBox.question(self, "Unknown Name",
+                                         f"'{name}' was not found. Did you mean '{suggestions[0]}'?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply == QMessageBox.Yes:
+                return suggestions[0], True
+        return name, True
+
     # Query methods
     def query_ports_with_flights(self):
-        port_name, ok = QInputDialog.getText(self, "Query", "Enter port name:")
+        port_name, ok = self.ask_port_name("Query", "Enter port name:")
         if ok and port_name:
             self.get_port_by_port_name_with_flights(port_name)
 
     def query_departures_by_date_range(self):
-        start_day, ok1 = QInputDialog.getText(self, "Query", "Enter start day (e.g., Monday):")
+        start_day, ok1 = QInputDialog.getText(self, "Query", "Enter start day (e.g., Monday) or date (YYYY-MM-DD):")
         if not ok1: return
-        end_day, ok2 = QInputDialog.getText(self, "Query", "Enter end day (e.g., Friday):")
+        end_day, ok2 = QInputDialog.getText(self, "Query", "Enter end day (e.g., Friday) or date (YYYY-MM-DD):")
         if not ok2: return
-        port_name, ok3 = QInputDialog.getText(self, "Query", "Enter port name:")
+        port_name, ok3 = self.ask_port_name("Query", "Enter port name:")
         if ok3 and all([start_day, end_day, port_name]):
             self.get_departures_by_date_range_and_port(start_day, end_day, port_name)
 
     def query_arrivals_by_date_range(self):
-        start_day, ok1 = QInputDialog.getText(self, "Query", "Enter start day (e.g., Monday):")
+        start_day, ok1 = QInputDialog.getText(self, "Query", "Enter start day (e.g., Monday) or date (YYYY-MM-DD):")
         if not ok1: return
-        end_day, ok2 = QInputDialog.getText(self, "Query", "Enter end day (e.g., Friday):")
+        end_day, ok2 = QInputDialog.getText(self, "Query", "Enter end day (e.g., Friday) or date (YYYY-MM-DD):")
         if not ok2: return
-        port_name, ok3 = QInputDialog.getText(self, "Query", "Enter port name:")
+        port_name, ok3 = self.ask_port_name("Query", "Enter port name:")
         if ok3 and all([start_day, end_day, port_name]):
             self.get_arrivals_by_date_range_and_port(start_day, end_day, port_name)
 
     def query_flights_by_route(self):
-        origin_name, ok1 = QInputDialog.getText(self, "Query", "Enter origin port name:")
-        dest_name, ok2 = QInputDialog.getText(self, "Query", "Enter destination port name:")
+        origin_name, ok1 = self.ask_port_name("Query", "Enter origin port name:")
+        dest_name, ok2 = self.ask_port_name("Query", "Enter destination port name:")
         if not ok1 or not ok2 or not origin_name.strip() or not dest_name.strip():
             return
         
@@ -633,34 +697,112 @@ class SpaceTravelDB(QMainWindow):
             QMessageBox.warning(self, "Not Found", "One or both port names not found.")
             return
 
-        origin_id = origin_result[0]
-        dest_id = dest_result[0]
-
-        cursor.execute("""
-            SELECT f.flight_number, s.port_name AS origin, d.port_name AS destination, f.departure_time
-            FROM flights f
-            JOIN routes r ON f.route_id = r.route_id
-            JOIN spaceports s ON r.origin_id = s.spaceport_id
-            JOIN spaceports d ON r.dest_id = d.spaceport_id
-            WHERE r.origin_id = %s AND r.dest_id = %s
-        """, (origin_id, dest_id))
-
-        rows = cursor.fetchall()
-        if not rows:
-            QMessageBox.information(self, "No Results", "No flights found between those ports.")
+        self.get_flights_by_route(origin_result[0], dest_result[0])
+
+    def query_live_board(self):
+        port_name, ok1 = self.ask_port_name("Live Board", "Enter port name:")
+        if not ok1 or not port_name.strip():
+            return
+        direction, ok2 = QInputDialog.getItem(self, "Live Board", "Board type:",
+                                              ["Departures", "Arrivals"], editable=False)
+        if ok2:
+            self.open_live_board(port_name.strip(), direction.lower())
+
+    def book_seats_interactive(self):
+        flights, ok1 = QInputDialog.getText(self, "Book Seats", "Enter flight numbers in leg order (comma-separated):")
+        if not ok1 or not flights.strip():
+            return
+        date_str, ok2 = QInputDialog.getText(self, "Book Seats", "Enter travel date (YYYY-MM-DD):")
+        if not ok2:
+            return
+        seats, ok3 = QInputDialog.getInt(self, "Book Seats", "Number of seats:", 1, 1)
+        if not ok3:
+            return
+        passenger, ok4 = QInputDialog.getText(self, "Book Seats", "Passenger name:")
+        if not ok4 or not passenger.strip():
             return
 
-        output = "\n".join(
-            f"Flight: {r[0]}, From: {r[1]}, To: {r[2]}, Departs at: {r[3]}" for r in rows
-        )
-        QMessageBox.information(self, "Flights Between Ports", output)
+        try:
+            flight_date = date.fromisoformat(date_str.strip())
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Date must be in YYYY-MM-DD format.")
+            return
+        legs = [(f.strip(), flight_date) for f in flights.split(',') if f.strip()]
+        from booking import BookingEngine, BookingError
+        try:
+            booking_id = BookingEngine(self.db).book(legs, seats, passenger.strip())
+        except BookingError as e:
+            QMessageBox.warning(self, "Booking Failed", str(e))
+            return
+        except mysql.connector.Error as err:
+            QMessageBox.critical(self, "Database Error", f"Error: {err}")
+            return
+        QMessageBox.information(self, "Success", f"Booking {booking_id} confirmed for {seats} seat(s).")
+
+    def query_route_distances(self):
+        port_name, ok = self.ask_port_name("Route Distances", "Enter origin port name:")
+        if not ok or not port_name:
+            return
+        try:
+            from route_matrix import RouteMatrix
+        except ImportError:
+            QMessageBox.critical(self, "Missing Dependency", "Route distances need numpy (pip install numpy).")
+            return
+
+        cursor = self.db.cursor()
+        cursor.execute("SELECT spaceport_id, port_name FROM spaceports")
+        port_names = dict(cursor.fetchall())
+        origin_id = next((pid for pid, name in port_names.items() if name == port_name), None)
+        if origin_id is None:
+            QMessageBox.warning(self, "Not Found", f"Spaceport '{port_name}' not found.")
+            return
+
+        # The cached matrix is reused until its routes fingerprint changes
+        matrix = RouteMatrix.load_or_build(self.db)
+        rows = [(dest_id, port_names.get(dest_id), distance, hops)
+                for dest_id, distance, hops in matrix.reachable_from(origin_id)]
+        self.display_results(rows, f"Shortest Routes from {port_name}",
+                             ["dest_id", "dest_name", "shortest_distance", "min_hops"])
+
+    ANALYTICS_REPORTS = ["Port Utilization by Weekday", "Departure Hour Histogram", "Route Seat Capacity"]
+
+    def query_network_analytics(self):
+        report, ok = QInputDialog.getItem(self, "Network Analytics", "Report:",
+                                          self.ANALYTICS_REPORTS, editable=False)
+        if ok:
+            self.show_network_report(report)
+
+    def show_network_report(self, report):
+        try:
+            import analytics
+        except ImportError:
+            QMessageBox.critical(self, "Missing Dependency", "Network analytics needs numpy (pip install numpy).")
+            return
+        tables = analytics.NetworkTables.from_snapshot(self.core.load_snapshot())
+
+        if report == "Port Utilization by Weekday":
+            movements, utilization = analytics.port_utilization(tables)
+            columns = ["port_id", "port_name", "capacity"] + [f"{day} %" for day in DAYS_OF_WEEK]
+            rows = [(int(port_id), name, int(capacity)) + tuple(round(float(u) * 100, 1) for u in usage)
+                    for port_id, name, capacity, usage
+                    in zip(tables.port_ids, tables.port_names, tables.port_capacity, utilization)]
+        elif report == "Departure Hour Histogram":
+            counts = analytics.departure_hour_histogram(tables)
+            columns = ["depart_hour", "weekly_departures"]
+            rows = [(hour, int(count)) for hour, count in enumerate(counts)]
+        else:
+            seats = analytics.route_seat_capacity(tables)
+            columns = ["route_id", "origin_id", "dest_id", "distance", "weekly_seats"]
+            rows = [tuple(int(v) for v in row) for row in zip(tables.route_ids, tables.route_origin,
+                                                              tables.route_dest, tables.route_distance, seats)]
+        self.display_results(rows, report, columns)
 
     def query_flight_finder(self):
         dep_day, ok1 = QInputDialog.getText(self, "Query", "Enter departure day:")
         if not ok1: return
-        origin_id, ok2 = QInputDialog.getInt(self, "Query", "Enter origin port name:")
+        origin_name, ok2 = self.ask_port_name("Query", "Enter origin port name:")
         if not ok2: return
-        dest_id, ok3 = QInputDialog.getInt(self, "Query", "Enter destination port name:")
+        dest_name, ok3 = self.ask_port_name("Query", "Enter destination port name:")
         if not ok3: return
         dep_time, ok4 = QInputDialog.getText(self, "Query", "Enter desired departure time (HH:MM):")
         if not ok4: return
@@ -668,550 +810,97 @@ class SpaceTravelDB(QMainWindow):
         if not ok5: return
         max_time, ok6 = QInputDialog.getDouble(self, "Query", "Enter max total travel time (in hours):", decimals=2)
         if ok6:
-            self.flight_finder(dep_day, origin_id, dest_id, dep_time, max_stops, max_time)
-
-    # Database methods (keeping the original logic)
-    def create_planet_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS planets (
-        planet_name VARCHAR(50) NOT NULL UNIQUE,
-        size BIGINT NOT NULL,
-        population BIGINT NOT NULL,
-        PRIMARY KEY (planet_name)
-        )
-        """)
-        self.db.commit()
-
-    def create_spacestation_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS spacestations (
-            station_name VARCHAR(50) NOT NULL PRIMARY KEY,
-            planet_associated VARCHAR(50) DEFAULT NULL,
-            FOREIGN KEY (planet_associated) REFERENCES planets(planet_name) 
-        )
-        """)
-        self.db.commit()
-
-    def create_spaceports_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS spaceports (
-            spaceport_id INT PRIMARY KEY AUTO_INCREMENT,
-            port_name VARCHAR(100) NOT NULL,
-            planet_associated VARCHAR(50) NULL,
-            spacestation_name VARCHAR(50) NULL,
-            capacity INT NOT NULL,
-            fee INT NOT NULL,
-            FOREIGN KEY (planet_associated) REFERENCES planets(planet_name),
-            FOREIGN KEY (spacestation_name) REFERENCES spacestations(spacestation_name),
-            UNIQUE KEY uq_station (spacestation_name),
-            UNIQUE KEY uq_planet_port (planet_associated, port_name),
-            CONSTRAINT chk_spaceport_capacity CHECK (capacity > 0),
-            CONSTRAINT chk_spaceport_fee CHECK (fee >= 0)
-        )
-        """)
-        self.db.commit()
-
-    def create_spacecrafts_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS SpacecraftTypes (
-        type_name VARCHAR(100) PRIMARY KEY,
-        capacity  INT NOT NULL,
-        max_range     INT NOT NULL,
-        CONSTRAINT chk_sc_capacity CHECK (capacity > 0),
-        CONSTRAINT chk_sc_range    CHECK (max_range > 0)
-        )
-        """)
-        self.db.commit()
-
-    def create_routes_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS routes (
-            route_id INT PRIMARY KEY AUTO_INCREMENT,
-            origin_id INT NOT NULL,
-            dest_id INT NOT NULL,
-            dist INT NOT NULL,
-            FOREIGN KEY (origin_id) REFERENCES spaceports(spaceport_id),
-            FOREIGN KEY (dest_id) REFERENCES spaceports(spaceport_id),
-            CONSTRAINT chk_route_distance CHECK (dist > 0),
-            CONSTRAINT chk_route_not_same CHECK (origin_id <> dest_id),
-            CONSTRAINT uq_route_pair UNIQUE (origin_id, dest_id)
-        )
-        """)
-        self.db.commit()
-
-    def create_flight_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS flights (
-        flight_number   VARCHAR(20) PRIMARY KEY,
-        route_id        INT NOT NULL,
-        spacecraft_type VARCHAR(100) NOT NULL,
-        departure_time TIME NOT NULL,
-        flight_duration DECIMAL(4,2) NOT NULL,
-        FOREIGN KEY (route_id) REFERENCES routes(route_id),
-        FOREIGN KEY (spacecraft_type) REFERENCES SpacecraftTypes(type_name),
-        CONSTRAINT chk_flight_duration CHECK (flight_duration > 0)
-        )
-        """)
-        self.db.commit()
-
-    def create_flight_schedule_table(self, cursor):
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS flight_schedule (
-            flight_number VARCHAR(20) NOT NULL,
-            day_of_week   ENUM(
-                'Monday','Tuesday','Wednesday',
-                'Thursday','Friday','Saturday','Sunday'
-            ) NOT NULL,
-            PRIMARY KEY (flight_number, day_of_week),
-            FOREIGN KEY (flight_number) REFERENCES flights(flight_number)
-        )
-        """)
-        self.db.commit()
-
-    def parse_time(self, time_str):
-        """
-        Accepts 'HH:MM' or 'HH:MM:SS' (or even 'YYYY-MM-DD HH:MM:SS').
-        Returns a string 'HH:MM:SS' suitable for MySQL TIME.
-        """
-        # strip date if present
-        if ' ' in time_str:
-            time_part = time_str.split(' ')[1]
-        else:
-            time_part = time_str
-
-        parts = time_part.split(':')
-        if len(parts) == 2:
-            hh, mm = parts
-            ss = '00'
-        elif len(parts) == 3:
-            hh, mm, ss = parts
-        else:
-            raise ValueError(f"Unrecognized time format: {time_str}")
+            self.flight_finder(dep_day, origin_name, dest_name, dep_time, max_stops, max_time)
 
-        # zero-pad and validate ranges
-        hh, mm, ss = hh.zfill(2), mm.zfill(2), ss.zfill(2)
-        return f"{hh}:{mm}:{ss}"
+    # Database methods, with SpaceTravelCore's errors shown as dialogs
+    def run_insert(self, insert, *args):
+        """Run a core insert, showing any rule or database error; False if nothing was saved"""
+        try:
+            return insert(*args)
+        except ValidationError as e:
+            QMessageBox.critical(self, e.title, str(e))
+        except mysql.connector.Error as err:
+            QMessageBox.critical(self, "Database Error", f"Error: {err}")
+        return False
 
     def enter_planet(self, planet_name, size, population):
-        if not planet_name.strip():
-            QMessageBox.critical(self, "Validation Error", "Planet name cannot be empty.")
-            return False
-        if not isinstance(size, int) or size <= 0:
-            QMessageBox.critical(self, "Validation Error", "Planet size must be a positive integer.")
-            return False
-        if not isinstance(population, int) or population < 0:
-            QMessageBox.critical(self, "Validation Error", "Population must be a non-negative integer.")
-            return False
-
-        sql = """INSERT INTO planets VALUES (%s, %s, %s)"""
-        values = [planet_name, size, population]
-        return self.confirm_and_commit(sql, values)
+        return self.run_insert(self.core.enter_planet, planet_name, size, population)
 
     def enter_spacestation(self, station_name, has_spaceport, planet_associated):
-        if not station_name.strip():
-            QMessageBox.critical(self, "Validation Error", "Station name cannot be empty.")
-            return False
-
-        if planet_associated and not planet_associated.strip():
-            QMessageBox.critical(self, "Validation Error", "Planet associated must be a valid string or NULL.")
-            return False
-
-        cursor = self.db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM planets WHERE planet_name = %s", (planet_associated,))
-        if planet_associated and cursor.fetchone()[0] == 0:
-            QMessageBox.critical(self, "Validation Error", f"Planet '{planet_associated}' does not exist.")
-            return False
-
-        sql = """INSERT INTO spacestations (station_name, planet_associated) VALUES (%s, %s)"""
-        values = [station_name, planet_associated]
-        return self.confirm_and_commit(sql, values)
-
+        return self.run_insert(self.core.enter_spacestation, station_name, has_spaceport, planet_associated)
 
     def enter_spaceport(self, port_name, planet_associated, spacestation_name, fee, capacity):
-        if not port_name.strip():
-            QMessageBox.critical(self, "Validation Error", "Port name cannot be empty.")
-            return False
-        if planet_associated is None and spacestation_name is None:
-            QMessageBox.critical(self, "Validation Error", "Must be owned by either a planet or a spacestation.")
-            return False
-        if not isinstance(fee, int) or fee < 0:
-            QMessageBox.critical(self, "Validation Error", "Fee must be a non-negative integer.")
-            return False
-        if not isinstance(capacity, int) or capacity <= 0:
-            QMessageBox.critical(self, "Validation Error", "Capacity must be a positive integer.")
-            return False
-        if planet_associated is None and spacestation_name is not None:
-            if port_name != spacestation_name:
-                QMessageBox.critical(self, "Validation Error", "Port name must match station name if owned by a spacestation.")
-                return False
-        if planet_associated and spacestation_name:
-            QMessageBox.critical(self, "Validation Error", "A spaceport cannot belong to both a planet and a station.")
-            return False
-
-        cursor = self.db.cursor()
-        if planet_associated:
-            cursor.execute("SELECT COUNT(*) FROM planets WHERE planet_name = %s", (planet_associated,))
-            if cursor.fetchone()[0] == 0:
-                QMessageBox.critical(self, "Validation Error", f"Planet '{planet_associated}' does not exist.")
-                return False
-
-        if spacestation_name:
-            cursor.execute("SELECT COUNT(*) FROM spacestations WHERE station_name = %s", (spacestation_name,))
-            if cursor.fetchone()[0] == 0:
-                QMessageBox.critical(self, "Validation Error", f"Station '{spacestation_name}' does not exist.")
-                return False
-
-        sql = """INSERT INTO spaceports (port_name, planet_associated, spacestation_name, fee, capacity) VALUES (%s, %s, %s, %s, %s)"""
-        values = [port_name, planet_associated, spacestation_name, fee, capacity]
-        return self.confirm_and_commit(sql, values)
+        return self.run_insert(self.core.enter_spaceport, port_name, planet_associated, spacestation_name, fee, capacity)
 
     def enter_spacecraft(self, type_name, capacity, range):
-        if not type_name.strip():
-            QMessageBox.critical(self, "Validation Error", "Type name cannot be empty.")
-            return False
-        if not isinstance(capacity, int) or capacity <= 0:
-            QMessageBox.critical(self, "Validation Error", "Capacity must be a positive integer.")
-            return False
-        if not isinstance(range, int) or range <= 0:
-            QMessageBox.critical(self, "Validation Error", "Range must be a positive integer.")
-            return False
-
-        sql = """INSERT INTO SpacecraftTypes VALUES (%s, %s, %s)"""
-        values = [type_name, capacity, range]
-        return self.confirm_and_commit(sql, values)
+        return self.run_insert(self.core.enter_spacecraft, type_name, capacity, range)
 
     def enter_flight(self, flight_number, route_id, spacecraft_type, days_raw, departure_time, flight_duration):
-        # Validate flight number
-        if not flight_number.strip():
-            QMessageBox.critical(self, "Validation Error", "Flight number cannot be empty.")
-            return False
-        
-        # Parse and validate days
-        days = [d.strip() for d in days_raw.split(',')]
-        valid_days = {"Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"}
-        for day in days:
-            if day not in valid_days:
-                QMessageBox.critical(self, "Validation Error", f"Invalid day: {day}")
-                return False
-
-        # Validate duration
-        try:
-            duration_val = float(flight_duration)
-            if duration_val <= 0:
-                raise ValueError
-        except ValueError:
-            QMessageBox.critical(self, "Validation Error", "Flight duration must be a positive number.")
-            return False
-
-        cursor = self.db.cursor()
-
-        # Validate route exists
-        cursor.execute("SELECT COUNT(*) FROM routes WHERE route_id = %s", (route_id,))
-        if cursor.fetchone()[0] == 0:
-            QMessageBox.critical(self, "Validation Error", f"Route ID {route_id} does not exist.")
-            return False
-
-        # Validate spacecraft type exists
-        cursor.execute("SELECT COUNT(*) FROM SpacecraftTypes WHERE type_name = %s", (spacecraft_type,))
-        if cursor.fetchone()[0] == 0:
-            QMessageBox.critical(self, "Validation Error", f"Spacecraft type '{spacecraft_type}' does not exist.")
-            return False
-        
-        cursor.execute("SELECT distance FROM routes WHERE route_id = %s", (route_id,))
-        dist = cursor.fetchone()[0]
-
-        cursor.execute("SELECT max_range FROM SpacecraftTypes WHERE type_name = %s", (spacecraft_type,))
-        max_range = cursor.fetchone()[0]
-        if dist > max_range:
-            QMessageBox.critical(self, "Validation Error",
-                f"Route distance {dist} exceeds craft range {max_range}.")
-            return False
-        
-        # Enforce spaceport daily capacity (before inserting)
-        cursor.execute("SELECT origin_id, dest_id FROM routes WHERE route_id = %s", (route_id,))
-        origin_id, dest_id = cursor.fetchone()
-        for day in days:
-            for port_id in (origin_id, dest_id):
-                cursor.execute("""
-                    SELECT COUNT(*)
-                    FROM flights f
-                    JOIN flight_schedule fs ON f.flight_number = fs.flight_number
-                    JOIN routes r           ON f.route_id      = r.route_id
-                    WHERE fs.day_of_week = %s
-                    AND (r.origin_id = %s OR r.dest_id = %s)
-                """, (day, port_id, port_id))
-                count = cursor.fetchone()[0]
-
-                cursor.execute(
-                    "SELECT capacity FROM spaceports WHERE spaceport_id = %s",
-                    (port_id,)
-                )
-                capacity = cursor.fetchone()[0]
-
-                if count >= capacity:
-                    QMessageBox.critical(
-                        self, "Capacity Error",
-                        f"Port ID {port_id} has reached its daily capacity ({capacity}) on {day}."
-                    )
-                    return False
-
-        # Validate time format
-        if not re.match(r"^\d{2}:\d{2}(:\d{2})?$", departure_time):
-            QMessageBox.critical(self, "Validation Error", "Invalid time format.")
-            return False
-        
-        # Check for same-planet violation
-        cursor.execute("""
-            SELECT sp1.planet_associated AS planet1, sp2.planet_associated AS planet2
-            FROM spaceports sp1, spaceports sp2
-            WHERE sp1.spaceport_id = %s AND sp2.spaceport_id = %s
-        """, (origin_id, dest_id))
-        planet_check = cursor.fetchone()
-
-        if planet_check and planet_check[0] and planet_check[1] and planet_check[0] == planet_check[1]:
-            QMessageBox.critical(self, "Validation Error", 
-                                "Flights are not allowed between spaceports on the same planet.")
-            return False
-
-        # Insert base flight record
-        sql_flight = (
-            "INSERT INTO flights "
-            "(flight_number, route_id, spacecraft_type, departure_time, flight_duration) "
-            "VALUES (%s, %s, %s, %s, %s)"
-        )
-        flight_vals = [flight_number, route_id, spacecraft_type, departure_time, duration_val]
-        if not self.confirm_and_commit(sql_flight, flight_vals):
-            return False
-
-        # Insert schedule entries
-        try:
-            for day in days:
-                cursor.execute(
-                    "INSERT INTO flight_schedule (flight_number, day_of_week) VALUES (%s, %s)",
-                    (flight_number, day)
-                )
-            self.db.commit()
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Database Error", f"Error scheduling days: {err}")
-            self.db.rollback()
-            return False
+        return self.run_insert(self.core.enter_flight, flight_number, route_id, spacecraft_type, days_raw, departure_time, flight_duration)
 
-        return True
-    
     def enter_route(self, origin_name, dest_name, distance):
-        if origin_name == dest_name:
-            QMessageBox.critical(self, "Validation Error", "Origin and destination spaceports must be different.")
-            return False
-
-        if distance <= 0:
-            QMessageBox.critical(self, "Validation Error", "Distance must be a positive integer.")
-            return False
-
-        cursor = self.db.cursor()
-
-        # Get spaceport IDs and planet names from names
-        cursor.execute("SELECT spaceport_id, planet_associated FROM spaceports WHERE port_name = %s", (origin_name,))
-        origin_result = cursor.fetchone()
-        if not origin_result:
-            QMessageBox.critical(self, "Validation Error", f"Origin spaceport '{origin_name}' not found.")
-            return False
-        origin_id, origin_planet = origin_result
-
-        cursor.execute("SELECT spaceport_id, planet_associated FROM spaceports WHERE port_name = %s", (dest_name,))
-        dest_result = cursor.fetchone()
-        if not dest_result:
-            QMessageBox.critical(self, "Validation Error", f"Destination spaceport '{dest_name}' not found.")
-            return False
-        dest_id, dest_planet = dest_result
-
-        # Enforce no routes between spaceports on the same planet
-        if origin_planet and dest_planet and origin_planet == dest_planet:
-            QMessageBox.critical(self, "Validation Error", "Routes are not allowed between spaceports on the same planet.")
-            return False
-
-        # Check for duplicates using IDs
-        cursor.execute("SELECT COUNT(*) FROM routes WHERE origin_id = %s AND dest_id = %s", (origin_id, dest_id))
-        if cursor.fetchone()[0] > 0:
-            QMessageBox.critical(self, "Validation Error", "This route already exists.")
-            return False
-
-        # Insert route manually
-        cursor.execute("INSERT INTO routes (origin_id, dest_id, distance) VALUES (%s, %s, %s)", (origin_id, dest_id, distance))
-        self.db.commit()
-
-        # Retrieve and return the new route_id
-        cursor.execute("SELECT route_id FROM routes WHERE origin_id = %s AND dest_id = %s", (origin_id, dest_id))
-        result = cursor.fetchone()
-        if result:
-            return result[0]
-        else:
-            QMessageBox.critical(self, "Database Error", "Failed to retrieve new route ID.")
-            return False
-
-
+        return self.run_insert(self.core.enter_route, origin_name, dest_name, distance)
 
     # Query methods
     def get_port_by_port_name_with_flights(self, port_name):
-        cursor = self.db.cursor()
-        sql = """
-            SELECT DISTINCT
-                CASE WHEN r.origin_id = sp.spaceport_id THEN r.dest_id ELSE r.origin_id END AS other_port_id,
-                sp2.port_name AS other_port_name
-            FROM spaceports sp
-            JOIN routes r ON sp.spaceport_id IN (r.origin_id, r.dest_id)
-            JOIN spaceports sp2
-            ON sp2.spaceport_id = CASE WHEN r.origin_id = sp.spaceport_id
-                                        THEN r.dest_id
-                                        ELSE r.origin_id END
-            WHERE sp.port_name = %s;
-        """
-        cursor.execute(sql, (port_name,))
-        rows = cursor.fetchall()
-        self.display_results(rows, "Connected Ports")
+        self.display_query(self.core.connected_ports_query(port_name), "Connected Ports")
 
     def get_departures_by_date_range_and_port(self, start_date, end_date, port_name):
-        cursor = self.db.cursor()
-        sql = """
-            SELECT f.flight_number, fs.day_of_week, f.departure_time, f.flight_duration, r.distance AS distance, f.spacecraft_type
-            FROM flights f
-            JOIN flight_schedule fs
-                ON f.flight_number = fs.flight_number
-            JOIN routes r
-                ON f.route_id = r.route_id
-            JOIN spaceports sp
-                ON r.origin_id = sp.spaceport_id
-            WHERE sp.port_name = %s
-            AND fs.day_of_week BETWEEN %s AND %s
-            ORDER BY
-            FIELD(fs.day_of_week,
-                    'Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'),
-            f.departure_time;
-        """
-        cursor.execute(sql, (port_name, start_date, end_date))
-        rows = cursor.fetchall()
-        self.display_results(rows, "Departures")
+        if is_date(start_date) and is_date(end_date):
+            self.get_dated_board("departures", start_date, end_date, port_name)
+        else:
+            self.get_port_schedule(self.core.departures, self.core.departures_query,
+                                   start_date, end_date, port_name, "Departures")
 
     def get_arrivals_by_date_range_and_port(self, start_date, end_date, port_name):
-        cursor = self.db.cursor()
-        sql = """
-            SELECT f.flight_number, fs.day_of_week, f.departure_time, f.flight_duration, r.distance AS distance, f.spacecraft_type
-            FROM flights f
-            JOIN flight_schedule fs ON f.flight_number = fs.flight_number
-            JOIN routes r
-                ON f.route_id = r.route_id
-            JOIN spaceports sp
-                ON r.dest_id = sp.spaceport_id
-            WHERE sp.port_name = %s
-            AND fs.day_of_week BETWEEN %s AND %s
-            ORDER BY
-            FIELD(fs.day_of_week,
-                    'Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'),
-            f.departure_time;
-        """
-        cursor.execute(sql, (port_name, start_date, end_date))
-        rows = cursor.fetchall()
-        self.display_results(rows, "Arrivals")
-
-    def get_flights_by_route(self, origin_id, destination_id):
-        cursor = self.db.cursor()
-        sql = """
-            SELECT f.flight_number, fs.day_of_week, f.departure_time, f.flight_duration, 
-                   sp1.port_name AS origin, sp2.port_name AS destination, r.distance AS distance, f.spacecraft_type
-            FROM flights f
-            JOIN flight_schedule fs
-                ON f.flight_number = fs.flight_number
-            JOIN routes r
-                ON f.route_id = r.route_id
-            JOIN spaceports sp1
-                ON r.origin_id = sp1.spaceport_id
-            JOIN spaceports sp2
-                ON r.dest_id = sp2.spaceport_id
-            WHERE r.origin_id = %s
-            AND r.dest_id   = %s
-            ORDER BY
-            FIELD(fs.day_of_week,
-                    'Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'),
-            f.departure_time;
-        """
-        cursor.execute(sql, (origin_id, destination_id))
-        rows = cursor.fetchall()
-        self.display_results(rows, "Flights by Route")
-
-    def add_hours(self, time_str, hours):
-        from datetime import datetime, timedelta
-        dt = datetime.strptime(time_str, "%H:%M:%S")
-        dt += timedelta(hours=hours)
-        return dt.strftime("%H:%M:%S")
-    
-    def diff_hours(self, t1, t2):
-        from datetime import datetime
-        fmt = "%H:%M:%S"
-        dt1 = datetime.strptime(t1, fmt)
-        dt2 = datetime.strptime(t2, fmt)
-        delta = (dt2 - dt1).total_seconds() / 3600
-        return delta
-
-    def flight_finder(self, departure_day, origin_name, destination_name, start_time_str, max_stops, max_total_time):
-        cursor = self.db.cursor(dictionary=True)
+        if is_date(start_date) and is_date(end_date):
+            self.get_dated_board("arrivals", start_date, end_date, port_name)
+        else:
+            self.get_port_schedule(self.core.arrivals, self.core.arrivals_query,
+                                   start_date, end_date, port_name, "Arrivals")
 
-        # Resolve origin and destination names to IDs
-        cursor.execute("SELECT spaceport_id FROM spaceports WHERE port_name = %s", (origin_name,))
-        origin_result = cursor.fetchone()
-        cursor.execute("SELECT spaceport_id FROM spaceports WHERE port_name = %s", (destination_name,))
-        dest_result = cursor.fetchone()
+    def get_dated_board(self, direction, first_date, last_date, port_name):
+        """Dated occurrences between two calendar dates, generated page by page as the table scrolls"""
+        from export import export_rows
+        from paging import IterPager
 
-        if not origin_result or not dest_result:
-            QMessageBox.critical(self, "Input Error", "Invalid origin or destination port name.")
+        try:
+            columns, rows = self.core.dated_board(direction, first_date, last_date, port_name)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
             return
 
-        origin_id = origin_result['spaceport_id']
-        destination_id = dest_result['spaceport_id']
-        start_time = self.parse_time(start_time_str)
-        results = []
+        def export(path):
+            export_rows(path, *self.core.dated_board(direction, first_date, last_date, port_name))
+        self.display_pager(IterPager(columns, rows), f"{direction.title()} {first_date} to {last_date}",
+                           export=export)
 
-        def dfs(current_id, current_time, stops, path, total_time, visited_ports):
-            if stops > max_stops or current_id in visited_ports:
+    def get_port_schedule(self, board, query, start_day, end_day, port_name, title):
+        """A cached board, or a paged one when it is too large to cache"""
+        try:
+            cached = board(start_day, end_day, port_name)
+            if cached is None:
+                self.display_query(query(start_day, end_day, port_name), title)
                 return
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
+            return
+        self.display_cached(*cached, title)
 
-            cursor.execute("""
-                SELECT f.flight_number, f.departure_time, f.flight_duration, 
-                    f.spacecraft_type, r.origin_id, r.dest_id, r.distance
-                FROM flights f
-                JOIN flight_schedule fs ON f.flight_number = fs.flight_number
-                JOIN routes r ON f.route_id = r.route_id
-                WHERE fs.day_of_week = %s
-                AND r.origin_id = %s
-            """, (departure_day, current_id))
-
-            for row in cursor.fetchall():
-                dep_time = str(row["departure_time"])
-                arr_time = self.add_hours(dep_time, float(row["flight_duration"]))
-
-                if not path and self.diff_hours(start_time, dep_time) > 3:
-                    continue
-
-                if path:
-                    prev_arrival = self.add_hours(path[-1]['departure_time'], float(path[-1]['flight_duration']))
-                    layover = self.diff_hours(prev_arrival, dep_time)
-                    if layover < 1 or layover > 6:
-                        continue
-                    flight_time = float(row["flight_duration"]) + layover
-                else:
-                    flight_time = float(row["flight_duration"])
-
-                new_total_time = total_time + flight_time
-                if new_total_time > max_total_time:
-                    continue
-
-                new_path = path + [row]
-                next_port = row["dest_id"]
-
-                if next_port == destination_id:
-                    results.append((new_path, new_total_time))
-                else:
-                    dfs(next_port, dep_time, stops + 1, new_path, new_total_time, visited_ports | {current_id})
-
-        dfs(origin_id, start_time, 0, [], 0, set())
+    def get_flights_by_route(self, origin_id, destination_id):
+        cached = self.core.flights_by_route(origin_id, destination_id)
+        if cached is None:
+            self.display_query(self.core.flights_by_route_query(origin_id, destination_id), "Flights by Route")
+        else:
+            self.display_cached(*cached, "Flights by Route")
+
+    def flight_finder(self, departure_day, origin_name, destination_name, start_time_str, max_stops, max_total_time):
+        try:
+            results = self.core.find_itineraries(departure_day, origin_name, destination_name,
+                                                 start_time_str, max_stops, max_total_time)
+        except ValidationError as e:
+            QMessageBox.critical(self, e.title, str(e))
+            return
 
         if not results:
             QMessageBox.information(self, "No Flights", "No valid itineraries found.")
@@ -1223,115 +912,121 @@ class SpaceTravelDB(QMainWindow):
         text_area = QTextEdit()
         text_area.setReadOnly(True)
 
-        for path, total_time in results:
-            text_area.append(f"Total Travel Time: {total_time:.2f} hrs")
+        for path, total_time, fare in results:
+            text_area.append(f"Total Travel Time: {total_time:.2f} hrs | Fare: {fare}")
             for f in path:
                 text_area.append(
-                    f"Flight {f['flight_number']} from {f['origin_id']} to {f['dest_id']} | "
-                    f"Depart: {f['departure_time']} | Duration: {f['flight_duration']} hrs"
+                    f"Flight {f.flight_number} from {f.origin_id} to {f.dest_id} | "
+                    f"Depart: {f.departure_time} | Duration: {f.flight_duration} hrs"
                 )
             text_area.append("-" * 50)
 
         layout.addWidget(text_area)
+
+        export_btn = QPushButton("Export...")
+        export_btn.clicked.connect(lambda: self.export_itineraries(result_window, results))
+        layout.addWidget(export_btn)
+
         result_window.setMinimumSize(700, 400)
-        result_window.show()
-        self.result_windows.append(result_window)
+        self.show_result_window(result_window)
 
+    def export_itineraries(self, parent, results):
+        from export import export_rows
+        from results_view import ask_export_path
 
+        path = ask_export_path(parent)
+        if not path:
+            return
+        try:
+            export_rows(path, ITINERARY_COLUMNS, itinerary_rows(results))
+        except Exception as e:
+            QMessageBox.critical(parent, "Export Error", f"Failed to export itineraries:\n{e}")
+            return
+        QMessageBox.information(parent, "Export", f"Itineraries written to {path}")
 
-    def display_results(self, rows, title):
+    def display_results(self, rows, title, columns=None):
         """Display query results in a new window"""
-        result_window = QWidget()
-        result_window.setWindowTitle(title)
-        result_window.setMinimumSize(600, 400)
-        
-        layout = QVBoxLayout(result_window)
-        
-        # Title
-        title_label = QLabel(title)
-        title_label.setFont(QFont("Arial", 14, QFont.Bold))
-        title_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title_label)
-        
-        # Results text area
-        text_area = QTextEdit()
-        text_area.setReadOnly(True)
-        text_area.setFont(QFont("Courier", 10))
-        
-        if rows:
-            for row in rows:
-                line = "\t".join(str(col) for col in row)
-                text_area.append(line)
-        else:
-            text_area.append("No results found.")
-        
-        layout.addWidget(text_area)
-        
-        # Close button
-        close_btn = QPushButton("Close")
-        close_btn.clicked.connect(result_window.close)
-        layout.addWidget(close_btn)
-        
+        from results_view import ResultWindow
+
+        rows = list(rows)
+        if columns is None:
+            columns = [f"Column {i + 1}" for i in range(len(rows[0]) if rows else 1)]
+        self.show_result_window(ResultWindow(title, columns, rows))
+
+    def display_cached(self, columns, rows, title):
+        """Display rows already held in memory (a cached board, at most CACHE_MAX_ROWS); export writes them"""
+        from export import export_rows
+        from results_view import ResultWindow
+
+        self.show_result_window(ResultWindow(title, columns, rows,
+                                             export=lambda path: export_rows(path, columns, rows)))
+
+    def display_pager(self, pager, title, export=None):
+        """Display a streamed query; the table pulls further pages as the user scrolls"""
+        from results_view import ResultWindow
+
+        self.show_result_window(ResultWindow(title, pager.columns, pager=pager, export=export))
+
+    def display_query(self, query, title):
+        """Page a query into a result window whose export re-streams it from MySQL"""
+        from export import export_query
+        from paging import ResultPager
+
+        sql, params, transform = query
+        self.display_pager(ResultPager(sql, params, transform), title,
+                           export=lambda path: export_query(path, sql, params, transform))
+
+    LIVE_BOARD_INTERVAL_MS = 5000
+
+    def open_live_board(self, port_name, direction):
+        """Board window that polls change_log and patches only the changed flights"""
+        from live_board import LiveBoard, BOARD_COLUMNS
+        from results_view import ResultWindow
+
+        cursor = self.db.cursor()
+        cursor.execute("SELECT spaceport_id FROM spaceports WHERE port_name = %s", (port_name,))
+        port = cursor.fetchone()
+        if not port:
+            QMessageBox.warning(self, "Not Found", f"Spaceport '{port_name}' not found.")
+            return
+
+        # Autocommit so every poll sees rows committed by other sessions
+        board = LiveBoard(connect(autocommit=True), port[0], direction)
+        title = f"{direction.title()} - {port_name}"
+        result_window = ResultWindow(title, BOARD_COLUMNS, board.sorted_rows())
+
+        def poll():
+            try:
+                if board.refresh():
+                    result_window.model.replace_rows(board.sorted_rows())
+            except mysql.connector.Error as err:
+                timer.stop()
+                QMessageBox.critical(result_window, "Database Error", f"Live board stopped: {err}")
+
+        timer = QTimer(result_window)
+        timer.timeout.connect(poll)
+        timer.start(self.LIVE_BOARD_INTERVAL_MS)
+        result_window.destroyed.connect(lambda: board.db.close())
+        self.show_result_window(result_window)
+
+    def show_result_window(self, result_window):
         result_window.show()
-        
+
         # Keep reference to prevent garbage collection
         if not hasattr(self, 'result_windows'):
             self.result_windows = []
         self.result_windows.append(result_window)
 
-    def confirm_and_commit(self, sql, values):
-        """Execute query with confirmation"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute(sql, values)
-            
-            reply = QMessageBox.question(self, "Confirm", "Do you want to save this entry?",
-                                       QMessageBox.Yes | QMessageBox.No)
-            
-            if reply == QMessageBox.Yes:
-                self.db.commit()
-                return True
-            else:
-                self.db.rollback()
-                return False
-                
-        except mysql.connector.Error as err:
-            QMessageBox.critical(self, "Database Error", f"Error: {err}")
-            self.db.rollback()
-            return False
-
-    def table_exists(self, cursor, table):
-        """Check if table exists"""
-        table_name = table.lower()
-        cursor.execute("SHOW TABLES")
-        existing_tables = cursor.fetchall()
-        existing_tables = [x[0] for x in existing_tables]
-        return table_name in existing_tables
-
-    def create_nonexisting_tables(self):
-        """Create tables if they don't exist"""
-        cursor = self.db.cursor()
-        
-        if not self.table_exists(cursor, "planets"):
-            self.create_planet_table(cursor)
-        if not self.table_exists(cursor, "spacestations"):
-            self.create_spacestation_table(cursor)
-        if not self.table_exists(cursor, "spaceports"):
-            self.create_spaceports_table(cursor)
-        if not self.table_exists(cursor, "SpacecraftTypes"):
-            self.create_spacecrafts_table(cursor)
-        if not self.table_exists(cursor, "routes"):
-            self.create_routes_table(cursor)
-        if not self.table_exists(cursor, "flights"):
-            self.create_flight_table(cursor)
-        if not self.table_exists(cursor, "flight_schedule"):
-            self.create_flight_schedule_table(cursor)
-
+    def confirm_save(self):
+        """Ask before committing an insert"""
+        reply = QMessageBox.question(self, "Confirm", "Do you want to save this entry?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        return reply == QMessageBox.Yes
 
     def closeEvent(self, event):
         """Handle application close event"""
-        if hasattr(self, 'db'):
-            self.db.close()
+        if hasattr(self, 'core'):
+            self.core.close()
         event.accept()
 
 
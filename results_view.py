@@ -0,0 +1,244 @@
+"""Table view for query results.
+
+Rows are kept column by column and the view only asks the model for the
+cells it is painting, so opening a large result costs one page of rows.
+Sorting and filtering work on an index permutation over the stored
+columns and never go back to MySQL.
+"""
+import os
+
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                               QPushButton, QComboBox, QTableView, QHeaderView,
+                               QAbstractItemView, QFileDialog, QMessageBox)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont
+
+from export import FORMATS
+
+
+class ColumnStore:
+    """Rows held as one list per column instead of one tuple per row"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.columns = [[] for _ in self.names]
+        self.length = 0
+
+    def extend(self, rows):
+        for column, values in zip(self.columns, zip(*rows)):
+            column.extend(values)
+        self.length += len(rows)
+
+    def row(self, index):
+        return tuple(column[index] for column in self.columns)
+
+
+def sort_key(value):
+    # NULLs sort first; the flag keeps None from being compared with values
+    return (value is not None, value)
+
+
+class ResultTableModel(QAbstractTableModel):
+    """Read-only model over a ColumnStore, optionally fed page by page by a ResultPager"""
+
+    def __init__(self, columns, rows=(), pager=None, parent=None):
+        super().__init__(parent)
+        self.store = ColumnStore(columns)
+        self.store.extend(list(rows))
+        self.pager = pager
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.filter_column = -1
+        self.filter_text = ""
+        self.order = list(range(self.store.length))
+
+    # Qt model interface
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        value = self.store.columns[index.column()][self.order[index.row()]]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.store.names[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.pager is not None and not self.pager.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        start = self.store.length
+        self.store.extend(self.pager.fetch_page())
+        added = [i for i in range(start, self.store.length) if self.matches(i)]
+        if added:
+            first = len(self.order)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self.order.extend(added)
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        if column >= 0:
+            # Sorting has to see every row, so drain the stream first
+            self.fetch_all()
+        self.sort_column = column
+        self.sort_order = order
+        self.rebuild()
+        self.endResetModel()
+
+    # Filtering
+    def set_filter(self, column, text):
+        self.beginResetModel()
+        self.filter_column = column
+        self.filter_text = text.strip().lower()
+        if self.filter_text:
+            self.fetch_all()
+        self.rebuild()
+        self.endResetModel()
+
+    def matches(self, index):
+        if not self.filter_text:
+            return True
+        if self.filter_column >= 0:
+            values = (self.store.columns[self.filter_column][index],)
+        else:
+            values = (column[index] for column in self.store.columns)
+        return any(self.filter_text in str(value).lower() for value in values)
+
+    def fetch_all(self):
+        while self.pager is not None and not self.pager.exhausted:
+            self.store.extend(self.pager.fetch_page())
+
+    def rebuild(self):
+        """Recompute the visible row order from the filter and sort settings"""
+        order = [i for i in range(self.store.length) if self.matches(i)]
+        if self.sort_column >= 0:
+            column = self.store.columns[self.sort_column]
+            order.sort(key=lambda i: sort_key(column[i]),
+                       reverse=self.sort_order == Qt.DescendingOrder)
+        self.order = order
+
+    def replace_rows(self, rows):
+        """Swap in a new set of rows, keeping the current sort and filter"""
+        self.beginResetModel()
+        self.store = ColumnStore(self.store.names)
+        self.store.extend(list(rows))
+        self.rebuild()
+        self.endResetModel()
+
+    def visible_rows(self):
+        """Rows in their current display order"""
+        return (self.store.row(i) for i in self.order)
+
+
+class ResultWindow(QWidget):
+    """Standalone window showing one result set in a sortable, filterable table"""
+
+    def __init__(self, title, columns, rows=(), pager=None, export=None):
+        super().__init__()
+        self.pager = pager
+        self.export = export
+        self.setWindowTitle(title)
+        self.setMinimumSize(700, 400)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        if pager is not None:
+            self.destroyed.connect(lambda: pager.close())
+
+        layout = QVBoxLayout(self)
+
+        title_label = QLabel(title)
+        title_label.setFont(QFont("Arial", 14, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+
+        self.model = ResultTableModel(columns, rows, pager, self)
+
+        # Filter controls
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Filter:"))
+        self.filter_column = QComboBox()
+        self.filter_column.addItem("All columns")
+        self.filter_column.addItems(list(columns))
+        filter_layout.addWidget(self.filter_column)
+        self.filter_entry = QLineEdit()
+        self.filter_entry.setPlaceholderText("Text to match")
+        filter_layout.addWidget(self.filter_entry)
+        layout.addLayout(filter_layout)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setFont(QFont("Courier", 10))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Fixed row heights so the view never measures rows it is not painting
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        self.button_layout = QHBoxLayout()
+        self.button_layout.addStretch()
+        if export is not None:
+            export_btn = QPushButton("Export...")
+            export_btn.clicked.connect(self.export_results)
+            self.button_layout.addWidget(export_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        self.button_layout.addWidget(close_btn)
+        layout.addLayout(self.button_layout)
+
+        self.filter_entry.returnPressed.connect(self.apply_filter)
+        self.filter_column.currentIndexChanged.connect(lambda _: self.apply_filter())
+        self.model.rowsInserted.connect(self.update_status)
+        self.model.modelReset.connect(self.update_status)
+        self.update_status()
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter_column.currentIndex() - 1, self.filter_entry.text())
+
+    def update_status(self):
+        shown = self.model.rowCount()
+        if self.model.filter_text:
+            text = f"{shown} of {self.model.store.length} rows match the filter"
+        elif self.pager is not None and self.pager.total is None:
+            text = f"Showing {shown} rows" + ("" if self.pager.exhausted else " so far")
+        elif self.pager is not None:
+            text = f"Showing {shown} of {self.pager.total} rows"
+        else:
+            text = f"{shown} rows"
+        self.status_label.setText(text)
+
+    def export_results(self):
+        path = ask_export_path(self)
+        if not path:
+            return
+        try:
+            self.export(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Failed to export results:\n{e}")
+            return
+        QMessageBox.information(self, "Export", f"Results written to {path}")
+
+
+def ask_export_path(parent):
+    """Ask for an export file, adding the extension of the chosen format if missing"""
+    path, selected = QFileDialog.getSaveFileName(parent, "Export Results", "",
+                                                 ";;".join(FORMATS.values()))
+    if path and not os.path.splitext(path)[1]:
+        path += next((ext for ext, label in FORMATS.items() if label == selected), ".csv")
+    return path
@@ -0,0 +1,158 @@
+"""All-pairs shortest route distance and minimum hop count between spaceports.
+
+Only the ``routes`` graph matters here, not the flight schedule. Dense
+graphs are solved with a vectorized Floyd-Warshall: one NumPy minimum
+over the whole matrix per intermediate port. Sparse graphs use repeated
+Dijkstra from scipy.sparse.csgraph when scipy is installed.
+
+Results are cached in an .npz file with a fingerprint of spaceports and
+routes. They are recomputed only when the fingerprint changes, for
+example after enter_route adds a route.
+"""
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+CACHE_PATH = "route_matrix.npz"
+# Threads in one process rebuild the cache one at a time
+REBUILD_LOCK = threading.Lock()
+# Below this edge density, repeated Dijkstra beats O(n^3) Floyd-Warshall
+SPARSE_DENSITY = 0.05
+UNREACHABLE = -1
+
+
+def graph_fingerprint(db):
+    """Cheap summary of spaceports and routes that changes whenever the graph does"""
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT (SELECT COUNT(*) FROM spaceports),
+               (SELECT COALESCE(MAX(spaceport_id), 0) FROM spaceports),
+               COUNT(*), COALESCE(MAX(route_id), 0), COALESCE(SUM(distance), 0)
+        FROM routes
+    """)
+    fingerprint = np.array([int(v) for v in cursor.fetchone()], dtype=np.int64)
+    cursor.close()
+    return fingerprint
+
+
+def floyd_warshall(weights):
+    """All-pairs shortest paths over an n x n matrix with inf for missing edges"""
+    dist = weights.copy()
+    np.fill_diagonal(dist, 0)
+    for k in range(len(dist)):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return dist
+
+
+def sparse_shortest_paths(port_count, origin, dest, distance):
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import shortest_path
+
+    graph = csr_matrix((distance.astype(np.float64), (origin, dest)), shape=(port_count, port_count))
+    dist = shortest_path(graph, method="D", directed=True)
+    hops = shortest_path(graph, method="D", directed=True, unweighted=True)
+    return dist, hops
+
+
+class RouteMatrix:
+    """Shortest distances and hop counts indexed by spaceport id"""
+
+    def __init__(self, port_ids, distance, hops, fingerprint):
+        self.port_ids = np.asarray(port_ids, dtype=np.int64)
+        self.distance = distance
+        self.hops = hops
+        self.fingerprint = fingerprint
+        self.positions = {int(port_id): i for i, port_id in enumerate(self.port_ids)}
+
+    @classmethod
+    def build(cls, db, fingerprint=None):
+        if fingerprint is None:
+            fingerprint = graph_fingerprint(db)
+        cursor = db.cursor()
+        cursor.execute("SELECT spaceport_id FROM spaceports ORDER BY spaceport_id")
+        port_ids = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+        cursor.execute("SELECT origin_id, dest_id, distance FROM routes")
+        routes = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 3)
+        cursor.close()
+
+        port_count = len(port_ids)
+        origin = np.searchsorted(port_ids, routes[:, 0])
+        dest = np.searchsorted(port_ids, routes[:, 1])
+        distance = routes[:, 2]
+
+        density = len(routes) / max(port_count * port_count, 1)
+        if density < SPARSE_DENSITY:
+            try:
+                dist, hops = sparse_shortest_paths(port_count, origin, dest, distance)
+                return cls.from_float(port_ids, dist, hops, fingerprint)
+            except ImportError:
+                pass
+
+        weights = np.full((port_count, port_count), np.inf)
+        weights[origin, dest] = distance
+        edges = np.full((port_count, port_count), np.inf)
+        edges[origin, dest] = 1
+        return cls.from_float(port_ids, floyd_warshall(weights), floyd_warshall(edges), fingerprint)
+
+    @classmethod
+    def from_float(cls, port_ids, dist, hops, fingerprint):
+        """Store as integers with UNREACHABLE in place of inf"""
+        unreachable = np.isinf(dist)
+        dist = np.where(unreachable, UNREACHABLE, dist).astype(np.int64)
+        hops = np.where(unreachable, UNREACHABLE, hops).astype(np.int32)
+        return cls(port_ids, dist, hops, fingerprint)
+
+    @classmethod
+    def load_or_build(cls, db, path=CACHE_PATH):
+        """Cached matrix if its fingerprint still matches the database, else a rebuilt one"""
+        fingerprint = graph_fingerprint(db)
+        matrix = cls.load_matching(path, fingerprint)
+        if matrix is not None:
+            return matrix
+        with REBUILD_LOCK:
+            # Another thread may have rebuilt it while this one waited
+            matrix = cls.load_matching(path, fingerprint)
+            if matrix is None:
+                matrix = cls.build(db, fingerprint)
+                matrix.save(path)
+        return matrix
+
+    @classmethod
+    def load_matching(cls, path, fingerprint):
+        """The cached matrix at path if its fingerprint matches, else None"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as cached:
+            if np.array_equal(cached["fingerprint"], fingerprint):
+                return cls(cached["port_ids"], cached["distance"], cached["hops"], fingerprint)
+        return None
+
+    def save(self, path=CACHE_PATH):
+        # Write a private file beside the target and rename it, so a reader never sees half
+        # a file and writers in other processes never share a temporary name
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, port_ids=self.port_ids, distance=self.distance,
+                         hops=self.hops, fingerprint=self.fingerprint)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def lookup(self, origin_id, dest_id):
+        """(shortest distance, minimum hops), or None if dest is unreachable"""
+        i = self.positions.get(int(origin_id))
+        j = self.positions.get(int(dest_id))
+        if i is None or j is None or self.distance[i, j] == UNREACHABLE:
+            return None
+        return int(self.distance[i, j]), int(self.hops[i, j])
+
+    def reachable_from(self, origin_id):
+        """(dest_id, distance, hops) for every port reachable from origin, nearest first"""
+        i = self.positions[int(origin_id)]
+        order = np.argsort(self.distance[i], kind="stable")
+        return [(int(self.port_ids[j]), int(self.distance[i, j]), int(self.hops[i, j]))
+                for j in order if j != i and self.distance[i, j] != UNREACHABLE]
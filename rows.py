@@ -0,0 +1,25 @@
+"""Compact immutable row types for the network tables.
+
+Rows are namedtuples, so each one is a fixed-size tuple with no per-row
+__dict__ and fields are reached by name (``row.dest_id``). Decode cursor
+results with ``fetch_rows(cursor, Flight)`` on a plain (non-dictionary)
+cursor; the SELECT must list the columns in field order, e.g.
+FLIGHT_COLUMNS.
+"""
+from collections import namedtuple
+
+# A flight joined with its route, as the flight finder uses it
+Flight = namedtuple("Flight", ["flight_number", "departure_time", "flight_duration", "schedule_mask",
+                               "spacecraft_type", "origin_id", "dest_id", "distance"])
+Route = namedtuple("Route", ["route_id", "origin_id", "dest_id", "distance"])
+Spaceport = namedtuple("Spaceport", ["spaceport_id", "port_name", "planet_associated",
+                                     "spacestation_name", "capacity", "fee"])
+SpacecraftType = namedtuple("SpacecraftType", ["type_name", "capacity", "max_range"])
+
+FLIGHT_COLUMNS = """f.flight_number, f.departure_time, f.flight_duration, f.schedule_mask,
+    f.spacecraft_type, r.origin_id, r.dest_id, r.distance"""
+
+
+def fetch_rows(cursor, row_type):
+    """Remaining cursor rows decoded as row_type"""
+    return list(map(row_type._make, cursor.fetchall()))
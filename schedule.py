@@ -0,0 +1,57 @@
+"""Weekday bitmask helpers for flight schedules.
+
+Each flight keeps its weekly pattern in ``flights.schedule_mask`` next to the
+``flight_schedule`` rows: bit 0 is Monday, bit 6 is Sunday.
+"""
+import re
+
+DAYS_OF_WEEK = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+ALL_DAYS_MASK = 0x7F
+# port_adjacency's weekly flight counts, one column per weekday, Monday first
+ADJACENCY_DAY_COLUMNS = [f"{day.lower()}_flights" for day in DAYS_OF_WEEK]
+# departure_time as entered: HH:MM or HH:MM:SS
+TIME_FORMAT = re.compile(r"^\d{2}:\d{2}(:\d{2})?$")
+
+
+def normalize_day(day):
+    """Return the canonical weekday name, raising ValueError if unknown"""
+    name = day.strip().capitalize()
+    if name not in DAYS_OF_WEEK:
+        raise ValueError(f"Invalid day: {day.strip()}")
+    return name
+
+
+def day_bit(day):
+    """Bit for a single weekday name"""
+    return 1 << DAYS_OF_WEEK.index(normalize_day(day))
+
+
+def days_to_mask(days):
+    """Combine an iterable of weekday names into one mask"""
+    mask = 0
+    for day in days:
+        mask |= day_bit(day)
+    return mask
+
+
+def mask_to_days(mask):
+    """Weekday names set in a mask, Monday first"""
+    return [day for i, day in enumerate(DAYS_OF_WEEK) if mask & (1 << i)]
+
+
+def day_range(start_day, end_day):
+    """Weekday names from start to end inclusive, wrapping past Sunday"""
+    start = DAYS_OF_WEEK.index(normalize_day(start_day))
+    end = DAYS_OF_WEEK.index(normalize_day(end_day))
+    span = (end - start) % 7
+    return [DAYS_OF_WEEK[(start + i) % 7] for i in range(span + 1)]
+
+
+def day_range_mask(start_day, end_day):
+    """Mask for an inclusive weekday range, e.g. Friday-Monday wraps the week"""
+    return days_to_mask(day_range(start_day, end_day))
+
+
+def format_days(mask, order=DAYS_OF_WEEK):
+    """Comma-separated weekday names set in mask, listed in the given order"""
+    return ", ".join(day for day in order if mask & day_bit(day))
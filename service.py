@@ -0,0 +1,393 @@
+"""Async HTTP JSON service over SpaceTravelCore.
+
+Routes follow the REST layout described in changes.md:
+
+    GET  /api/query/routeQuery?origin_port_name=..&destination_port_name=..
+    GET  /api/query/spaceportQuery?port_name=..&direction=departures|arrivals&start_day=..&end_day=..
+    GET  /api/query/spaceportQuery?port_name=..&direction=..&start_date=YYYY-MM-DD&end_date=YYYY-MM-DD
+    GET  /api/query/connectedPorts?port_name=..
+    GET  /api/query/flightFinder?origin=..&destination=..&day=..&time=HH:MM&max_stops=2&max_hours=24&memoize=1
+    POST /api/planets | /api/spacestations | /api/spaceports | /api/spacecrafts | /api/routes | /api/flights
+    GET  /api/health
+
+The HTTP side is plain asyncio streams, so one event loop holds every
+client connection. The MySQL driver blocks, so each request borrows a core
+from a fixed pool. Each core has its own connection. The request runs on a
+thread pool of the same size through run_in_executor.
+
+Load is bounded in three places:
+
+* a semaphore caps in-flight database work at the pool size;
+* once max_pending requests are already waiting, new ones are rejected
+  at once with 503 and Retry-After instead of queueing without limit;
+* each request gets ``timeout`` seconds (asyncio.wait_for) before it is
+  answered with 504. Its connection returns to the pool only when the
+  worker finishes.
+
+Board and route results come through one QueryCache shared by the pool,
+so identical concurrent lookups reach MySQL once (--cache-ttl 0 turns it
+off). /api/health reports the cache counters.
+
+Missing tables are created at startup, as the GUI does. To run against a
+stand-in database, e.g. a local MySQL loaded with dbprog_s25.sql:
+
+    python service.py --db-host 127.0.0.1 --database dbproject_test --port 8080
+"""
+import argparse
+import asyncio
+import json
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from urllib.parse import parse_qsl, urlsplit
+
+import mysql.connector
+
+from cache import QueryCache
+from connection import DATABASE, connect
+from core import ITINERARY_COLUMNS, SpaceTravelCore, ValidationError, itinerary_rows
+from export import to_json
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+IDLE_TIMEOUT = 30.0
+MAX_ROWS = 10_000
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+           503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+class CorePool:
+    """Fixed set of SpaceTravelCore objects, one connection each"""
+
+    def __init__(self, size, connect_fn, cache=None):
+        self.cores = queue.Queue()
+        for i in range(size):
+            core = SpaceTravelCore(connect_fn(), cache=cache)
+            if i == 0:
+                # The boards, the cache and the finder need change_log and port_adjacency
+                core.create_nonexisting_tables()
+            self.cores.put(core)
+
+    def run(self, handler, *args):
+        """Call handler(core, *args) on a borrowed core; runs on a worker thread"""
+        core = self.cores.get()
+        try:
+            return handler(core, *args)
+        finally:
+            try:
+                # End the read transaction so the next request sees fresh data
+                core.db.rollback()
+            except mysql.connector.Error:
+                core.db.reconnect(attempts=3, delay=0.5)
+            self.cores.put(core)
+
+    def close(self):
+        while not self.cores.empty():
+            self.cores.get().close()
+
+
+# Handlers run on worker threads with a pooled core and return (status, JSON-ready body)
+def query_rows(core, query, limit=MAX_ROWS):
+    return result(*core.query_rows(query, limit))
+
+
+def result(columns, rows):
+    return 200, {"columns": columns, "rows": [[to_json(v) for v in row] for row in rows]}
+
+
+def route_query(core, params):
+    origin_id = core.port_id(required(params, "origin_port_name"))
+    dest_id = core.port_id(required(params, "destination_port_name"))
+    if origin_id is None or dest_id is None:
+        raise HttpError(404, "One or both port names not found.")
+    cached = core.flights_by_route(origin_id, dest_id)
+    if cached is None:
+        return query_rows(core, core.flights_by_route_query(origin_id, dest_id))
+    return result(*cached)
+
+
+def spaceport_query(core, params):
+    direction = params.get("direction", "departures")
+    if direction not in ("departures", "arrivals"):
+        raise HttpError(400, "direction must be departures or arrivals.")
+    if "start_date" in params or "end_date" in params:
+        try:
+            columns, rows = core.dated_board(direction, required(params, "start_date"),
+                                             required(params, "end_date"), required(params, "port_name"))
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return result(columns, islice(rows, MAX_ROWS))
+    board, query = ((core.departures, core.departures_query) if direction == "departures"
+                    else (core.arrivals, core.arrivals_query))
+    args = params.get("start_day", "Monday"), params.get("end_day", "Sunday"), required(params, "port_name")
+    try:
+        cached = board(*args)
+        return result(*cached) if cached is not None else query_rows(core, query(*args))
+    except ValueError as e:
+        raise HttpError(400, str(e))
+
+
+def connected_ports(core, params):
+    return query_rows(core, core.connected_ports_query(required(params, "port_name")))
+
+
+def flight_finder(core, params):
+    try:
+        max_stops = int(params.get("max_stops", 2))
+        max_hours = float(params.get("max_hours", 24))
+        results = core.find_itineraries(required(params, "day"), required(params, "origin"),
+                                        required(params, "destination"), required(params, "time"),
+                                        max_stops, max_hours, params.get("memoize") in ("1", "true"))
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    return result(ITINERARY_COLUMNS, itinerary_rows(results))
+
+
+def health(core, params):
+    cursor = core.db.cursor()
+    cursor.execute("SELECT 1")
+    cursor.fetchall()
+    cursor.close()
+    status = {"status": "ok"}
+    if core.cache is not None:
+        status["cache"] = core.cache.stats()
+    return 200, status
+
+
+# POST path -> (core insert, body field -> accepted JSON types in argument order, optional fields)
+INSERTS = {
+    "/api/planets": ("enter_planet", {"planet_name": str, "size": int, "population": int}, ()),
+    "/api/spacestations": ("enter_spacestation", {"station_name": str, "has_spaceport": (bool, int),
+                                                  "planet_associated": str},
+                           ("has_spaceport", "planet_associated")),
+    "/api/spaceports": ("enter_spaceport", {"port_name": str, "planet_associated": str, "spacestation_name": str,
+                                            "fee": int, "capacity": int},
+                        ("planet_associated", "spacestation_name")),
+    "/api/spacecrafts": ("enter_spacecraft", {"type_name": str, "capacity": int, "max_range": int}, ()),
+    "/api/routes": ("enter_route", {"origin_name": str, "dest_name": str, "distance": int}, ()),
+    "/api/flights": ("enter_flight", {"flight_number": str, "route_id": int, "spacecraft_type": str,
+                                      "days": (str, list), "departure_time": str,
+                                      "flight_duration": (int, float, str)}, ()),
+}
+
+JSON_TYPES = {str: "a string", int: "an integer", float: "a number", bool: "a boolean", list: "a list"}
+
+
+def field_value(body, name, types, optional):
+    """body[name] if its JSON type is one of types (None for an absent optional field), else a 400"""
+    value = body.get(name)
+    if value is None and name in optional:
+        return None
+    types = types if isinstance(types, tuple) else (types,)
+    # JSON true/false arrive as bool, which isinstance also counts as int
+    if not isinstance(value, types) or isinstance(value, bool) and bool not in types:
+        raise HttpError(400, f"Field '{name}' must be {' or '.join(JSON_TYPES[t] for t in types)}.")
+    return value
+
+
+def insert(core, path, body):
+    method, fields, optional = INSERTS[path]
+    missing = [f for f in fields if f not in body and f not in optional]
+    if missing:
+        raise HttpError(400, f"Missing fields: {', '.join(missing)}.")
+    values = [field_value(body, name, types, optional) for name, types in fields.items()]
+    if path == "/api/flights":
+        days = values[3]
+        if isinstance(days, list):
+            if not all(isinstance(day, str) for day in days):
+                raise HttpError(400, "Field 'days' must list weekday names.")
+            values[3] = ",".join(days)
+        try:
+            values[4] = core.parse_time(values[4])
+        except ValueError as e:
+            raise HttpError(400, str(e))
+    inserted = getattr(core, method)(*values)
+    created = {"route_id": inserted} if path == "/api/routes" else {f: body.get(f) for f in list(fields)[:1]}
+    if path == "/api/flights":
+        created["round_trips"] = core.last_round_trips
+    return 201, created
+
+
+GET_ROUTES = {
+    "/api/query/routeQuery": route_query,
+    "/api/query/spaceportQuery": spaceport_query,
+    "/api/query/connectedPorts": connected_ports,
+    "/api/query/flightFinder": flight_finder,
+    "/api/health": health,
+}
+
+
+def required(params, name):
+    value = params.get(name)
+    if not value:
+        raise HttpError(400, f"Missing query parameter '{name}'.")
+    return value
+
+
+class QueryService:
+    """Routes requests to pooled handlers with backpressure and timeouts"""
+
+    def __init__(self, pool, pool_size, max_pending=256, timeout=10.0):
+        self.pool = pool
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="db")
+        self.slots = asyncio.Semaphore(pool_size)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.timeout = timeout
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if method == "GET" and url.path in GET_ROUTES:
+            return await self.call(GET_ROUTES[url.path], params)
+        if method == "POST" and url.path in INSERTS:
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "Body must be a JSON object.")
+            if not isinstance(data, dict):
+                raise HttpError(400, "Body must be a JSON object.")
+            return await self.call(insert, url.path, data)
+        if url.path in GET_ROUTES or url.path in INSERTS:
+            raise HttpError(405, f"{method} is not allowed on {url.path}.")
+        raise HttpError(404, f"No route for {url.path}.")
+
+    async def call(self, handler, *args):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        if self.slots.locked():
+            if self.pending >= self.max_pending:
+                raise HttpError(503, "Server is busy, retry shortly.", [("Retry-After", "1")])
+            self.pending += 1
+            try:
+                await asyncio.wait_for(self.slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                raise HttpError(504, "Timed out waiting for a database connection.")
+            finally:
+                self.pending -= 1
+        else:
+            await self.slots.acquire()
+
+        future = loop.run_in_executor(self.executor, self.pool.run, handler, *args)
+        # The slot is freed when the worker finishes, even if the client has been answered
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"Request took longer than {self.timeout:g} s.")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 400, {"error": "Request headers too large."}, keep_alive=False)
+                    return
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                    return
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                extra = []
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except HttpError as e:
+                    status, payload, extra = e.status, {"error": str(e)}, e.headers
+                except ValidationError as e:
+                    status, payload = 422, {"error": str(e), "title": e.title}
+                except mysql.connector.Error as e:
+                    status, payload = 500, {"error": f"Database error: {e}"}
+                except Exception as e:
+                    print(f"{method} {target} failed: {e!r}", file=sys.stderr)
+                    status, payload = 500, {"error": "Internal server error."}
+                await self.respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive=True, headers=()):
+        body = json.dumps(payload).encode()
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 "Content-Type: application/json",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+
+
+async def serve(host, port, pool, pool_size, max_pending, timeout):
+    service = QueryService(pool, pool_size, max_pending, timeout)
+    server = await asyncio.start_server(service.handle_client, host, port, limit=MAX_HEADER_BYTES,
+                                        backlog=1024)
+    print(f"Listening on http://{host}:{port} with {pool_size} database connections", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON service for the space travel database")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db-host", default="localhost")
+    parser.add_argument("--database", default=DATABASE)
+    parser.add_argument("--credentials", default="credentials.json")
+    parser.add_argument("--pool-size", type=int, default=8, help="database connections and worker threads")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="requests allowed to wait for a connection before 503s")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per request before a 504")
+    parser.add_argument("--cache-ttl", type=float, default=30.0,
+                        help="seconds to keep board and route results (0 disables the cache)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="cached results kept, least recent dropped")
+    args = parser.parse_args()
+
+    cache = QueryCache(args.cache_ttl, args.cache_size) if args.cache_ttl > 0 else None
+    pool = CorePool(args.pool_size, partial(connect, args.database, args.credentials, host=args.db_host), cache)
+    try:
+        asyncio.run(serve(args.host, args.port, pool, args.pool_size, args.max_pending, args.timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Versioned binary snapshot of the network, loaded with mmap.
+
+The file is a small header, a section table and one flat little-endian
+array per section. Snapshot.open maps the file and wraps each section with
+np.frombuffer, so nothing is parsed or copied until a query reads it.
+Strings (port names, flight numbers, craft types) are stored as an offsets
+array plus one UTF-8 blob and decoded one at a time.
+
+Times are stored in seconds rather than minutes because departure_time is
+a TIME with seconds. flight_duration is DECIMAL(4,2) hours, so its value
+in seconds is always a whole number.
+
+The header records SCHEMA_VERSION together with the database's change
+counters: the newest change_log version, the number of log rows in the
+trailing START_WINDOW versions and the highest spaceport id. The row count
+moves when a transaction holding a lower version commits after a higher
+one (see live_board), which the newest version alone would not show.
+load_or_build rewrites the file when any of these has changed. Bump
+SCHEMA_VERSION whenever the tables or the section layout change.
+
+The file lives next to this module unless the SPACETRAVEL_SNAPSHOT
+environment variable names another path, so runs from different working
+directories share one snapshot.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from live_board import START_WINDOW
+from rows import Flight
+
+SNAPSHOT_PATH = os.environ.get("SPACETRAVEL_SNAPSHOT",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "network.snapshot"))
+SCHEMA_VERSION = 1
+MAGIC = b"STDBSNAP"
+FORMAT_VERSION = 2
+
+# magic, format version, schema version, change version, trailing change count, port version, section count
+HEADER = struct.Struct("<8sIIqqqI")
+# section name, dtype string, byte offset, element count
+SECTION = struct.Struct("<24s8sQQ")
+ALIGNMENT = 8
+HUNDREDTHS = Decimal("0.01")
+# Cores in one process (CorePool, load test workers) rebuild one at a time
+REBUILD_LOCK = threading.Lock()
+
+NUMERIC_SECTIONS = {
+    "port_ids": "<i8", "port_capacity": "<i8", "port_fee": "<i8",
+    "route_ids": "<i8", "route_origin": "<i8", "route_dest": "<i8", "route_distance": "<i8",
+    "flight_route": "<i8", "flight_mask": "|u1", "flight_departure": "<i8",
+    "flight_duration": "<i8", "flight_seats": "<i8", "flight_craft": "<i4",
+}
+STRING_SECTIONS = ("port_names", "flight_numbers", "craft_names")
+
+
+def database_version(db):
+    """(change_log version, rows in its trailing window, highest spaceport id), the snapshot's key"""
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT latest.version,
+               (SELECT COUNT(*) FROM change_log WHERE version > latest.version - %s),
+               (SELECT COALESCE(MAX(spaceport_id), 0) FROM spaceports)
+        FROM (SELECT COALESCE(MAX(version), 0) AS version FROM change_log) AS latest
+    """, (START_WINDOW,))
+    version = tuple(int(v) for v in cursor.fetchone())
+    cursor.close()
+    return version
+
+
+def encode_strings(values):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype="|u1")
+
+
+class StringColumn:
+    """Read-only sequence of strings over an offsets array and a UTF-8 blob"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def read_network(db):
+    """Numeric and string sections straight from MySQL, one query per table"""
+    cursor = db.cursor()
+    cursor.execute("SELECT spaceport_id, port_name, capacity, fee FROM spaceports ORDER BY spaceport_id")
+    ports = cursor.fetchall()
+    cursor.execute("SELECT route_id, origin_id, dest_id, distance FROM routes ORDER BY route_id")
+    routes = cursor.fetchall()
+    cursor.execute("SELECT type_name, capacity FROM SpacecraftTypes ORDER BY type_name")
+    crafts = cursor.fetchall()
+    cursor.execute("""
+        SELECT flight_number, route_id, spacecraft_type, schedule_mask,
+               TIME_TO_SEC(departure_time), ROUND(flight_duration * 3600)
+        FROM flights
+        ORDER BY route_id, departure_time, flight_number
+    """)
+    flights = cursor.fetchall()
+    cursor.close()
+
+    craft_index = {name: i for i, (name, _) in enumerate(crafts)}
+    craft_seats = [capacity for _, capacity in crafts]
+    flight_craft = [craft_index[f[2]] for f in flights]
+
+    def column(rows, i):
+        return [row[i] for row in rows]
+
+    numeric = {
+        "port_ids": column(ports, 0), "port_capacity": column(ports, 2), "port_fee": column(ports, 3),
+        "route_ids": column(routes, 0), "route_origin": column(routes, 1),
+        "route_dest": column(routes, 2), "route_distance": column(routes, 3),
+        "flight_route": column(flights, 1), "flight_mask": column(flights, 3),
+        "flight_departure": column(flights, 4), "flight_duration": column(flights, 5),
+        "flight_seats": [craft_seats[i] for i in flight_craft], "flight_craft": flight_craft,
+    }
+    strings = {
+        "port_names": column(ports, 1), "flight_numbers": column(flights, 0),
+        "craft_names": column(crafts, 0),
+    }
+    return numeric, strings
+
+
+def write_snapshot(db, path=SNAPSHOT_PATH):
+    """Write a fresh snapshot of the database to path"""
+    change_version, change_count, port_version = database_version(db)
+    numeric, strings = read_network(db)
+
+    sections = [(name, np.asarray(numeric[name], dtype=dtype)) for name, dtype in NUMERIC_SECTIONS.items()]
+    for name in STRING_SECTIONS:
+        offsets, blob = encode_strings(strings[name])
+        sections += [(f"{name}.offsets", offsets), (f"{name}.blob", blob)]
+
+    table_end = HEADER.size + SECTION.size * len(sections)
+    offset = -(-table_end // ALIGNMENT) * ALIGNMENT
+    entries = []
+    for name, array in sections:
+        entries.append((name, array, offset))
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    # Write a private file beside the target and rename it, so a reader never maps half a
+    # file and writers in other processes never share a temporary name
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, SCHEMA_VERSION, change_version, change_count,
+                                   port_version, len(sections)))
+            for name, array, offset in entries:
+                file.write(SECTION.pack(name.encode(), array.dtype.str.encode(), offset, len(array)))
+            for name, array, offset in entries:
+                file.write(b"\0" * (offset - file.tell()))
+                file.write(array.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Snapshot:
+    """A mapped snapshot file; numeric sections are NumPy views into the mapping"""
+
+    def __init__(self, path, file, mapping, schema_version, version, sections):
+        self.path = path
+        self.file = file
+        self.mapping = mapping
+        self.schema_version = schema_version
+        self.version = version
+        for name in NUMERIC_SECTIONS:
+            setattr(self, name, sections[name])
+        for name in STRING_SECTIONS:
+            setattr(self, name, StringColumn(sections[f"{name}.offsets"], sections[f"{name}.blob"]))
+        self.port_positions = None
+
+    @classmethod
+    def open(cls, path=SNAPSHOT_PATH):
+        file = open(path, "rb")
+        try:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            file.close()
+            raise
+        magic, format_version, schema_version, *version, count = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            mapping.close()
+            file.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} network snapshot.")
+
+        sections = {}
+        for i in range(count):
+            name, dtype, offset, length = SECTION.unpack_from(mapping, HEADER.size + i * SECTION.size)
+            sections[name.rstrip(b"\0").decode()] = np.frombuffer(
+                mapping, dtype=np.dtype(dtype.rstrip(b"\0").decode()), count=length, offset=offset)
+        return cls(path, file, mapping, schema_version, tuple(version), sections)
+
+    @classmethod
+    def load_or_build(cls, db, path=SNAPSHOT_PATH, current=None):
+        """current (or the file at path) if it matches the database, else a freshly written snapshot"""
+        version = database_version(db)
+        if current is not None:
+            if current.matches(version):
+                return current
+            current.close()
+        current = cls.open_matching(path, version)
+        if current is not None:
+            return current
+        with REBUILD_LOCK:
+            # Another core may have rebuilt it while this one waited
+            current = cls.open_matching(path, version)
+            if current is not None:
+                return current
+            write_snapshot(db, path)
+        return cls.open(path)
+
+    @classmethod
+    def open_matching(cls, path, version):
+        """The file at path if it exists and matches version, else None"""
+        try:
+            snapshot = cls.open(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        if snapshot.matches(version):
+            return snapshot
+        snapshot.close()
+        return None
+
+    def matches(self, version):
+        return self.schema_version == SCHEMA_VERSION and self.version == version
+
+    def close(self):
+        # Drop the array views first; mmap refuses to close while buffers are exported
+        for name in list(NUMERIC_SECTIONS) + list(STRING_SECTIONS):
+            self.__dict__.pop(name, None)
+        try:
+            self.mapping.close()
+        except BufferError:
+            pass
+        self.file.close()
+
+    def port_id(self, port_name):
+        """spaceport_id for a port name, or None"""
+        if self.port_positions is None:
+            self.port_positions = {}
+            for i, name in enumerate(self.port_names):
+                self.port_positions.setdefault(name, i)
+        i = self.port_positions.get(port_name)
+        return None if i is None else int(self.port_ids[i])
+
+    def flights_by_origin(self, day_mask):
+        """Flights running on the days in day_mask, as Flight rows grouped by origin_id"""
+        route_index = np.searchsorted(self.route_ids, self.flight_route)
+        by_origin = {}
+        for i in np.flatnonzero(self.flight_mask & day_mask):
+            r = route_index[i]
+            row = Flight(
+                self.flight_numbers[i],
+                timedelta(seconds=int(self.flight_departure[i])),
+                (Decimal(int(self.flight_duration[i])) / 3600).quantize(HUNDREDTHS),
+                int(self.flight_mask[i]),
+                self.craft_names[self.flight_craft[i]],
+                int(self.route_origin[r]),
+                int(self.route_dest[r]),
+                int(self.route_distance[r]),
+            )
+            by_origin.setdefault(row.origin_id, []).append(row)
+        return by_origin
+
+
+if __name__ == "__main__":
+    from connection import connect
+
+    db = connect()
+    try:
+        write_snapshot(db)
+    finally:
+        db.close()
+    snapshot = Snapshot.open()
+    print(f"{SNAPSHOT_PATH}: {len(snapshot.port_ids)} ports, {len(snapshot.route_ids)} routes, "
+          f"{len(snapshot.flight_route)} flights, change version {snapshot.version[0]}")
+    snapshot.close()
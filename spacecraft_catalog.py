@@ -0,0 +1,70 @@
+"""In-memory spacecraft catalog sorted by max_range.
+
+Craft that can fly a route are exactly those with max_range >= distance,
+which is a suffix of the sorted list, so eligibility is one binary search.
+A suffix-minimum table over capacity gives the smallest eligible craft in
+O(1) as well, which lets a whole route list be assigned in one pass.
+"""
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+Spacecraft = namedtuple("Spacecraft", ["max_range", "capacity", "type_name"])
+
+STRATEGIES = ("best_fit", "smallest_capacity")
+
+
+class SpacecraftCatalog:
+    """SpacecraftTypes rows, ordered by (max_range, capacity, type_name)"""
+
+    def __init__(self, rows=()):
+        self.crafts = sorted(Spacecraft(max_range, capacity, type_name)
+                             for type_name, capacity, max_range in rows)
+        self.reindex()
+
+    @classmethod
+    def from_db(cls, db):
+        cursor = db.cursor()
+        cursor.execute("SELECT type_name, capacity, max_range FROM SpacecraftTypes")
+        rows = cursor.fetchall()
+        cursor.close()
+        return cls(rows)
+
+    def reindex(self):
+        self.ranges = [craft.max_range for craft in self.crafts]
+        self.by_name = {craft.type_name: craft for craft in self.crafts}
+        # smallest_from[i] is the position of the lowest-capacity craft in crafts[i:]
+        self.smallest_from = [0] * len(self.crafts)
+        best = None
+        for i in range(len(self.crafts) - 1, -1, -1):
+            if best is None or self.crafts[i].capacity <= self.crafts[best].capacity:
+                best = i
+            self.smallest_from[i] = best
+
+    def add(self, type_name, capacity, max_range):
+        """Insert a newly committed craft type"""
+        insort(self.crafts, Spacecraft(max_range, capacity, type_name))
+        self.reindex()
+
+    def get(self, type_name):
+        return self.by_name.get(type_name)
+
+    def eligible(self, distance):
+        """Every craft whose range covers distance, shortest range first"""
+        return self.crafts[bisect_left(self.ranges, distance):]
+
+    def best_fit(self, distance):
+        """Craft with the least range that still covers distance, or None"""
+        i = bisect_left(self.ranges, distance)
+        return self.crafts[i] if i < len(self.crafts) else None
+
+    def smallest_capacity(self, distance):
+        """Eligible craft with the lowest capacity, or None"""
+        i = bisect_left(self.ranges, distance)
+        return self.crafts[self.smallest_from[i]] if i < len(self.crafts) else None
+
+    def assign(self, distances, strategy="best_fit"):
+        """One craft (or None) per distance, for a whole route list in one call"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {', '.join(STRATEGIES)}.")
+        pick = self.best_fit if strategy == "best_fit" else self.smallest_capacity
+        return [pick(distance) for distance in distances]
@@ -0,0 +1,117 @@
+"""Import-time and startup profile for the desktop app.
+
+Both measurements run in a fresh interpreter so nothing is already cached:
+
+* ``python -X importtime -c "import project"``, reduced to the modules
+  with the largest cumulative import time;
+* time to first window, split into importing project, creating the
+  QApplication, init_database, init_ui and the first processed show.
+
+``python startup_profile.py --budget-ms 1500`` exits with status 1 when
+time to first window is over budget, so it can gate a CI job or a release
+checklist. The window needs a reachable database. Without a display, Qt
+is run with the offscreen platform.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+STARTUP_SCRIPT = r"""
+import json, sys, time
+start = time.perf_counter()
+phases = {}
+
+import project
+phases["import project"] = time.perf_counter() - start
+from PySide6.QtWidgets import QApplication
+
+mark = time.perf_counter()
+app = QApplication(sys.argv)
+phases["QApplication"] = time.perf_counter() - mark
+
+
+class ProfiledWindow(project.SpaceTravelDB):
+    def init_database(self):
+        mark = time.perf_counter()
+        super().init_database()
+        phases["init_database"] = time.perf_counter() - mark
+
+    def init_ui(self):
+        mark = time.perf_counter()
+        super().init_ui()
+        phases["init_ui"] = time.perf_counter() - mark
+
+
+window = ProfiledWindow()
+mark = time.perf_counter()
+window.show()
+app.processEvents()
+phases["show"] = time.perf_counter() - mark
+phases["first window"] = time.perf_counter() - start
+print(json.dumps(phases))
+window.close()
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def import_profile(module="project", top=15):
+    """[(cumulative seconds, self seconds, module)] for the slowest imports"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=child_env())
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative_us) / 1e6, int(self_us) / 1e6, name.rstrip()))
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def startup_profile(timeout=60):
+    """Seconds spent in each startup phase, up to the first shown window"""
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], capture_output=True, text=True,
+                            env=child_env(), timeout=timeout)
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"startup failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile imports and time to first window")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if time to first window exceeds this")
+    parser.add_argument("--imports-only", action="store_true", help="skip the window (no database needed)")
+    args = parser.parse_args()
+
+    print("Slowest imports (cumulative / self):")
+    for cumulative, own, name in import_profile(top=args.top):
+        print(f"{cumulative * 1000:9.1f} ms {own * 1000:9.1f} ms  {name}")
+    if args.imports_only:
+        return 0
+
+    phases = startup_profile()
+    print("\nStartup phases:")
+    for phase, seconds in phases.items():
+        print(f"{seconds * 1000:9.1f} ms  {phase}")
+
+    if args.budget_ms is not None and phases["first window"] * 1000 > args.budget_ms:
+        print(f"\nTime to first window {phases['first window'] * 1000:.0f} ms is over the "
+              f"{args.budget_ms:.0f} ms budget.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
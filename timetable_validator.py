@@ -0,0 +1,245 @@
+"""Whole-timetable validation before a season is loaded.
+
+enter_flight checks one flight at a time against what is already in the
+database, so a bulk load is slow and whether a flight passes depends on
+which flights went in before it. validate_timetable instead checks a full
+candidate timetable in a fixed number of passes:
+
+1. Read the reference data (routes, craft, ports, and each port's current
+   per-day load from port_adjacency) once.
+2. Check each candidate against its own rules: flight number, weekdays,
+   duration, departure time, route, craft, range and same-planet.
+3. Sum the candidates' port-day movements and compare every port-day with
+   its capacity.
+
+Work is linear in the number of candidates, and every violation is
+reported, not just the first. A capacity overrun is reported against the
+port and day, together with the candidate flights that use that slot, so
+the result does not depend on the order of the rows.
+
+``python timetable_validator.py season.csv`` validates a CSV. The CSV has
+the columns of CSV_COLUMNS, and its days column uses the same
+comma-separated weekday names as the insert form. ``--staging TABLE``
+validates rows already loaded into a staging table shaped like
+STAGING_TABLE instead.
+"""
+import argparse
+import csv
+import sys
+from collections import defaultdict, namedtuple
+
+from schedule import ADJACENCY_DAY_COLUMNS, ALL_DAYS_MASK, DAYS_OF_WEEK, TIME_FORMAT, days_to_mask
+
+CSV_COLUMNS = ("flight_number", "route_id", "spacecraft_type", "days", "departure_time", "flight_duration")
+
+STAGING_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    flight_number VARCHAR(20) NOT NULL,
+    route_id INT NOT NULL,
+    spacecraft_type VARCHAR(100) NOT NULL,
+    schedule_mask TINYINT UNSIGNED NOT NULL,
+    departure_time TIME NOT NULL,
+    flight_duration DECIMAL(4,2) NOT NULL
+)
+"""
+
+# subject is the flight number, or (port_id, day) for capacity violations
+Violation = namedtuple("Violation", ["rule", "subject", "message"])
+
+
+class ReferenceData:
+    """Everything the rules look up, read with one query per table"""
+
+    def __init__(self, routes, crafts, ports, port_load, flight_numbers):
+        self.routes = routes                  # route_id -> (origin_id, dest_id, distance)
+        self.crafts = crafts                  # type_name -> max_range
+        self.ports = ports                    # spaceport_id -> (capacity, planet_associated)
+        self.port_load = port_load            # (port_id, day index) -> scheduled movements
+        self.flight_numbers = flight_numbers  # flight numbers already in the database
+
+    @classmethod
+    def from_db(cls, db, replace_existing=False):
+        """Reference data; with replace_existing the current flights are ignored"""
+        cursor = db.cursor()
+        cursor.execute("SELECT route_id, origin_id, dest_id, distance FROM routes")
+        routes = {row[0]: row[1:] for row in cursor.fetchall()}
+        cursor.execute("SELECT type_name, max_range FROM SpacecraftTypes")
+        crafts = dict(cursor.fetchall())
+        cursor.execute("SELECT spaceport_id, capacity, planet_associated FROM spaceports")
+        ports = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        port_load = {}
+        flight_numbers = set()
+        if not replace_existing:
+            # port_adjacency already holds each route's flights per weekday at both ends
+            sums = ", ".join(f"SUM({c})" for c in ADJACENCY_DAY_COLUMNS)
+            cursor.execute(f"SELECT port_id, {sums} FROM port_adjacency GROUP BY port_id")
+            for port_id, *counts in cursor.fetchall():
+                for day_index, count in enumerate(counts):
+                    if count:
+                        port_load[port_id, day_index] = int(count)
+            cursor.execute("SELECT flight_number FROM flights")
+            flight_numbers = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return cls(routes, crafts, ports, port_load, flight_numbers)
+
+
+def parse_days(days):
+    """Schedule mask from a mask, a list of weekday names or a comma-separated string"""
+    if isinstance(days, int):
+        if not 0 < days <= ALL_DAYS_MASK:
+            raise ValueError(f"Invalid schedule mask: {days}")
+        return days
+    if isinstance(days, str):
+        days = days.split(",")
+    mask = days_to_mask(days)
+    if not mask:
+        raise ValueError("At least one day of the week is required.")
+    return mask
+
+
+def check_flight(flight, reference, seen):
+    """Per-flight rules; returns (violations, (origin_id, dest_id, mask) or None)"""
+    flight_number, route_id, spacecraft_type, days, departure_time, flight_duration = flight
+    subject = str(flight_number).strip()
+    violations = []
+
+    if not subject:
+        violations.append(Violation("flight_number", subject, "Flight number cannot be empty."))
+    elif subject in seen:
+        violations.append(Violation("flight_number", subject,
+                                    f"Flight number {subject} appears more than once in the timetable."))
+    elif subject in reference.flight_numbers:
+        violations.append(Violation("flight_number", subject, f"Flight number {subject} already exists."))
+    seen.add(subject)
+
+    try:
+        mask = parse_days(days)
+    except ValueError as e:
+        violations.append(Violation("days", subject, str(e)))
+        mask = None
+
+    try:
+        if float(flight_duration) <= 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        violations.append(Violation("duration", subject, "Flight duration must be a positive number."))
+
+    if not TIME_FORMAT.match(str(departure_time)):
+        violations.append(Violation("departure_time", subject, "Invalid time format."))
+
+    try:
+        route = reference.routes.get(int(route_id))
+    except (TypeError, ValueError):
+        route = None
+    if route is None:
+        violations.append(Violation("route", subject, f"Route ID {route_id} does not exist."))
+
+    max_range = reference.crafts.get(spacecraft_type)
+    if max_range is None:
+        violations.append(Violation("spacecraft", subject,
+                                    f"Spacecraft type '{spacecraft_type}' does not exist."))
+
+    if route is None:
+        return violations, None
+    origin_id, dest_id, distance = route
+    if max_range is not None and distance > max_range:
+        violations.append(Violation("range", subject,
+                                    f"Route distance {distance} exceeds craft range {max_range}."))
+
+    origin_planet = reference.ports[origin_id][1]
+    dest_planet = reference.ports[dest_id][1]
+    if origin_planet and dest_planet and origin_planet == dest_planet:
+        violations.append(Violation("same_planet", subject,
+                                    "Flights are not allowed between spaceports on the same planet."))
+
+    return violations, (None if mask is None else (origin_id, dest_id, mask))
+
+
+def validate_timetable(flights, reference):
+    """Every violation in a candidate timetable of CSV_COLUMNS-shaped rows"""
+    violations = []
+    seen = set()
+    # (port_id, day index) -> candidate flights using that port on that day
+    slots = defaultdict(list)
+
+    for flight in flights:
+        flight_violations, movement = check_flight(flight, reference, seen)
+        violations.extend(flight_violations)
+        if movement is None:
+            continue
+        origin_id, dest_id, mask = movement
+        subject = str(flight[0]).strip()
+        for day_index in range(len(DAYS_OF_WEEK)):
+            if mask & (1 << day_index):
+                slots[origin_id, day_index].append(subject)
+                slots[dest_id, day_index].append(subject)
+
+    for (port_id, day_index), numbers in sorted(slots.items()):
+        capacity = reference.ports[port_id][0]
+        scheduled = reference.port_load.get((port_id, day_index), 0) + len(numbers)
+        if scheduled > capacity:
+            day = DAYS_OF_WEEK[day_index]
+            violations.append(Violation(
+                "capacity", (port_id, day),
+                f"Port ID {port_id} would have {scheduled} flights on {day}, over its daily "
+                f"capacity ({capacity}). Timetable flights: {', '.join(sorted(numbers))}."
+            ))
+    return violations
+
+
+def validate_against_db(db, flights, replace_existing=False):
+    return validate_timetable(flights, ReferenceData.from_db(db, replace_existing))
+
+
+def create_staging_table(db, table="flight_staging"):
+    cursor = db.cursor()
+    cursor.execute(STAGING_TABLE.format(table=table))
+    db.commit()
+    cursor.close()
+
+
+def staged_flights(db, table="flight_staging"):
+    """Rows of a staging table, with times formatted as the insert form would send them"""
+    cursor = db.cursor()
+    cursor.execute(f"""
+        SELECT flight_number, route_id, spacecraft_type, schedule_mask,
+               TIME_FORMAT(departure_time, '%H:%i:%s'), flight_duration
+        FROM {table}
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def read_csv(path):
+    with open(path, newline="") as file:
+        return [tuple(row[column] for column in CSV_COLUMNS) for row in csv.DictReader(file)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a candidate season timetable")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("csv_path", nargs="?", help=f"CSV with columns {', '.join(CSV_COLUMNS)}")
+    source.add_argument("--staging", metavar="TABLE", help="validate rows in a staging table")
+    parser.add_argument("--replace-existing", action="store_true",
+                        help="validate as if the timetable replaces every current flight")
+    args = parser.parse_args()
+
+    from connection import connect
+
+    db = connect()
+    try:
+        flights = staged_flights(db, args.staging) if args.staging else read_csv(args.csv_path)
+        violations = validate_against_db(db, flights, args.replace_existing)
+    finally:
+        db.close()
+
+    for violation in violations:
+        print(f"{violation.rule}\t{violation.subject}\t{violation.message}")
+    print(f"{len(flights)} flights checked, {len(violations)} violations", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())